@@ -1,11 +1,19 @@
 """Core search logic for finding connections between event artists and favorites."""
 
 import heapq
+import logging
+import multiprocessing
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import partial
 
 import numpy as np
 import scipy.sparse as sp
 from scipy.sparse.csgraph import dijkstra
 
+from src.k_shortest_paths import Adjacency, build_adjacency, yen_k_shortest_paths
 from src.models import (
     TIER_MODERATELY_RELATED_THRESHOLD,
     TIER_SIMILAR_THRESHOLD,
@@ -15,46 +23,263 @@ from src.models import (
     ConnectionPath,
     Event,
 )
+from src.shared_graph import SharedCSR, SharedCSRSpec, attach_csr
+
+logger = logging.getLogger(__name__)
 
 # Sentinel value indicating no path exists in the predecessors array
 NO_PATH_SENTINEL = -9999
 
+# Valid values for find_optimal_paths(direction=...)
+SEARCH_DIRECTIONS = {"auto", "forward", "reverse"}
+
+# Working memory per node of one shortest-path tree: float64 distance
+# plus int32 predecessor
+TREE_ROW_BYTES_PER_NODE = 8 + 4
+
+# Chunks per pool worker, so uneven chunks still keep every core busy
+CHUNKS_PER_WORKER = 4
+
+# Smallest search (roots x nodes) worth a process pool. Starting the
+# spawned workers costs about 1.1-1.8s, and a serial search about 1.1us
+# per root and node (three paths per pair, 20 links per artist). With
+# two workers that's a win from about 3.2M upwards.
+MIN_PARALLEL_SEARCH_WORK = 4_000_000
+
+
+@dataclass(frozen=True)
+class SearchBounds:
+    """Limits on the paths a connection search may return."""
+
+    max_hops: int | None = None
+    max_cost: float | None = None
+
+    @property
+    def cost_limit(self) -> float:
+        """max_cost as a number, infinite when unbounded."""
+        return np.inf if self.max_cost is None else self.max_cost
+
+
+@dataclass(frozen=True)
+class EdgeSparsification:
+    """
+    Which similarity links the graph keeps.
+
+    music-map lists dozens of similar artists per artist, most of them
+    weak links that rarely lie on a best path but slow every relaxation.
+    """
+
+    max_edges_per_artist: int | None = None  # Strongest links kept per artist
+    min_strength: float | None = None  # Weaker links are dropped
+
+    def keep_mask(self, rows: np.ndarray, strengths: np.ndarray) -> np.ndarray:
+        """
+        Select the edges to keep.
+
+        Args:
+            rows: Source node of each edge, sorted
+            strengths: Relationship strength of each edge
+
+        Returns:
+            Boolean mask over the edges. Ties for an artist's last kept
+            link go to the lower node index, so the result is deterministic.
+        """
+        keep = np.ones(len(rows), dtype=bool)
+        if self.min_strength is not None:
+            keep &= strengths >= self.min_strength
+        if self.max_edges_per_artist is not None:
+            # Rank each artist's surviving links from strongest to weakest
+            candidates = np.flatnonzero(keep)
+            order = candidates[np.lexsort((-strengths[candidates], rows[candidates]))]
+            ordered_rows = rows[order]
+            row_starts = np.searchsorted(ordered_rows, ordered_rows, side="left")
+            rank = np.arange(len(order)) - row_starts
+            keep[order[rank >= self.max_edges_per_artist]] = False
+        return keep
+
+
+# Per (event_artist, favorite_artist) heaps of (-path_score, path, ConnectionPath)
+PairPathHeaps = dict[
+    tuple[str, str], list[tuple[float, tuple[str, ...], ConnectionPath]]
+]
+
+
+def _collect_edges(
+    similarity_map: dict[str, ArtistSimilarityData],
+    artist_to_idx: dict[str, int],
+    sparsification: EdgeSparsification | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gather edges as (rows, cols, strengths, ranks) arrays in CSR order.
+
+    If an artist lists the same similar artist twice, the first (best
+    ranked) entry wins. A sparsification then drops weak links.
+    """
+    rows = np.fromiter(
+        (
+            artist_to_idx[source_artist]
+            for source_artist, artist_data in similarity_map.items()
+            for _ in artist_data.similar_artists
+        ),
+        dtype=np.int64,
+    )
+    cols = np.fromiter(
+        (
+            artist_to_idx[sim.name]
+            for artist_data in similarity_map.values()
+            for sim in artist_data.similar_artists
+        ),
+        dtype=np.int64,
+    )
+    strengths = np.fromiter(
+        (
+            sim.relationship_strength
+            for artist_data in similarity_map.values()
+            for sim in artist_data.similar_artists
+        ),
+        dtype=np.float64,
+    )
+    ranks = np.fromiter(
+        (
+            sim.rank
+            for artist_data in similarity_map.values()
+            for sim in artist_data.similar_artists
+        ),
+        dtype=np.int32,
+    )
+
+    # Sort by (row, col) and drop duplicate edges, keeping the first entry
+    _, first = np.unique(rows * len(artist_to_idx) + cols, return_index=True)
+    if sparsification is not None:
+        first = first[sparsification.keep_mask(rows[first], strengths[first])]
+    return rows[first], cols[first], strengths[first], ranks[first]
+
+
+def edge_positions(
+    graph: sp.csr_matrix, tails: np.ndarray, heads: np.ndarray
+) -> np.ndarray:
+    """
+    Locate edges tail → head in the CSR arrays.
+
+    Runs one vectorized binary search over each tail's sorted column slice,
+    so thousands of edges are resolved in a handful of NumPy steps.
+
+    Args:
+        graph: Sparse CSR matrix with sorted indices
+        tails: Source node of each edge
+        heads: Target node of each edge
+
+    Returns:
+        Position of each edge in graph.indices / graph.data, or -1 if absent
+    """
+    indices = graph.indices
+    tails = np.asarray(tails, dtype=np.int64)
+    heads = np.asarray(heads, dtype=np.int64)
+    if len(indices) == 0:
+        return np.full(len(tails), -1, dtype=np.int64)
+
+    lo = graph.indptr[tails].astype(np.int64)
+    end = graph.indptr[tails + 1].astype(np.int64)
+    hi = end.copy()
+    last = len(indices) - 1
+
+    while (active := lo < hi).any():
+        mid = (lo + hi) // 2
+        go_right = active & (indices[np.minimum(mid, last)] < heads)
+        lo = np.where(go_right, mid + 1, lo)
+        hi = np.where(active & ~go_right, mid, hi)
+
+    found = (lo < end) & (indices[np.minimum(lo, last)] == heads)
+    return np.where(found, lo, -1)
+
 
 def build_strength_lookup(
+    graph: sp.csr_matrix,
     similarity_map: dict[str, ArtistSimilarityData],
-) -> dict[tuple[str, str], float]:
+    artist_to_idx: dict[str, int],
+    *,
+    sparsification: EdgeSparsification | None = None,
+) -> np.ndarray:
     """
-    Build a pre-computed lookup for (source, target) -> strength.
+    Build relationship strengths aligned with the graph's CSR entries.
 
-    This avoids O(n) list iteration during path reconstruction.
+    strengths[p] is the strength of the edge stored at graph.data[p], so
+    path metrics resolve edges by position instead of hashing name pairs.
 
     Args:
+        graph: Graph from build_sparse_graph
         similarity_map: Dict of artist similarity data
+        artist_to_idx: Mapping from artist name to index
+        sparsification: The sparsification the graph was built with
 
     Returns:
-        Dict mapping (source_artist, target_artist) to relationship strength
+        Array of relationship strengths parallel to graph.data
     """
-    lookup = {}
-    for source_artist, artist_data in similarity_map.items():
-        for similar_artist in artist_data.similar_artists:
-            lookup[(source_artist, similar_artist.name)] = (
-                similar_artist.relationship_strength
-            )
-    return lookup
+    rows, cols, strengths, _ = _collect_edges(
+        similarity_map, artist_to_idx, sparsification
+    )
+    return _align_to_graph(graph, rows, cols, strengths)
+
+
+def build_rank_lookup(
+    graph: sp.csr_matrix,
+    similarity_map: dict[str, ArtistSimilarityData],
+    artist_to_idx: dict[str, int],
+    *,
+    sparsification: EdgeSparsification | None = None,
+) -> np.ndarray:
+    """
+    Build similar-artist ranks aligned with the graph's CSR entries.
+
+    ranks[p] is the position of the edge stored at graph.data[p] in its
+    source artist's similar-artist list, as scraped (1 = most similar).
+
+    Args:
+        graph: Graph from build_sparse_graph
+        similarity_map: Dict of artist similarity data
+        artist_to_idx: Mapping from artist name to index
+        sparsification: The sparsification the graph was built with
+
+    Returns:
+        Array of ranks parallel to graph.data
+    """
+    rows, cols, _, ranks = _collect_edges(similarity_map, artist_to_idx, sparsification)
+    return _align_to_graph(graph, rows, cols, ranks)
+
+
+def _align_to_graph(
+    graph: sp.csr_matrix, rows: np.ndarray, cols: np.ndarray, values: np.ndarray
+) -> np.ndarray:
+    """Scatter per-edge values into the graph's CSR order."""
+    positions = edge_positions(graph, rows, cols)
+    if (positions < 0).any():
+        raise ValueError("Similarity map does not match the graph's edges")
+
+    aligned = np.zeros(graph.nnz, dtype=values.dtype)
+    aligned[positions] = values
+    return aligned
 
 
 def build_sparse_graph(
     similarity_map: dict[str, ArtistSimilarityData],
+    *,
+    names: list[str] | None = None,
+    sparsification: EdgeSparsification | None = None,
 ) -> tuple[sp.csr_matrix, dict[str, int], dict[int, str]]:
     """
     Convert similarity map to sparse CSR matrix with costs.
 
     Args:
         similarity_map: Dict mapping artist names to their similarity data
+        names: Existing node order to keep, so node ids stay stable across
+            versions of the map. Artists not in it are appended in sorted
+            order; by default all artists are numbered in sorted order.
+        sparsification: Keep only each artist's strongest links and/or
+            links above a strength floor; every artist keeps its node
 
     Returns:
         Tuple of (csr_matrix, artist_to_idx, idx_to_artist)
-        - csr_matrix: Graph with costs (1/relationship_strength)
+        - csr_matrix: Graph with costs (1/relationship_strength), sorted indices
         - artist_to_idx: Maps artist name to matrix index
         - idx_to_artist: Maps matrix index to artist name
     """
@@ -64,32 +289,23 @@ def build_sparse_graph(
         all_artists.update(sim.name for sim in artist_data.similar_artists)
 
     # Create bidirectional index mappings
-    artist_to_idx = {artist: idx for idx, artist in enumerate(sorted(all_artists))}
-    idx_to_artist = {idx: artist for artist, idx in artist_to_idx.items()}
-
-    # Build edge lists using list comprehensions
-    edges = [
-        (
-            artist_to_idx[source_artist],
-            artist_to_idx[sim.name],
-            1.0 / sim.relationship_strength,
-        )
-        for source_artist, artist_data in similarity_map.items()
-        for sim in artist_data.similar_artists
-    ]
-
-    # Unpack into separate lists
-    if edges:
-        rows_tuple, cols_tuple, costs_tuple = zip(*edges, strict=True)
-        rows = list(rows_tuple)
-        cols = list(cols_tuple)
-        costs = list(costs_tuple)
-    else:
-        rows, cols, costs = [], [], []
+    ordered = list(names or [])
+    ordered.extend(sorted(all_artists.difference(ordered)))
+    artist_to_idx = {artist: idx for idx, artist in enumerate(ordered)}
+    idx_to_artist = dict(enumerate(ordered))
+
+    # Edges come back sorted by (row, col), so the CSR arrays can be
+    # assembled directly
+    rows, cols, strengths, _ = _collect_edges(
+        similarity_map, artist_to_idx, sparsification
+    )
+    n = len(ordered)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
 
-    # Create sparse matrix
-    n = len(all_artists)
-    graph = sp.csr_matrix((costs, (rows, cols)), shape=(n, n))
+    graph = sp.csr_matrix(
+        (1.0 / strengths, cols.astype(np.int32), indptr), shape=(n, n)
+    )
 
     return graph, artist_to_idx, idx_to_artist
 
@@ -105,6 +321,282 @@ def classify_tier(avg_strength: float) -> str:
     return "Distantly Related Artists"
 
 
+def reconstruct_paths_batch(
+    predecessors: np.ndarray,
+    rows: np.ndarray,
+    starts: np.ndarray,
+    roots: np.ndarray | None = None,
+    *,
+    reverse_walks: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reconstruct many paths from shortest-path trees at once.
+
+    Walk i starts at node starts[i] and repeatedly steps to
+    predecessors[rows[i], node] until it reaches roots[i] (or, without
+    roots, a node whose predecessor is NO_PATH_SENTINEL). All walks advance
+    together, one NumPy gather per step, so the cost is driven by the
+    longest path rather than by the number of pairs.
+
+    Args:
+        predecessors: Predecessor matrix from dijkstra (one row per tree)
+        rows: Tree row for each walk
+        starts: First node of each walk
+        roots: Node each walk must end at; walks that hit a dead end first
+            are unreachable
+        reverse_walks: Store each walk back to front. Use this for trees
+            grown from the path source, whose walks run target → source.
+
+    Returns:
+        Tuple of (nodes, offsets): path i is nodes[offsets[i]:offsets[i + 1]]
+        as int32 node ids; unreachable pairs get an empty path
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    current = np.asarray(starts, dtype=np.int64).copy()
+    n_walks = len(current)
+
+    lengths = np.ones(n_walks, dtype=np.int64)
+    valid = np.ones(n_walks, dtype=bool)
+    if roots is None:
+        active = np.ones(n_walks, dtype=bool)
+    else:
+        roots = np.asarray(roots, dtype=np.int64)
+        active = current != roots
+
+    # Per step: the walks still moving, the step number and the node each
+    # stepped to
+    steps: list[tuple[np.ndarray, int, np.ndarray]] = []
+
+    while active.any():
+        walk_ids = np.flatnonzero(active)
+        next_nodes = predecessors[rows[walk_ids], current[walk_ids]]
+        ended = next_nodes == NO_PATH_SENTINEL
+
+        if roots is None:
+            # Reaching a tree root is how every walk ends
+            active[walk_ids[ended]] = False
+        else:
+            # Dead end before the required root
+            valid[walk_ids[ended]] = False
+            active[walk_ids[ended]] = False
+
+        moved = walk_ids[~ended]
+        current[moved] = next_nodes[~ended]
+        lengths[moved] += 1
+        steps.append((moved, len(steps) + 1, current[moved]))
+        if roots is not None:
+            active[moved] = current[moved] != roots[moved]
+
+    return _assemble_walks(starts, steps, lengths, valid, reverse_walks)
+
+
+def _assemble_walks(
+    starts: np.ndarray,
+    steps: list[tuple[np.ndarray, np.ndarray | int, np.ndarray]],
+    lengths: np.ndarray,
+    valid: np.ndarray,
+    reverse_walks: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lay out batch walks as flat (nodes, offsets) arrays.
+
+    Each step entry holds walk ids, the step number each of them made
+    (1-based) and the nodes they reached; invalid walks become empty paths.
+    """
+    lengths = np.where(valid, lengths, 0)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    nodes = np.empty(offsets[-1], dtype=np.int32)
+
+    # Scatter step j of each walk into its slot (front-to-back or reversed)
+    def slot(walk_ids: np.ndarray, step: np.ndarray | int) -> np.ndarray:
+        if reverse_walks:
+            return offsets[walk_ids] + lengths[walk_ids] - 1 - step
+        return offsets[walk_ids] + step
+
+    kept = np.flatnonzero(valid)
+    nodes[slot(kept, 0)] = np.asarray(starts, dtype=np.int64)[kept]
+    for walk_ids, step, step_nodes in steps:
+        keep = valid[walk_ids]
+        kept_step = step[keep] if isinstance(step, np.ndarray) else step
+        nodes[slot(walk_ids[keep], kept_step)] = step_nodes[keep]
+
+    return nodes, offsets
+
+
+@dataclass
+class HopLimitedTrees:
+    """
+    Cheapest distances over paths of bounded length, from a batch of roots.
+
+    Row r of distances and min_hops belongs to roots[r]. Level h (1-based)
+    records, as flat ids r * n_nodes + node sorted ascending, the nodes
+    whose distance improved at that level together with the predecessor
+    that improved them.
+    """
+
+    roots: np.ndarray
+    distances: np.ndarray
+    min_hops: np.ndarray
+    level_states: list[np.ndarray]
+    level_predecessors: list[np.ndarray]
+
+    def paths(
+        self,
+        rows: np.ndarray,
+        leaves: np.ndarray,
+        *,
+        reverse_walks: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reconstruct the bounded paths from roots[rows[i]] to leaves[i].
+
+        Output follows reconstruct_paths_batch.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        return walk_hop_levels(
+            self.level_states,
+            self.level_predecessors,
+            rows,
+            leaves,
+            np.isfinite(self.distances[rows, leaves]),
+            n_nodes=self.distances.shape[1],
+            reverse_walks=reverse_walks,
+        )
+
+
+def walk_hop_levels(
+    level_states: list[np.ndarray],
+    level_predecessors: list[np.ndarray],
+    rows: np.ndarray,
+    leaves: np.ndarray,
+    valid: np.ndarray,
+    *,
+    n_nodes: int,
+    reverse_walks: bool = False,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reconstruct bounded paths from the levels of a min-plus relaxation.
+
+    Walks start at the leaf and descend the levels, stepping to the
+    recorded predecessor wherever the current node improved.
+
+    Args:
+        level_states: Per level, sorted flat ids row * n_nodes + node of
+            the states that improved at that level
+        level_predecessors: Per level, the predecessor of each state
+        rows: Root row of each walk
+        leaves: Node each walk starts at
+        valid: Walks whose leaf was reached from its root
+        n_nodes: Number of nodes of the graph
+        reverse_walks: Store each walk back to front
+
+    Returns:
+        Tuple of (nodes, offsets) in the layout of reconstruct_paths_batch
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    current = np.asarray(leaves, dtype=np.int64).copy()
+    lengths = np.ones(len(current), dtype=np.int64)
+    steps: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+    for states, predecessors in zip(
+        reversed(level_states),
+        reversed(level_predecessors),
+        strict=True,
+    ):
+        if len(states) == 0:
+            continue
+        flat = rows * n_nodes + current
+        pos = np.minimum(np.searchsorted(states, flat), len(states) - 1)
+        moved = np.flatnonzero(states[pos] == flat)
+        current[moved] = predecessors[pos[moved]]
+        lengths[moved] += 1
+        steps.append((moved, lengths[moved] - 1, current[moved]))
+
+    return _assemble_walks(leaves, steps, lengths, valid, reverse_walks)
+
+
+def hop_limited_search(
+    graph: sp.csr_matrix,
+    roots: np.ndarray,
+    max_hops: int,
+    max_cost: float | None = None,
+) -> HopLimitedTrees:
+    """
+    Cheapest distances from each root over paths of at most max_hops edges.
+
+    A min-plus relaxation over all roots at once: level h relaxes only the
+    edges out of (root, node) states that improved at level h - 1, so the
+    search never expands past max_hops edges, and candidates costing more
+    than max_cost are dropped on the spot.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        roots: Start node of every row
+        max_hops: Maximum number of edges per path
+        max_cost: Maximum total path cost, or None for no cost bound
+
+    Returns:
+        HopLimitedTrees; min_hops holds the first level at which each node
+        was reached (a lower bound on the edges of any path within the
+        bounds) and max_hops + 1 for nodes never reached
+    """
+    roots = np.asarray(roots, dtype=np.int64)
+    n_rows, n_nodes = len(roots), graph.shape[0]
+    indptr, indices, data = graph.indptr, graph.indices, graph.data
+    cost_limit = np.inf if max_cost is None else max_cost
+
+    distances = np.full((n_rows, n_nodes), np.inf)
+    min_hops = np.full((n_rows, n_nodes), max_hops + 1, dtype=np.int32)
+    frontier = np.arange(n_rows, dtype=np.int64) * n_nodes + roots
+    distances.flat[frontier] = 0.0
+    min_hops.flat[frontier] = 0
+    level_states: list[np.ndarray] = []
+    level_predecessors: list[np.ndarray] = []
+
+    for hop in range(1, max_hops + 1):
+        if len(frontier) == 0:
+            break
+        tails = frontier % n_nodes
+        starts = indptr[tails].astype(np.int64)
+        counts = indptr[tails + 1] - starts
+        # Positions of every outgoing edge of every frontier state
+        edge_owner = np.repeat(np.arange(len(frontier)), counts)
+        positions = (
+            np.arange(len(edge_owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        ) + starts[edge_owner]
+
+        candidates = distances.flat[frontier][edge_owner] + data[positions]
+        targets = (frontier[edge_owner] - tails[edge_owner]) + indices[positions]
+        predecessors = tails[edge_owner]
+
+        better = (candidates < distances.flat[targets]) & (candidates <= cost_limit)
+        candidates = candidates[better]
+        targets = targets[better]
+        predecessors = predecessors[better]
+
+        # Cheapest candidate per target; ties go to the lowest predecessor
+        order = np.lexsort((predecessors, candidates, targets))
+        targets = targets[order]
+        first = np.ones(len(targets), dtype=bool)
+        first[1:] = targets[1:] != targets[:-1]
+        frontier = targets[first]
+        distances.flat[frontier] = candidates[order][first]
+        reached = min_hops.flat[frontier] > max_hops
+        min_hops.flat[frontier[reached]] = hop
+
+        level_states.append(frontier)
+        level_predecessors.append(predecessors[order][first].astype(np.int32))
+
+    return HopLimitedTrees(
+        roots=roots,
+        distances=distances,
+        min_hops=min_hops,
+        level_states=level_states,
+        level_predecessors=level_predecessors,
+    )
+
+
 def reconstruct_path(
     predecessors: np.ndarray,
     source_array_idx: int,
@@ -113,56 +605,142 @@ def reconstruct_path(
     idx_to_artist: dict,
 ) -> list[str] | None:
     """Reconstruct path from source to target using predecessors array."""
-    # Check if target is reachable
-    if predecessors[source_array_idx, target_idx] == NO_PATH_SENTINEL:
+    nodes, _ = reconstruct_paths_batch(
+        predecessors,
+        np.array([source_array_idx]),
+        np.array([target_idx]),
+        np.array([source_node_idx]),
+        reverse_walks=True,
+    )
+    if len(nodes) == 0:
         return None
+    return [idx_to_artist[node] for node in nodes.tolist()]
+
 
-    path = []
-    current = target_idx
+@dataclass(frozen=True)
+class PathMetricsBatch:
+    """
+    Metrics for many node paths, computed together from the CSR arrays.
+
+    Edge arrays are flat; edges of path i live in
+    edge_strengths[edge_offsets[i]:edge_offsets[i + 1]].
+    """
 
-    while current != source_node_idx:
-        path.append(idx_to_artist[current])
-        current = predecessors[source_array_idx, current]
-        if current == NO_PATH_SENTINEL:
+    edge_strengths: np.ndarray
+    edge_offsets: np.ndarray
+    total_costs: np.ndarray
+    min_strengths: np.ndarray
+    max_strengths: np.ndarray
+    avg_strengths: np.ndarray
+    valid: np.ndarray  # Path has at least one edge and all edges exist
+
+    def metrics(self, i: int) -> tuple[list[float], float, float, float, float] | None:
+        """Metrics tuple for path i, as expected by create_connection_path."""
+        if not self.valid[i]:
             return None
+        start, stop = self.edge_offsets[i], self.edge_offsets[i + 1]
+        return (
+            self.edge_strengths[start:stop].tolist(),
+            float(self.total_costs[i]),
+            float(self.min_strengths[i]),
+            float(self.max_strengths[i]),
+            float(self.avg_strengths[i]),
+        )
 
-    path.append(idx_to_artist[source_node_idx])
-    return list(reversed(path))
+
+def calculate_batch_path_metrics(
+    nodes: np.ndarray,
+    offsets: np.ndarray,
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
+) -> PathMetricsBatch:
+    """
+    Calculate metrics for many paths with vectorized CSR lookups.
+
+    Args:
+        nodes: Flat array of node indices for all paths
+        offsets: Path i is nodes[offsets[i]:offsets[i + 1]] (non-empty paths)
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
+
+    Returns:
+        PathMetricsBatch with per-path metrics
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n_paths = len(offsets) - 1
+    edge_counts = np.diff(offsets) - 1
+
+    # Every node but the last of its path starts an edge
+    is_tail = np.ones(len(nodes), dtype=bool)
+    is_tail[offsets[1:] - 1] = False
+    tails = nodes[is_tail]
+    heads = nodes[np.roll(is_tail, 1)]
+    edge_offsets = offsets - np.arange(n_paths + 1)
+    path_of_edge = np.repeat(np.arange(n_paths), edge_counts)
+
+    positions = edge_positions(graph, tails, heads)
+    missing = positions < 0
+    safe_positions = np.where(missing, 0, positions)
+    edge_strengths = np.where(missing, np.nan, strengths[safe_positions])
+    edge_costs = np.where(missing, np.nan, graph.data[safe_positions])
+
+    valid = (edge_counts > 0) & (
+        np.bincount(path_of_edge[missing], minlength=n_paths) == 0
+    )
+
+    # bincount accumulates in order, matching a sequential Python sum
+    total_costs = np.bincount(path_of_edge, weights=edge_costs, minlength=n_paths)
+    strength_sums = np.bincount(path_of_edge, weights=edge_strengths, minlength=n_paths)
+    avg_strengths = np.divide(
+        strength_sums,
+        edge_counts,
+        out=np.full(n_paths, np.nan),
+        where=edge_counts > 0,
+    )
+
+    min_strengths = np.full(n_paths, np.nan)
+    max_strengths = np.full(n_paths, np.nan)
+    has_edges = edge_counts > 0
+    if has_edges.any():
+        starts = edge_offsets[:-1][has_edges]
+        min_strengths[has_edges] = np.minimum.reduceat(edge_strengths, starts)
+        max_strengths[has_edges] = np.maximum.reduceat(edge_strengths, starts)
+
+    return PathMetricsBatch(
+        edge_strengths=edge_strengths,
+        edge_offsets=edge_offsets,
+        total_costs=total_costs,
+        min_strengths=min_strengths,
+        max_strengths=max_strengths,
+        avg_strengths=avg_strengths,
+        valid=valid,
+    )
 
 
 def calculate_path_metrics(
-    path: list[str], strength_lookup: dict[tuple[str, str], float]
+    node_path: list[int] | tuple[int, ...],
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
 ) -> tuple[list[float], float, float, float, float] | None:
     """
-    Calculate metrics for a path using pre-computed strength lookup.
+    Calculate metrics for a single path of node indices.
 
     Args:
-        path: List of artist names forming the path
-        strength_lookup: Pre-computed (source, target) -> strength mapping
+        node_path: Node indices forming the path
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
 
     Returns:
         Tuple of (path_strengths, total_cost, min_strength, max_strength, avg_strength)
         or None if path is invalid
     """
-    # Build list of strengths, checking each exists
-    strengths = []
-    for i in range(len(path) - 1):
-        strength = strength_lookup.get((path[i], path[i + 1]))
-        # Early exit if any edge is missing
-        if strength is None:
-            return None
-        strengths.append(strength)
-
-    # Early exit if no edges
-    if not strengths:
+    if not node_path:
         return None
-
-    total_cost = sum(1.0 / s for s in strengths)
-    min_strength = min(strengths)
-    max_strength = max(strengths)
-    avg_strength = sum(strengths) / len(strengths)
-
-    return strengths, total_cost, min_strength, max_strength, avg_strength
+    batch = calculate_batch_path_metrics(
+        np.asarray(node_path), np.array([0, len(node_path)]), graph, strengths
+    )
+    return batch.metrics(0)
 
 
 def create_connection_path(
@@ -193,141 +771,787 @@ def create_connection_path(
     )
 
 
+def build_reverse_graph(graph: sp.csr_matrix) -> sp.csr_matrix:
+    """
+    Build the transposed cost graph, where edge v → u costs what u → v does.
+
+    Shortest-path trees grown on the reverse graph point towards their root,
+    so a predecessor row gives the next hop from any node to that root.
+    """
+    return graph.T.tocsr()
+
+
+def choose_search_direction(direction: str, n_sources: int, n_targets: int) -> str:
+    """
+    Resolve the side to run Dijkstra from.
+
+    Args:
+        direction: "forward" (from event artists), "reverse" (from favorites)
+            or "auto" (whichever side has fewer artists)
+        n_sources: Number of event artists found in the graph
+        n_targets: Number of favorites found in the graph
+
+    Returns:
+        "forward" or "reverse"
+    """
+    if direction not in SEARCH_DIRECTIONS:
+        raise ValueError(
+            f"Unknown search direction {direction!r}, "
+            f"expected one of {sorted(SEARCH_DIRECTIONS)}"
+        )
+    if direction == "auto":
+        return "reverse" if n_targets < n_sources else "forward"
+    return direction
+
+
+def resolve_search_endpoints(
+    artist_to_idx: dict[str, int],
+    source_artists: list[str],
+    target_artists: list[str],
+    events: list[Event],
+) -> tuple[dict[int, dict], list[int]]:
+    """
+    Map search endpoints to node indices.
+
+    Args:
+        artist_to_idx: Mapping from artist name to index
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        events: List of Event objects
+
+    Returns:
+        Tuple of (source_nodes, target_indices): event info per source node
+        for event artists in the graph, and sorted favorite node indices
+    """
+    # Build event lookup using dict comprehension
+    event_lookup = {
+        artist.name: {
+            "name": event.name,
+            "venue": event.venue,
+            "url": event.ticket_url,
+        }
+        for event in events
+        for artist in event.artists
+    }
+
+    # Filter to artists that exist in graph and play an event
+    source_nodes = {
+        artist_to_idx[artist]: event_lookup[artist]
+        for artist in source_artists
+        if artist in artist_to_idx and artist in event_lookup
+    }
+
+    # Get target indices (sorted for a deterministic search order)
+    target_indices = sorted(
+        {artist_to_idx[artist] for artist in target_artists if artist in artist_to_idx}
+    )
+    return source_nodes, target_indices
+
+
 def find_optimal_paths(
     graph: sp.csr_matrix,
     artist_to_idx: dict[str, int],
     idx_to_artist: dict[int, str],
     source_artists: list[str],
     target_artists: list[str],
-    strength_lookup: dict[tuple[str, str], float],
+    strengths: np.ndarray,
     events: list[Event],
     max_paths_per_pair: int = 3,
+    *,
+    direction: str = "auto",
+    reverse_graph: sp.csr_matrix | None = None,
+    memory_budget_bytes: int | None = None,
+    workers: int = 1,
+    max_hops: int | None = None,
+    max_cost: float | None = None,
 ) -> list[ArtistPairConnections]:
     """
     Find optimal paths from source artists to target artists.
 
+    Dijkstra runs from whichever side is smaller: from the event artists on
+    the cost graph, or from the favorites on the reverse graph. Both produce
+    the same connections whenever shortest paths are unique.
+
+    With a memory budget, trees are computed in chunks sized so their
+    distance and predecessor rows fit the budget. Each chunk's paths are
+    folded into the per-pair top-k heaps before the next chunk runs, so
+    the result does not depend on the budget.
+
+    max_hops and max_cost bound the search itself: Dijkstra stops at
+    max_cost, and with max_hops the trees come from a hop-limited min-plus
+    relaxation (hop_limited_search). Returned paths, alternatives
+    included, are the cheapest ones within both bounds.
+
     Args:
         graph: Sparse CSR matrix with edge costs
         artist_to_idx: Mapping from artist name to index
         idx_to_artist: Mapping from index to artist name
         source_artists: List of event artist names
         target_artists: List of favorite artist names
-        strength_lookup: Pre-computed (source, target) -> strength mapping
+        strengths: Relationship strengths aligned with graph.data
         events: List of Event objects
-        max_paths_per_pair: Maximum paths to keep per event artist → favorite pair
+        max_paths_per_pair: Maximum paths to keep per event artist → favorite pair.
+            Values above 1 add ranked loopless alternatives (Yen's algorithm)
+            behind each shortest path.
+        direction: "auto", "forward" or "reverse" (see choose_search_direction)
+        reverse_graph: Pre-built build_reverse_graph(graph), if available
+        memory_budget_bytes: Cap on Dijkstra's working matrices, or None to
+            search all trees in one call (see search_chunk_rows)
+        workers: Worker processes; above 1, chunks of trees are searched in
+            a process pool over shared-memory graphs with identical results,
+            if the search is large enough (see MIN_PARALLEL_SEARCH_WORK)
+        max_hops: Maximum number of edges per path, or None for no limit
+        max_cost: Maximum total path cost, or None for no limit
 
     Returns:
         List of ArtistPairConnections objects, sorted by best_avg_strength (descending)
     """
-    # Filter to artists that exist in graph (using list comprehension)
-    valid_sources = [
-        (artist, artist_to_idx[artist])
-        for artist in source_artists
-        if artist in artist_to_idx
-    ]
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
 
-    # Early exit if no valid sources
-    if not valid_sources:
+    # Early exit if either side is empty
+    if not source_nodes or not target_indices:
         return []
 
-    # Extract indices
-    source_artists_valid, source_indices = zip(*valid_sources, strict=True)
-    source_idx_to_artist = dict(
-        zip(source_indices, source_artists_valid, strict=True)
+    direction = choose_search_direction(
+        direction, len(source_nodes), len(target_indices)
+    )
+    if reverse_graph is None and (direction == "reverse" or max_paths_per_pair > 1):
+        reverse_graph = build_reverse_graph(graph)
+
+    source_array = np.fromiter(source_nodes, dtype=np.int64)
+    target_array = np.array(target_indices, dtype=np.int64)
+    if direction == "forward":
+        roots, leaves = source_array, target_array
+        tree_graph, yen_graph = graph, reverse_graph
+    else:
+        roots, leaves = target_array, source_array
+        tree_graph, yen_graph = reverse_graph, graph
+    if max_paths_per_pair == 1:
+        yen_graph = None
+    forward = direction == "forward"
+    bounds = SearchBounds(max_hops=max_hops, max_cost=max_cost)
+
+    # With workers, the budget is shared between the trees in flight, and
+    # each worker gets several chunks so uneven chunks balance out
+    workers = max(1, min(workers, len(roots)))
+    if len(roots) * graph.shape[0] < MIN_PARALLEL_SEARCH_WORK:
+        # Too small to pay for starting the pool
+        workers = 1
+    chunk_rows = search_chunk_rows(
+        graph.shape[0],
+        len(roots),
+        memory_budget_bytes // workers if memory_budget_bytes else None,
+    )
+    if workers > 1:
+        balanced_rows = -(-len(roots) // (workers * CHUNKS_PER_WORKER))
+        chunk_rows = min(chunk_rows, balanced_rows)
+    chunks = [
+        roots[start : start + chunk_rows] for start in range(0, len(roots), chunk_rows)
+    ]
+    logger.debug(
+        "Searching %d trees in %d chunks with %d workers",
+        len(roots),
+        len(chunks),
+        workers,
     )
 
-    # Get target indices (using set comprehension)
-    target_indices = {
-        artist_to_idx[artist]
-        for artist in target_artists
-        if artist in artist_to_idx
-    }
+    if workers > 1 and len(chunks) > 1:
+        chunk_results = _search_chunks_in_pool(
+            tree_graph,
+            yen_graph,
+            chunks,
+            leaves,
+            max_paths_per_pair=max_paths_per_pair,
+            forward=forward,
+            bounds=bounds,
+            workers=workers,
+        )
+    else:
+        yen_adjacency = build_adjacency(yen_graph) if yen_graph is not None else None
+        chunk_results = (
+            _search_tree_chunk(
+                tree_graph,
+                chunk,
+                leaves,
+                yen_adjacency,
+                max_paths_per_pair=max_paths_per_pair,
+                forward=forward,
+                bounds=bounds,
+            )
+            for chunk in chunks
+        )
 
-    # Early exit if no valid targets
-    if not target_indices:
-        return []
+    # Each chunk's trees are folded into the pair heaps and then dropped,
+    # so only chunk_rows distance/predecessor rows are alive per process.
+    # Chunks are folded in order, so the result never depends on workers.
+    pair_paths: PairPathHeaps = {}
+    for path_sources, nodes, offsets in chunk_results:
+        _fold_found_paths(
+            pair_paths,
+            path_sources,
+            nodes,
+            offsets,
+            source_nodes=source_nodes,
+            graph=graph,
+            strengths=strengths,
+            idx_to_artist=idx_to_artist,
+            max_paths_per_pair=max_paths_per_pair,
+        )
 
-    # Run Dijkstra from all sources
-    distances, predecessors = dijkstra(
-        graph, indices=source_indices, return_predecessors=True
+    return build_grouped_connections(pair_paths)
+
+
+def _search_chunks_in_pool(
+    tree_graph: sp.csr_matrix,
+    yen_graph: sp.csr_matrix | None,
+    chunks: list[np.ndarray],
+    leaves: np.ndarray,
+    *,
+    max_paths_per_pair: int,
+    forward: bool,
+    bounds: SearchBounds,
+    workers: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Run _search_tree_chunk for every chunk in a process pool.
+
+    The graphs are placed in shared memory once and attached by every
+    worker; only root chunks go out and compact integer path arrays come
+    back.
+
+    Yields:
+        Chunk results in the order of chunks
+    """
+    with ExitStack() as stack:
+        tree_shared = stack.enter_context(SharedCSR(tree_graph))
+        yen_shared = (
+            stack.enter_context(SharedCSR(yen_graph)) if yen_graph is not None else None
+        )
+        executor = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=partial(
+                    _init_search_worker,
+                    tree_shared.spec,
+                    yen_shared.spec if yen_shared else None,
+                    leaves,
+                    max_paths_per_pair=max_paths_per_pair,
+                    forward=forward,
+                    bounds=bounds,
+                ),
+            )
+        )
+        yield from executor.map(_search_chunk_in_worker, chunks)
+
+
+# Per-process state of pool workers, set up by _init_search_worker
+_worker_state: dict = {}
+
+
+def _init_search_worker(
+    tree_spec: SharedCSRSpec,
+    yen_spec: SharedCSRSpec | None,
+    leaves: np.ndarray,
+    *,
+    max_paths_per_pair: int,
+    forward: bool,
+    bounds: SearchBounds,
+):
+    """Attach a pool worker to the shared graphs."""
+    tree_graph, segments = attach_csr(tree_spec)
+    yen_adjacency = None
+    if yen_spec is not None:
+        yen_graph, yen_segments = attach_csr(yen_spec)
+        yen_adjacency = build_adjacency(yen_graph)
+        segments += yen_segments
+
+    _worker_state.update(
+        tree_graph=tree_graph,
+        yen_adjacency=yen_adjacency,
+        leaves=leaves,
+        max_paths_per_pair=max_paths_per_pair,
+        forward=forward,
+        bounds=bounds,
+        # Keep the mappings alive for as long as the graphs are used
+        segments=segments,
     )
 
-    # Build event lookup using dict comprehension
-    event_lookup = {
-        artist.name: {
-            "name": event.name,
-            "venue": event.venue,
-            "url": event.ticket_url,
-        }
-        for event in events
-        for artist in event.artists
-    }
 
-    # Initialize heap storage for each (event_artist, favorite_artist) pair
-    # Use min heap with negated path_score to simulate max heap
-    pair_paths: dict[tuple[str, str], list[tuple[float, ConnectionPath]]] = {}
+def _search_chunk_in_worker(
+    roots: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pool task: search one chunk of roots against the shared graphs."""
+    state = _worker_state
+    return _search_tree_chunk(
+        state["tree_graph"],
+        roots,
+        state["leaves"],
+        state["yen_adjacency"],
+        max_paths_per_pair=state["max_paths_per_pair"],
+        forward=state["forward"],
+        bounds=state["bounds"],
+    )
+
+
+def search_chunk_rows(
+    n_nodes: int,
+    n_roots: int,
+    memory_budget_bytes: int | None = None,
+) -> int:
+    """
+    Number of shortest-path trees to compute per Dijkstra call.
+
+    Every tree keeps a float64 distance row and an int32 predecessor row
+    over all nodes. Without a budget all trees are computed at once; with
+    one, at least one tree is always computed per call.
+
+    Args:
+        n_nodes: Number of nodes in the graph
+        n_roots: Number of trees to compute
+        memory_budget_bytes: Cap on the distance/predecessor matrices
+
+    Returns:
+        Rows per chunk, between 1 and max(n_roots, 1)
+    """
+    if memory_budget_bytes is None:
+        return max(n_roots, 1)
+    per_row = max(n_nodes, 1) * TREE_ROW_BYTES_PER_NODE
+    return max(1, min(n_roots, memory_budget_bytes // per_row))
+
+
+def _search_tree_chunk(
+    tree_graph: sp.csr_matrix,
+    roots: np.ndarray,
+    leaves: np.ndarray,
+    yen_adjacency: Adjacency | None,
+    *,
+    max_paths_per_pair: int,
+    forward: bool,
+    bounds: SearchBounds,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Grow shortest-path trees from a batch of roots and extract their paths.
+
+    Alternative paths run Yen's algorithm against the tree direction, so
+    each root's shortest-path tree doubles as the spur-search guide.
+
+    Returns:
+        Tuple of (path_sources, nodes, offsets) in the layout of
+        reconstruct_paths_batch, with the event artist of every path
+    """
+    if bounds.max_hops is None:
+        distances, predecessors = dijkstra(
+            tree_graph,
+            indices=roots,
+            return_predecessors=True,
+            limit=bounds.cost_limit,
+        )
+        min_hops = None
+    else:
+        trees = hop_limited_search(tree_graph, roots, bounds.max_hops, bounds.max_cost)
+        distances, min_hops = trees.distances, trees.min_hops
+        # Hop-limited trees have no consistent predecessor row
+        predecessors = None
+
+    # Every connected (root, leaf) pair, in root-major order
+    pair_rows, pair_cols = np.nonzero(np.isfinite(distances[:, leaves]))
+    pair_roots = roots[pair_rows]
+    pair_leaves = leaves[pair_cols]
+    pair_sources = pair_roots if forward else pair_leaves
+
+    # Forward trees are walked target → source and stored reversed;
+    # reverse trees already walk source → target
+    if predecessors is None:
+        nodes, offsets = trees.paths(pair_rows, pair_leaves, reverse_walks=forward)
+    else:
+        nodes, offsets = reconstruct_paths_batch(
+            predecessors,
+            pair_rows,
+            pair_leaves,
+            pair_roots,
+            reverse_walks=forward,
+        )
+
+    if yen_adjacency is not None:
+        return _add_alternative_paths(
+            yen_adjacency,
+            distances,
+            predecessors,
+            pair_rows,
+            pair_sources,
+            nodes=nodes,
+            offsets=offsets,
+            max_paths_per_pair=max_paths_per_pair,
+            against_tree=forward,
+            bounds=bounds,
+            min_hops=min_hops,
+        )
+    return pair_sources, nodes, offsets
+
+
+def _add_alternative_paths(
+    yen_adjacency: Adjacency,
+    distances: np.ndarray,
+    predecessors: np.ndarray | None,
+    pair_rows: np.ndarray,
+    pair_sources: np.ndarray,
+    *,
+    nodes: np.ndarray,
+    offsets: np.ndarray,
+    max_paths_per_pair: int,
+    against_tree: bool,
+    bounds: SearchBounds,
+    min_hops: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extend each shortest path with Yen's ranked loopless alternatives.
 
-    for source_array_idx, source_idx in enumerate(source_indices):
-        source_artist = source_idx_to_artist[source_idx]
+    Yen walks leaf → root on yen_adjacency, guided by the pair's tree row
+    (predecessors, or min_hops for hop-limited trees). With against_tree,
+    paths are flipped into and out of that orientation.
 
-        # Get event info
-        event_info = event_lookup.get(source_artist)
-        if not event_info:
+    Returns:
+        Tuple of (path_sources, nodes, offsets) covering all paths
+    """
+    path_sources: list[int] = []
+    node_paths: list[tuple[int, ...]] = []
+    tree_row = -1
+    tree_successors = tree_min_hops = None
+    all_nodes = nodes.tolist()
+    all_offsets = offsets.tolist()
+
+    for i, (row, source_idx) in enumerate(
+        zip(pair_rows.tolist(), pair_sources.tolist(), strict=True)
+    ):
+        first_path = tuple(all_nodes[all_offsets[i] : all_offsets[i + 1]])
+        if len(first_path) <= 1:
             continue
 
-        for target_idx in target_indices:
-            # Check if target is reachable
-            if distances[source_array_idx, target_idx] == np.inf:
-                continue
+        # Pairs arrive root-major, so each tree row is converted once
+        if row != tree_row:
+            tree_row = row
+            tree_distances = distances[row].tolist()
+            if predecessors is not None:
+                tree_successors = predecessors[row].tolist()
+            if min_hops is not None:
+                tree_min_hops = min_hops[row].tolist()
+
+        for _, path in yen_k_shortest_paths(
+            yen_adjacency,
+            first_path[::-1] if against_tree else first_path,
+            max_paths_per_pair,
+            tree_distances,
+            tree_successors,
+            cost_limit=bounds.cost_limit,
+            max_hops=bounds.max_hops,
+            min_hops=tree_min_hops,
+        ):
+            path_sources.append(source_idx)
+            node_paths.append(path[::-1] if against_tree else path)
+
+    lengths = np.fromiter((len(path) for path in node_paths), dtype=np.int64)
+    offsets = np.zeros(len(node_paths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    nodes = np.fromiter(
+        (node for path in node_paths for node in path),
+        dtype=np.int32,
+        count=int(offsets[-1]),
+    )
+    return np.array(path_sources, dtype=np.int64), nodes, offsets
+
 
-            # Reconstruct path
-            path = reconstruct_path(
-                predecessors, source_array_idx, source_idx, target_idx, idx_to_artist
-            )
-            if not path:
-                continue
-
-            # Calculate metrics using pre-computed lookup
-            metrics = calculate_path_metrics(path, strength_lookup)
-            if not metrics:
-                continue
-
-            # Create connection
-            connection = create_connection_path(
-                path,
-                metrics,
-                event_info["name"],
-                event_info["venue"],
-                event_info["url"],
-            )
+def label_nearest_favorites(
+    reverse_graph: sp.csr_matrix,
+    favorite_indices: list[int],
+    favorites_per_node: int = 1,
+    stop_nodes: set[int] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Label nodes with their nearest favorites in one multi-source search.
+
+    All favorites seed a single Dijkstra on the reverse graph. With one
+    favorite per node this is scipy's min_only search; with more, each node
+    keeps a bounded list of labels with distinct favorites, settled in
+    distance order, and full nodes stop propagating worse labels.
+
+    Args:
+        reverse_graph: Transposed cost graph (see build_reverse_graph)
+        favorite_indices: Node indices of the favorites
+        favorites_per_node: Labels to keep per node (m)
+        stop_nodes: Stop early once these nodes are fully labeled (m > 1 only)
+
+    Returns:
+        Tuple of (distances, favorites, next_nodes, next_slots), each of
+        shape (n_nodes, m) and ordered nearest first per node. Label j of
+        node v leads to next_nodes[v, j] where it continues as label
+        next_slots[v, j]; favorites and next_nodes are NO_PATH_SENTINEL
+        where a node has fewer labels or a label sits on its own favorite.
+    """
+    n_nodes = reverse_graph.shape[0]
+    m = favorites_per_node
+
+    if m == 1:
+        distances, next_nodes, favorites = dijkstra(
+            reverse_graph,
+            indices=favorite_indices,
+            min_only=True,
+            return_predecessors=True,
+        )
+        next_slots = np.zeros(n_nodes, dtype=np.int32)
+        return (
+            distances[:, None],
+            favorites.astype(np.int32)[:, None],
+            next_nodes.astype(np.int32)[:, None],
+            next_slots[:, None],
+        )
+
+    distances = np.full((n_nodes, m), np.inf)
+    favorites = np.full((n_nodes, m), NO_PATH_SENTINEL, dtype=np.int32)
+    next_nodes = np.full((n_nodes, m), NO_PATH_SENTINEL, dtype=np.int32)
+    next_slots = np.zeros((n_nodes, m), dtype=np.int32)
+
+    indptr, indices, data = build_adjacency(reverse_graph)
+    counts = [0] * n_nodes
+    settled: list[set[int]] = [set() for _ in range(n_nodes)]
+    remaining = len(stop_nodes) if stop_nodes else -1
+
+    # Heap entries: (distance, favorite, node, next_node, next_slot)
+    heap = [
+        (0.0, fav, fav, NO_PATH_SENTINEL, 0) for fav in sorted(set(favorite_indices))
+    ]
+    heapq.heapify(heap)
+
+    while heap and remaining != 0:
+        dist, fav, node, nxt, nxt_slot = heapq.heappop(heap)
+        if counts[node] == m or fav in settled[node]:
+            continue
+
+        slot = counts[node]
+        counts[node] += 1
+        settled[node].add(fav)
+        distances[node, slot] = dist
+        favorites[node, slot] = fav
+        next_nodes[node, slot] = nxt
+        next_slots[node, slot] = nxt_slot
+        if stop_nodes and counts[node] == m and node in stop_nodes:
+            remaining -= 1
+
+        for pos in range(indptr[node], indptr[node + 1]):
+            neighbor = indices[pos]
+            if counts[neighbor] < m and fav not in settled[neighbor]:
+                heapq.heappush(heap, (dist + data[pos], fav, neighbor, node, slot))
+
+    return distances, favorites, next_nodes, next_slots
+
+
+def find_nearest_favorites(
+    graph: sp.csr_matrix,
+    artist_to_idx: dict[str, int],
+    idx_to_artist: dict[int, str],
+    source_artists: list[str],
+    target_artists: list[str],
+    *,
+    strengths: np.ndarray,
+    events: list[Event],
+    favorites_per_artist: int = 1,
+    reverse_graph: sp.csr_matrix | None = None,
+) -> list[ArtistPairConnections]:
+    """
+    Find the closest favorite(s) for each event artist.
+
+    Unlike find_optimal_paths, which connects every event artist to every
+    favorite, this runs a single traversal seeded from all favorites at once
+    (see label_nearest_favorites). An event artist who is itself a favorite
+    is its own nearest favorite and yields no path for that label.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        artist_to_idx: Mapping from artist name to index
+        idx_to_artist: Mapping from index to artist name
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        strengths: Relationship strengths aligned with graph.data
+        events: List of Event objects
+        favorites_per_artist: Nearest favorites to report per event artist
+        reverse_graph: Pre-built build_reverse_graph(graph), if available
 
-            # Get or create heap for this pair
-            pair_key = (connection.event_artist, connection.favorite_artist)
-            if pair_key not in pair_paths:
-                pair_paths[pair_key] = []
+    Returns:
+        List of ArtistPairConnections (one path each), sorted by
+        best_avg_strength (descending)
+    """
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
 
-            heap = pair_paths[pair_key]
+    if not source_nodes or not target_indices:
+        return []
 
-            # Add to heap: use negative score for max heap behavior
-            if len(heap) < max_paths_per_pair:
-                heapq.heappush(heap, (-connection.path_score, connection))
-            elif connection.path_score > -heap[0][0]:  # Better than worst
-                heapq.heapreplace(heap, (-connection.path_score, connection))
-            # else: discard the connection (optimization)
+    if reverse_graph is None:
+        reverse_graph = build_reverse_graph(graph)
+
+    distances, _, next_nodes, next_slots = label_nearest_favorites(
+        reverse_graph,
+        target_indices,
+        favorites_per_node=favorites_per_artist,
+        stop_nodes=set(source_nodes),
+    )
+
+    # Label chains form one tree over (node, slot) states, numbered
+    # node * m + slot, so all chains unwind in a single batch walk
+    m = favorites_per_artist
+    state_predecessors = np.where(
+        next_nodes == NO_PATH_SENTINEL,
+        NO_PATH_SENTINEL,
+        next_nodes.astype(np.int64) * m + next_slots,
+    ).reshape(1, -1)
+
+    source_array = np.fromiter(source_nodes, dtype=np.int64)
+    label_sources, label_slots = np.nonzero(np.isfinite(distances[source_array]))
+    path_sources = source_array[label_sources]
+
+    states, offsets = reconstruct_paths_batch(
+        state_predecessors,
+        np.zeros(len(path_sources), dtype=np.int64),
+        path_sources * m + label_slots,
+    )
+    nodes = (states // m).astype(np.int32)
+
+    return group_found_paths(
+        path_sources,
+        nodes,
+        offsets,
+        source_nodes,
+        graph,
+        strengths=strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=1,
+    )
+
+
+def group_found_paths(
+    path_sources: np.ndarray,
+    nodes: np.ndarray,
+    offsets: np.ndarray,
+    source_nodes: dict[int, dict],
+    graph: sp.csr_matrix,
+    *,
+    strengths: np.ndarray,
+    idx_to_artist: dict[int, str],
+    max_paths_per_pair: int,
+) -> list[ArtistPairConnections]:
+    """
+    Score found node paths in one batch and group them per artist pair.
+
+    Args:
+        path_sources: Event artist node of every path
+        nodes: Flat node ids of all paths (see reconstruct_paths_batch)
+        offsets: Path i is nodes[offsets[i]:offsets[i + 1]]; empty paths
+            are skipped
+        source_nodes: Event info per event artist node
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
+        idx_to_artist: Mapping from index to artist name
+        max_paths_per_pair: Maximum paths to keep per artist pair
 
-    # Build grouped connections from heaps
+    Returns:
+        List of ArtistPairConnections, sorted by best_avg_strength (descending)
+    """
+    pair_paths: PairPathHeaps = {}
+    _fold_found_paths(
+        pair_paths,
+        path_sources,
+        nodes,
+        offsets,
+        source_nodes=source_nodes,
+        graph=graph,
+        strengths=strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=max_paths_per_pair,
+    )
     return build_grouped_connections(pair_paths)
 
 
+def _fold_found_paths(
+    pair_paths: PairPathHeaps,
+    path_sources: np.ndarray,
+    nodes: np.ndarray,
+    offsets: np.ndarray,
+    *,
+    source_nodes: dict[int, dict],
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
+    idx_to_artist: dict[int, str],
+    max_paths_per_pair: int,
+) -> None:
+    """Score found node paths in one batch and push them into pair heaps."""
+    if len(path_sources) == 0:
+        return
+
+    # Drop unreachable pairs; their paths are empty, so nodes is unchanged
+    non_empty = np.flatnonzero(np.diff(offsets) > 0)
+    path_sources = path_sources[non_empty]
+    offsets = np.append(offsets[non_empty], offsets[-1])
+
+    batch = calculate_batch_path_metrics(nodes, offsets, graph, strengths)
+
+    all_nodes = nodes.tolist()
+    all_offsets = offsets.tolist()
+
+    for i, source_idx in enumerate(path_sources.tolist()):
+        metrics = batch.metrics(i)
+        if not metrics:
+            continue
+
+        # Names are only resolved for paths that make it into a connection
+        event_info = source_nodes[source_idx]
+        connection = create_connection_path(
+            [
+                idx_to_artist[node]
+                for node in all_nodes[all_offsets[i] : all_offsets[i + 1]]
+            ],
+            metrics,
+            event_info["name"],
+            event_info["venue"],
+            event_info["url"],
+        )
+        _push_pair_path(pair_paths, connection, max_paths_per_pair)
+
+
+def _push_pair_path(
+    pair_paths: PairPathHeaps,
+    connection: ConnectionPath,
+    max_paths_per_pair: int,
+) -> None:
+    """Add a connection to its pair heap, keeping only the best paths."""
+    # Get or create heap for this pair
+    pair_key = (connection.event_artist, connection.favorite_artist)
+    if pair_key not in pair_paths:
+        pair_paths[pair_key] = []
+
+    heap = pair_paths[pair_key]
+
+    # Add to heap: use negative score for max heap behavior, with the path
+    # itself as a deterministic tie-breaker between equal scores
+    entry = (-connection.path_score, connection.path, connection)
+    if len(heap) < max_paths_per_pair:
+        heapq.heappush(heap, entry)
+    elif connection.path_score > -heap[0][0]:  # Better than worst
+        heapq.heapreplace(heap, entry)
+    # else: discard the connection (optimization)
+
+
 def build_grouped_connections(
-    pair_paths: dict[tuple[str, str], list[tuple[float, ConnectionPath]]],
+    pair_paths: PairPathHeaps,
 ) -> list[ArtistPairConnections]:
     """
     Build ArtistPairConnections objects from heap storage.
 
     Args:
         pair_paths: Dict mapping (event_artist, favorite_artist) to heap of paths
-                    Each heap contains tuples of (-path_score, ConnectionPath)
+                    Each heap contains tuples of (-path_score, path, ConnectionPath)
 
     Returns:
         List of ArtistPairConnections, sorted by best_avg_strength (descending)
@@ -336,10 +1560,10 @@ def build_grouped_connections(
 
     for _pair_key, heap in pair_paths.items():
         # Extract ConnectionPath objects from heap tuples
-        paths = [conn for _, conn in heap]
+        paths = [conn for _, _, conn in heap]
 
         # Sort by path_score descending (heap doesn't maintain full order)
-        paths.sort(key=lambda p: p.path_score, reverse=True)
+        paths.sort(key=lambda p: (-p.path_score, p.path))
 
         # Early exit if no paths (shouldn't happen, but defensive)
         if not paths:
@@ -358,7 +1582,10 @@ def build_grouped_connections(
         )
         grouped_connections.append(grouped_conn)
 
-    # Sort by best_avg_strength descending (pairs with stronger connections first)
-    grouped_connections.sort(key=lambda g: g.best_avg_strength, reverse=True)
+    # Sort by best_avg_strength descending (pairs with stronger connections
+    # first), then by names so the order never depends on search order
+    grouped_connections.sort(
+        key=lambda g: (-g.best_avg_strength, g.event_artist, g.favorite_artist)
+    )
 
     return grouped_connections
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Ad-hoc "how is X connected to Y" lookups.
+
+Answers single artist pair queries against the compiled similarity graph
+with a landmark-guided bidirectional A* search, without running the batch
+connection pipeline.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+from src.artist_connection_search import (
+    calculate_path_metrics,
+    create_connection_path,
+)
+from src.graph_cache import CompiledGraph, load_compiled_graph
+from src.landmark_index import LandmarkIndex, alt_shortest_path, load_landmark_index
+from src.models import ConnectionPath, Event
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionQuery:
+    """Point-to-point connection queries over a compiled graph."""
+
+    def __init__(self, compiled_graph: CompiledGraph, landmarks: LandmarkIndex):
+        """
+        Prepare a compiled graph and its landmark index for queries.
+
+        Args:
+            compiled_graph: Graph from graph_cache.load_compiled_graph
+            landmarks: Landmark index built over compiled_graph.graph
+        """
+        self.compiled_graph = compiled_graph
+        self.landmarks = landmarks
+        self.artist_to_idx = compiled_graph.artist_to_idx
+
+    @classmethod
+    def load(cls, similar_artists_file: Path) -> "ConnectionQuery":
+        """Load (compiling or indexing if needed) the graph for a map file."""
+        compiled_graph = load_compiled_graph(similar_artists_file)
+        return cls(compiled_graph, load_landmark_index(compiled_graph))
+
+    def find_path(
+        self,
+        event_artist: str,
+        favorite_artist: str,
+        event: Event | None = None,
+    ) -> ConnectionPath | None:
+        """
+        Find the best path from one artist to another.
+
+        Args:
+            event_artist: Artist the path starts at
+            favorite_artist: Artist the path ends at
+            event: Event to attach to the connection, if any
+
+        Returns:
+            The cheapest ConnectionPath, or None if either artist is unknown
+            or no path exists
+        """
+        source = self.artist_to_idx.get(event_artist)
+        target = self.artist_to_idx.get(favorite_artist)
+        if source is None or target is None:
+            return None
+
+        graph = self.compiled_graph.graph
+        found = alt_shortest_path(
+            graph, self.compiled_graph.reverse_graph, self.landmarks, source, target
+        )
+        if found is None:
+            return None
+
+        _, node_path = found
+        metrics = calculate_path_metrics(
+            node_path, graph, self.compiled_graph.strengths
+        )
+        if metrics is None:
+            return None
+
+        names = self.compiled_graph.names
+        return create_connection_path(
+            [names[node] for node in node_path],
+            metrics,
+            event.name if event else "",
+            event.venue if event else None,
+            event.ticket_url if event else "",
+        )
+
+
+def main():
+    """Look up the connection between two artists."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.connection_query",
+        description="Show the best connection from one artist to another.",
+    )
+    parser.add_argument("event_artist", help="Artist the path starts at")
+    parser.add_argument("favorite_artist", help="Artist the path ends at")
+    parser.add_argument(
+        "--similar-artists-file",
+        type=Path,
+        default=Path("output") / "similar_artists_map.json",
+        help="Similarity map JSON (default: output/similar_artists_map.json)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    query = ConnectionQuery.load(args.similar_artists_file)
+    connection = query.find_path(args.event_artist, args.favorite_artist)
+    if connection is None:
+        logger.info(
+            "No connection from %s to %s", args.event_artist, args.favorite_artist
+        )
+        return
+
+    logger.info(" → ".join(connection.path))
+    logger.info(
+        "%d hops, total cost %.4f, avg strength %.2f (%s)",
+        connection.hops,
+        connection.total_cost,
+        connection.avg_strength,
+        connection.tier,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Resident connection query service.
+
+A one-off run of find_event_connections spends most of its time on
+interpreter startup, imports and loading the graph before a few hundred
+milliseconds of search. This service loads the compiled graph, the
+favorites and their shortest path trees once and answers queries over
+local HTTP:
+
+    POST /connections  {"events": [...]} (an events file) or
+                       {"artists": [...]}, optionally with
+                       "max_paths_per_pair" and "max_cost"
+    GET  /health
+
+Responses list ArtistPairConnections as in the summary JSON report. A
+background thread polls the similarity map and favorites files and
+hot-reloads on change; queries keep using the previous graph until the
+new one is ready.
+"""
+
+import argparse
+import json
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.artist_connection_search import find_optimal_paths
+from src.data_loader import load_artist_list, parse_events
+from src.favorite_trees import (
+    FAVORITE_TREES_DIR,
+    FavoriteTrees,
+    find_connections_from_trees,
+    load_favorite_trees,
+)
+from src.graph_cache import GRAPH_CACHE_DIR, CompiledGraph, load_compiled_graph
+from src.models import Artist, ArtistPairConnections, Event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RELOAD_POLL_SECONDS = 2.0
+MAX_REQUEST_BYTES = 16 << 20
+# Alternatives run a Yen search per pair, so queries may only ask for a few
+MAX_PATHS_PER_PAIR = 10
+SEARCH_MEMORY_BUDGET_BYTES = 1 << 30
+
+
+@dataclass(frozen=True)
+class ServiceState:
+    """Everything a query needs, swapped as a whole on reload."""
+
+    compiled_graph: CompiledGraph
+    artist_to_idx: dict[str, int]
+    idx_to_artist: dict[int, str]
+    favorites: list[str]
+    trees: FavoriteTrees
+    file_stamps: tuple[tuple[int, int], ...]  # (mtime_ns, size) per file
+
+
+def _file_stamp(filepath: Path) -> tuple[int, int]:
+    """Cheap change marker for a file."""
+    stat = filepath.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConnectionService:
+    """Connection queries over a graph kept in memory between requests."""
+
+    def __init__(
+        self,
+        similar_artists_file: Path,
+        favorites_file: Path,
+        *,
+        cache_dir: Path = GRAPH_CACHE_DIR,
+        trees_dir: Path = FAVORITE_TREES_DIR,
+    ):
+        """
+        Load the graph, favorites and favorite trees.
+
+        Args:
+            similar_artists_file: Path to similar_artists_map.json
+            favorites_file: Favorite artists JSON
+            cache_dir: Root directory for compiled graphs
+            trees_dir: Directory of the cached favorite trees
+        """
+        self.similar_artists_file = similar_artists_file
+        self.favorites_file = favorites_file
+        self.cache_dir = cache_dir
+        self.trees_dir = trees_dir
+        self._reload_lock = threading.Lock()
+        self.state = self._load()
+
+    def _stamps(self) -> tuple[tuple[int, int], ...]:
+        """Current change markers of the input files."""
+        return (
+            _file_stamp(self.similar_artists_file),
+            _file_stamp(self.favorites_file),
+        )
+
+    def _load(self) -> ServiceState:
+        """Load a fresh state from the files on disk."""
+        stamps = self._stamps()
+        compiled_graph = load_compiled_graph(self.similar_artists_file, self.cache_dir)
+        favorites = load_artist_list(self.favorites_file)
+        trees = load_favorite_trees(
+            compiled_graph,
+            favorites,
+            self.trees_dir,
+            memory_budget_bytes=SEARCH_MEMORY_BUDGET_BYTES,
+        )
+        logger.info(
+            "Serving %d artists and %d favorites (graph %s)",
+            len(compiled_graph.names),
+            len(favorites),
+            compiled_graph.source_hash[:12],
+        )
+        return ServiceState(
+            compiled_graph=compiled_graph,
+            artist_to_idx=compiled_graph.artist_to_idx,
+            idx_to_artist=compiled_graph.idx_to_artist,
+            favorites=favorites,
+            trees=trees,
+            file_stamps=stamps,
+        )
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the state if the map or favorites file changed.
+
+        A failed reload (say, a map caught mid-write) keeps the current
+        state and is retried on the next call.
+
+        Returns:
+            True if a new state was loaded
+        """
+        with self._reload_lock:
+            try:
+                if self._stamps() == self.state.file_stamps:
+                    return False
+                logger.info("Input files changed, reloading")
+                self.state = self._load()
+            except (OSError, ValueError, KeyError):
+                logger.exception("Reload failed, keeping the current graph")
+                return False
+            return True
+
+    def find_connections(
+        self,
+        events: list[Event],
+        *,
+        max_paths_per_pair: int = 1,
+        max_cost: float | None = None,
+    ) -> list[ArtistPairConnections]:
+        """
+        Connect the artists of some events to the favorites.
+
+        The best path per pair comes straight from the favorite trees;
+        asking for alternatives runs the full search.
+
+        Args:
+            events: Events whose artists to connect
+            max_paths_per_pair: Paths to return per event artist → favorite pair
+            max_cost: Only keep paths whose total cost is at most this
+
+        Returns:
+            List of ArtistPairConnections, sorted by best_avg_strength (descending)
+        """
+        state = self.state
+        compiled_graph = state.compiled_graph
+        event_artists = sorted({a.name for event in events for a in event.artists})
+        args = (
+            compiled_graph.graph,
+            state.artist_to_idx,
+            state.idx_to_artist,
+            event_artists,
+        )
+        kwargs = {
+            "target_artists": state.favorites,
+            "strengths": compiled_graph.strengths,
+            "events": events,
+            "max_cost": max_cost,
+        }
+        if max_paths_per_pair == 1:
+            return find_connections_from_trees(state.trees, *args, **kwargs)
+        return find_optimal_paths(
+            *args,
+            **kwargs,
+            max_paths_per_pair=max_paths_per_pair,
+            reverse_graph=compiled_graph.reverse_graph,
+            memory_budget_bytes=SEARCH_MEMORY_BUDGET_BYTES,
+        )
+
+    def watch(self, stop: threading.Event, interval: float = RELOAD_POLL_SECONDS):
+        """Poll for input changes until stop is set."""
+        while not stop.wait(interval):
+            self.reload_if_changed()
+
+
+def parse_query(body: dict) -> tuple[list[Event], int, float | None]:
+    """
+    Read a connection query's events and options.
+
+    Args:
+        body: Parsed request JSON, with "events" in the events file format
+            or "artists" as a list of artist names
+
+    Returns:
+        Tuple of (events, max_paths_per_pair, max_cost)
+
+    Raises:
+        ValueError: If the query is malformed
+    """
+    try:
+        if "events" in body:
+            events = parse_events(body)
+        elif "artists" in body:
+            # A bare artist list becomes one nameless event
+            events = [
+                Event(
+                    name="",
+                    ticket_url="",
+                    artists=[Artist(name=str(name)) for name in body["artists"]],
+                )
+            ]
+        else:
+            raise ValueError('Expected "events" or "artists"')
+        max_paths_per_pair = int(body.get("max_paths_per_pair", 1))
+        max_cost = body.get("max_cost")
+        max_cost = None if max_cost is None else float(max_cost)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed query: {e!r}") from e
+
+    if not 1 <= max_paths_per_pair <= MAX_PATHS_PER_PAIR:
+        raise ValueError(
+            f"max_paths_per_pair must be between 1 and {MAX_PATHS_PER_PAIR}"
+        )
+    if max_cost is not None and (math.isnan(max_cost) or max_cost < 0):
+        raise ValueError("max_cost must be a non-negative number")
+    return events, max_paths_per_pair, max_cost
+
+
+def make_handler(service: ConnectionService) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to a service."""
+
+    class ConnectionRequestHandler(BaseHTTPRequestHandler):
+        """Serve connection queries as JSON."""
+
+        def _send_json(self, status: HTTPStatus, payload: dict):
+            """Write a JSON response."""
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            """Report the loaded graph."""
+            if self.path != "/health":
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+                return
+            state = service.state
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "status": "ok",
+                    "source_hash": state.compiled_graph.source_hash,
+                    "artists": len(state.compiled_graph.names),
+                    "favorites": len(state.favorites),
+                },
+            )
+
+        def do_POST(self):
+            """Answer a connection query."""
+            if self.path != "/connections":
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length"))
+            except (TypeError, ValueError):
+                # Missing or not a number
+                length = -1
+            if length < 0:
+                self._send_json(
+                    HTTPStatus.BAD_REQUEST,
+                    {"error": "Missing or invalid Content-Length"},
+                )
+                return
+            if length > MAX_REQUEST_BYTES:
+                self._send_json(
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request too large"}
+                )
+                return
+            try:
+                events, max_paths_per_pair, max_cost = parse_query(
+                    json.loads(self.rfile.read(length) or b"{}")
+                )
+            except ValueError as e:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                return
+
+            try:
+                connections = service.find_connections(
+                    events, max_paths_per_pair=max_paths_per_pair, max_cost=max_cost
+                )
+            except Exception:
+                logger.exception("Connection query failed")
+                self._send_json(
+                    HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Query failed"}
+                )
+                return
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "source_hash": service.state.compiled_graph.source_hash,
+                    "connections": [pair.to_dict() for pair in connections],
+                },
+            )
+
+        def log_message(self, format, *args):
+            """Route access logs to the module logger."""
+            logger.debug("%s - " + format, self.address_string(), *args)
+
+    return ConnectionRequestHandler
+
+
+def serve(
+    service: ConnectionService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+):
+    """Serve queries and hot-reload until interrupted."""
+    stop = threading.Event()
+    watcher = threading.Thread(target=service.watch, args=(stop,), daemon=True)
+    watcher.start()
+    with ThreadingHTTPServer((host, port), make_handler(service)) as server:
+        logger.info("Listening on http://%s:%d", host, server.server_address[1])
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Shutting down")
+        finally:
+            stop.set()
+
+
+def main():
+    """Run the connection query service."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.connection_server",
+        description="Answer connection queries from a resident in-memory graph.",
+    )
+    parser.add_argument(
+        "--similar-artists-file",
+        type=Path,
+        default=Path("output") / "similar_artists_map.json",
+        help="Similarity map JSON (default: output/similar_artists_map.json)",
+    )
+    parser.add_argument(
+        "--favorites-file",
+        type=Path,
+        default=Path("output") / "my_artists.json",
+        help="Favorite artists JSON (default: output/my_artists.json)",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to bind")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="Port to listen on"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    serve(
+        ConnectionService(args.similar_artists_file, args.favorites_file),
+        args.host,
+        args.port,
+    )
+
+
+if __name__ == "__main__":
+    main()
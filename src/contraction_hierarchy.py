@@ -0,0 +1,801 @@
+"""
+Contraction hierarchy for repeated many-to-many connection queries.
+
+Preprocessing contracts the nodes of the cost graph one at a time, in
+order of importance, adding shortcut edges that preserve shortest path
+costs between the remaining nodes. Afterwards any shortest path can be
+found by searching only "upward" (towards more important nodes) from
+both ends, which touches a tiny fraction of the graph.
+
+Graphs with a densely connected middle would need ever more shortcuts,
+so contraction stops early and leaves that middle as a core that queries
+search in full.
+
+Many-to-many tables (event artists x favorites) run one upward search
+per event artist and per favorite, then join all of them (and the core)
+in a single Dijkstra run. Full artist paths are recovered by expanding
+each shortcut into the two edges it replaced.
+
+The hierarchy lives next to the compiled graph it was built from, so it
+is rebuilt whenever the similarity map changes.
+"""
+
+import heapq
+import json
+import logging
+import math
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from src.artist_connection_search import (
+    edge_positions,
+    group_found_paths,
+    reconstruct_paths_batch,
+    resolve_search_endpoints,
+    search_chunk_rows,
+)
+from src.graph_cache import CompiledGraph
+from src.models import ArtistPairConnections, Event
+
+logger = logging.getLogger(__name__)
+
+CONTRACTION_FORMAT_VERSION = 1
+CONTRACTION_DIR_NAME = "contraction_hierarchy"
+
+# Nodes settled per witness search before a shortcut is added anyway;
+# missing a witness only costs an unneeded shortcut, never correctness
+WITNESS_SETTLE_LIMIT = 64
+
+# Contraction stops when the cheapest node needs more shortcuts than this
+# per edge it removes; the rest of the graph is left as a searched core
+CORE_SHORTCUT_RATIO = 2.0
+
+# Offset on the virtual edges of the many-to-many join; every joined path
+# uses exactly two, so the offset never changes which path is shortest
+VIRTUAL_EDGE_COST = 1.0
+
+# Marks an original graph edge in the middle arrays
+NO_MIDDLE = -1
+
+UPWARD_ARRAYS = ("indptr", "indices", "costs", "middle")
+
+
+@dataclass(frozen=True)
+class UpwardGraph:
+    """
+    Edges between a node and more important nodes, in CSR layout.
+
+    Row v lists the neighbors of v ranked above it, sorted by node id, with
+    the edge cost and the contracted node a shortcut skips (NO_MIDDLE for
+    original edges).
+    """
+
+    indptr: np.ndarray
+    indices: np.ndarray
+    costs: np.ndarray
+    middle: np.ndarray
+
+
+@dataclass(frozen=True)
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over one cost graph.
+
+    up holds edges v → w and down holds edges u → v (stored in row v) for
+    neighbors ranked above v, shortcuts included. Nodes ranked core_start
+    or higher form the uncontracted core; their rows hold all their edges
+    to other core nodes.
+    """
+
+    rank: np.ndarray
+    core_start: int
+    up: UpwardGraph
+    down: UpwardGraph
+
+    @property
+    def core_nodes(self) -> np.ndarray:
+        """Node ids of the core."""
+        return np.flatnonzero(np.asarray(self.rank) >= self.core_start)
+
+    def edge_middles(self, tails: np.ndarray, heads: np.ndarray) -> np.ndarray:
+        """Middle node of each hierarchy edge tail → head (NO_MIDDLE if none)."""
+        rank = np.asarray(self.rank)
+        upward = rank[tails] < rank[heads]
+        middles = np.empty(len(tails), dtype=np.int64)
+        middles[upward] = self.up.middle[
+            edge_positions(self.up, tails[upward], heads[upward])
+        ]
+        middles[~upward] = self.down.middle[
+            edge_positions(self.down, heads[~upward], tails[~upward])
+        ]
+        return middles
+
+    def _expand_edges(
+        self, tails: np.ndarray, heads: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Replace shortcuts by graph edges, for many edges at once.
+
+        Every round splits each remaining shortcut into the two edges it
+        skips, until only graph edges are left.
+
+        Returns:
+            Tuple of (heads, owner): the heads of the graph edges in path
+            order, and the index of the input edge each one came from
+        """
+        owner = np.arange(len(tails))
+        pending = np.ones(len(tails), dtype=bool)
+        while pending.any():
+            middles = np.full(len(tails), NO_MIDDLE, dtype=np.int64)
+            middles[pending] = self.edge_middles(tails[pending], heads[pending])
+            split = middles != NO_MIDDLE
+            counts = 1 + split
+            first = np.cumsum(counts) - counts
+            tails = np.repeat(tails, counts)
+            heads = np.repeat(heads, counts)
+            heads[first[split]] = middles[split]
+            tails[first[split] + 1] = middles[split]
+            owner = np.repeat(owner, counts)
+            pending = np.repeat(split, counts)
+        return heads, owner
+
+    def unpack_paths(
+        self, nodes: np.ndarray, offsets: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Expand the shortcuts on a batch of hierarchy paths.
+
+        Paths share most of their shortcuts, so each distinct hierarchy
+        edge is expanded once and its graph edges copied into every path
+        that uses it.
+
+        Args:
+            nodes: Flat node ids of non-empty hierarchy paths
+            offsets: Path i is nodes[offsets[i]:offsets[i + 1]]
+
+        Returns:
+            Tuple of (nodes, offsets) of the unpacked paths, same layout
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        n_paths = len(offsets) - 1
+
+        is_tail = np.ones(len(nodes), dtype=bool)
+        is_tail[offsets[1:] - 1] = False
+        tails = nodes[is_tail]
+        heads = nodes[np.roll(is_tail, 1)]
+        edge_path = np.repeat(np.arange(n_paths), np.diff(offsets) - 1)
+
+        n_nodes = len(self.rank)
+        distinct, edge_ids = np.unique(tails * n_nodes + heads, return_inverse=True)
+        expanded_heads, owner = self._expand_edges(
+            distinct // n_nodes, distinct % n_nodes
+        )
+        expanded_counts = np.bincount(owner, minlength=len(distinct))
+        expanded_starts = np.cumsum(expanded_counts) - expanded_counts
+
+        # Copy each path edge's graph edges, in path order
+        counts = expanded_counts[edge_ids]
+        gather = np.repeat(
+            expanded_starts[edge_ids] - np.cumsum(counts) + counts, counts
+        )
+        gathered_heads = expanded_heads[gather + np.arange(len(gather))]
+        gathered_path = np.repeat(edge_path, counts)
+
+        # Path i is its first node followed by the heads of its graph edges
+        edge_counts = np.bincount(gathered_path, minlength=n_paths)
+        new_offsets = np.zeros(n_paths + 1, dtype=np.int64)
+        new_offsets[1:] = np.cumsum(edge_counts + 1)
+        new_nodes = np.empty(new_offsets[-1], dtype=np.int32)
+        new_nodes[new_offsets[:-1]] = nodes[offsets[:-1]]
+        edge_starts = np.cumsum(edge_counts) - edge_counts
+        rank_in_path = np.arange(len(gathered_heads)) - edge_starts[gathered_path]
+        new_nodes[new_offsets[gathered_path] + 1 + rank_in_path] = gathered_heads
+        return new_nodes, new_offsets
+
+
+@dataclass(frozen=True)
+class ShortestPathTable:
+    """
+    Many-to-many shortest path costs.
+
+    distances[i, j] is the cost from sources[i] to targets[j] (inf if
+    unreachable or over the cost bound). Every finite pair (i, j) in pairs
+    has a path over hierarchy edges (shortcuts included) in the flat
+    path_nodes / path_offsets layout.
+    """
+
+    sources: np.ndarray
+    targets: np.ndarray
+    distances: np.ndarray
+    pairs: np.ndarray
+    path_nodes: np.ndarray
+    path_offsets: np.ndarray
+
+
+def _witness_distances(
+    out_edges: list[dict[int, tuple[float, int]]],
+    source: int,
+    skip: int,
+    limit: float,
+    targets: set[int],
+) -> dict[int, float]:
+    """
+    Costs of paths from source that avoid skip, up to limit.
+
+    Tentative distances are returned too; each is the cost of a real path,
+    so it is a valid witness.
+    """
+    distances = {source: 0.0}
+    heap = [(0.0, source)]
+    settled = set()
+    remaining = len(targets)
+    while heap and len(settled) < WITNESS_SETTLE_LIMIT and remaining:
+        dist, node = heapq.heappop(heap)
+        if dist > limit:
+            break
+        if node in settled:
+            continue
+        settled.add(node)
+        if node in targets:
+            remaining -= 1
+
+        for neighbor, (cost, _) in out_edges[node].items():
+            new_dist = dist + cost
+            if neighbor != skip and new_dist < distances.get(neighbor, math.inf):
+                distances[neighbor] = new_dist
+                heapq.heappush(heap, (new_dist, neighbor))
+    return distances
+
+
+def _needed_shortcuts(
+    node: int,
+    out_edges: list[dict[int, tuple[float, int]]],
+    in_edges: list[dict[int, float]],
+) -> list[tuple[int, int, float]]:
+    """Shortcuts (tail, head, cost) that contracting node would require."""
+    shortcuts = []
+    outgoing = out_edges[node]
+    for tail, tail_cost in in_edges[node].items():
+        through = {
+            head: tail_cost + cost
+            for head, (cost, _) in outgoing.items()
+            if head != tail
+        }
+        if not through:
+            continue
+
+        witnesses = _witness_distances(
+            out_edges, tail, node, max(through.values()), set(through)
+        )
+        shortcuts.extend(
+            (tail, head, cost)
+            for head, cost in through.items()
+            if witnesses.get(head, math.inf) > cost
+        )
+    return shortcuts
+
+
+def _upward_graph(rows: list[list[tuple[int, float, int]]]) -> UpwardGraph:
+    """Pack per-node (neighbor, cost, middle) lists into an UpwardGraph."""
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    entries = [entry for row in rows for entry in sorted(row)]
+    return UpwardGraph(
+        indptr=indptr,
+        indices=np.array([e[0] for e in entries], dtype=np.int32),
+        costs=np.array([e[1] for e in entries], dtype=np.float64),
+        middle=np.array([e[2] for e in entries], dtype=np.int32),
+    )
+
+
+def build_contraction_hierarchy(
+    graph: sp.csr_matrix,
+    core_shortcut_ratio: float = CORE_SHORTCUT_RATIO,
+) -> ContractionHierarchy:
+    """
+    Contract the nodes of a cost graph.
+
+    Nodes are contracted cheapest first by edge difference (shortcuts
+    added minus edges removed) plus the number of already contracted
+    neighbors, which keeps contraction spread evenly over the graph.
+    Priorities are updated lazily when a node comes up for contraction.
+
+    Contraction stops once the cheapest node would need more than
+    core_shortcut_ratio shortcuts per edge it removes. The remaining core
+    keeps all its edges in both directions and is searched exhaustively,
+    which bounds preprocessing on densely connected graphs.
+
+    Args:
+        graph: Sparse CSR matrix with positive edge costs
+        core_shortcut_ratio: Shortcuts per removed edge at which to stop
+
+    Returns:
+        ContractionHierarchy for graph
+    """
+    n_nodes = graph.shape[0]
+    coo = graph.tocoo()
+    out_edges: list[dict[int, tuple[float, int]]] = [{} for _ in range(n_nodes)]
+    in_edges: list[dict[int, float]] = [{} for _ in range(n_nodes)]
+    for tail, head, cost in zip(
+        coo.row.tolist(), coo.col.tolist(), coo.data.tolist(), strict=True
+    ):
+        if tail == head:
+            continue
+        if head not in out_edges[tail] or cost < out_edges[tail][head][0]:
+            out_edges[tail][head] = (cost, NO_MIDDLE)
+            in_edges[head][tail] = cost
+
+    contracted_neighbors = [0] * n_nodes
+
+    def evaluate(node: int) -> tuple[int, int, list[tuple[int, int, float]]]:
+        shortcuts = _needed_shortcuts(node, out_edges, in_edges)
+        removed = len(out_edges[node]) + len(in_edges[node])
+        priority = len(shortcuts) - removed + contracted_neighbors[node]
+        return priority, removed, shortcuts
+
+    heap = [(evaluate(node)[0], node) for node in range(n_nodes)]
+    heapq.heapify(heap)
+
+    rank = np.empty(n_nodes, dtype=np.int32)
+    up_rows: list[list[tuple[int, float, int]]] = [[] for _ in range(n_nodes)]
+    down_rows: list[list[tuple[int, float, int]]] = [[] for _ in range(n_nodes)]
+    order = 0
+    shortcut_count = 0
+
+    while heap:
+        # Lazy update: re-evaluate until the top is still the cheapest
+        _, node = heapq.heappop(heap)
+        priority, removed, shortcuts = evaluate(node)
+        if heap and priority > heap[0][0]:
+            heapq.heappush(heap, (priority, node))
+            continue
+        if len(shortcuts) > core_shortcut_ratio * removed:
+            heapq.heappush(heap, (priority, node))
+            break
+
+        rank[node] = order
+        order += 1
+        outgoing = out_edges[node]
+        incoming = in_edges[node]
+        up_rows[node] = [(head, cost, mid) for head, (cost, mid) in outgoing.items()]
+        down_rows[node] = [(tail, *out_edges[tail][node]) for tail in incoming]
+
+        for tail in incoming:
+            del out_edges[tail][node]
+            contracted_neighbors[tail] += 1
+        for head in outgoing:
+            del in_edges[head][node]
+            contracted_neighbors[head] += 1
+        for tail, head, cost in shortcuts:
+            if head not in out_edges[tail] or cost < out_edges[tail][head][0]:
+                out_edges[tail][head] = (cost, node)
+                in_edges[head][tail] = cost
+        shortcut_count += len(shortcuts)
+        out_edges[node] = {}
+        in_edges[node] = {}
+
+    # The core ranks above every contracted node and keeps all its edges
+    core = sorted(node for _, node in heap)
+    for node in core:
+        rank[node] = order
+        order += 1
+        up_rows[node] = [
+            (head, cost, mid) for head, (cost, mid) in out_edges[node].items()
+        ]
+        down_rows[node] = [(tail, *out_edges[tail][node]) for tail in in_edges[node]]
+
+    logger.info(
+        "Contracted %d nodes with %d shortcuts, leaving a core of %d",
+        n_nodes - len(core),
+        shortcut_count,
+        len(core),
+    )
+    return ContractionHierarchy(
+        rank=rank,
+        core_start=n_nodes - len(core),
+        up=_upward_graph(up_rows),
+        down=_upward_graph(down_rows),
+    )
+
+
+def _upward_search(
+    hierarchy: ContractionHierarchy, root: int, *, forward: bool
+) -> tuple[dict[int, float], dict[int, int]]:
+    """
+    Dijkstra from root over upward edges only, stopping at the core.
+
+    Nodes reachable more cheaply through a higher neighbor (checked via
+    the opposite direction's edges) cannot be on a shortest path, so their
+    edges are not relaxed. Core nodes are reached but not expanded.
+
+    Args:
+        hierarchy: Contraction hierarchy to search
+        root: Node to start from
+        forward: Follow edges out of nodes (else into them)
+
+    Returns:
+        Tuple of (distances, parents) for the search space; the root's
+        parent is -1
+    """
+    upward, stall = (
+        (hierarchy.up, hierarchy.down) if forward else (hierarchy.down, hierarchy.up)
+    )
+    rank = hierarchy.rank
+    distances = {root: 0.0}
+    parents = {root: -1}
+    heap = [(0.0, root)]
+    settled = set()
+    while heap:
+        dist, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if rank[node] >= hierarchy.core_start:
+            continue
+
+        start, end = stall.indptr[node], stall.indptr[node + 1]
+        if any(
+            distances.get(neighbor, math.inf) + cost < dist
+            for neighbor, cost in zip(
+                stall.indices[start:end].tolist(),
+                stall.costs[start:end].tolist(),
+                strict=True,
+            )
+        ):
+            continue
+
+        start, end = upward.indptr[node], upward.indptr[node + 1]
+        for neighbor, cost in zip(
+            upward.indices[start:end].tolist(),
+            upward.costs[start:end].tolist(),
+            strict=True,
+        ):
+            new_dist = dist + cost
+            if new_dist < distances.get(neighbor, math.inf):
+                distances[neighbor] = new_dist
+                parents[neighbor] = node
+                heapq.heappush(heap, (new_dist, neighbor))
+    return distances, parents
+
+
+def _space_arrays(space: dict[int, float]) -> tuple[np.ndarray, np.ndarray]:
+    """Node ids and distances of a search space."""
+    return (
+        np.fromiter(space.keys(), dtype=np.int64, count=len(space)),
+        np.fromiter(space.values(), dtype=np.float64, count=len(space)),
+    )
+
+
+def _core_edges(hierarchy: ContractionHierarchy) -> tuple[np.ndarray, ...]:
+    """Tails, heads and costs of all edges between core nodes."""
+    core = hierarchy.core_nodes
+    up = hierarchy.up
+    starts = up.indptr[core]
+    counts = up.indptr[core + 1] - starts
+    positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(
+        counts.sum()
+    )
+    return np.repeat(core, counts), up.indices[positions], up.costs[positions]
+
+
+def _parent_chain(parents: dict[int, int], node: int) -> list[int]:
+    """Nodes from node back to its search root."""
+    chain = [node]
+    while parents[chain[-1]] >= 0:
+        chain.append(parents[chain[-1]])
+    return chain
+
+
+def many_to_many(
+    hierarchy: ContractionHierarchy,
+    sources: list[int] | np.ndarray,
+    targets: list[int] | np.ndarray,
+    *,
+    max_cost: float | None = None,
+    memory_budget_bytes: int | None = None,
+) -> ShortestPathTable:
+    """
+    Shortest path costs from every source to every target.
+
+    Every source and target gets an upward search that stops at the core.
+    The search spaces are then joined in one Dijkstra run over a compact
+    graph of the core edges plus a virtual node per source (with an edge
+    to each node its search reached) and per target (with an edge from
+    each node its search reached), so meetings below the core and routes
+    through it are found alike.
+
+    Args:
+        hierarchy: Contraction hierarchy of the cost graph
+        sources: Source node indices
+        targets: Target node indices
+        max_cost: Treat pairs costlier than this as unreachable
+        memory_budget_bytes: Cap on Dijkstra's working matrices; sources
+            are joined in chunks that fit
+
+    Returns:
+        ShortestPathTable with one row per source and column per target
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    n_sources, n_targets = len(sources), len(targets)
+    distances = np.full((n_sources, n_targets), np.inf)
+    if n_sources == 0 or n_targets == 0:
+        return ShortestPathTable(
+            sources,
+            targets,
+            distances,
+            pairs=np.empty((0, 2), dtype=np.int64),
+            path_nodes=np.empty(0, dtype=np.int32),
+            path_offsets=np.zeros(1, dtype=np.int64),
+        )
+
+    forward = [_upward_search(hierarchy, int(s), forward=True) for s in sources]
+    backward = [_upward_search(hierarchy, int(t), forward=False) for t in targets]
+    forward_spaces = [_space_arrays(space) for space, _ in forward]
+    backward_spaces = [_space_arrays(space) for space, _ in backward]
+
+    # Compact node ids: every core node and search space node, then the
+    # virtual sources and targets
+    core_tails, core_heads, core_costs = _core_edges(hierarchy)
+    local_nodes = np.unique(
+        np.concatenate(
+            [hierarchy.core_nodes]
+            + [nodes for nodes, _ in forward_spaces + backward_spaces]
+        )
+    )
+    n_local = len(local_nodes)
+    first_target = n_local + n_sources
+    n_total = first_target + n_targets
+
+    # Virtual edges carry a constant offset so zero-cost ones are kept
+    rows = [np.searchsorted(local_nodes, core_tails)]
+    cols = [np.searchsorted(local_nodes, core_heads)]
+    data = [core_costs]
+    for i, (nodes, node_dist) in enumerate(forward_spaces):
+        rows.append(np.full(len(nodes), n_local + i))
+        cols.append(np.searchsorted(local_nodes, nodes))
+        data.append(node_dist + VIRTUAL_EDGE_COST)
+    for j, (nodes, node_dist) in enumerate(backward_spaces):
+        rows.append(np.searchsorted(local_nodes, nodes))
+        cols.append(np.full(len(nodes), first_target + j))
+        data.append(node_dist + VIRTUAL_EDGE_COST)
+    joined = sp.csr_matrix(
+        (np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_total, n_total),
+    )
+
+    limit = np.inf if max_cost is None else max_cost + 2 * VIRTUAL_EDGE_COST
+    chunk_rows = search_chunk_rows(n_total, n_sources, memory_budget_bytes)
+    forward_parents = [parents for _, parents in forward]
+    backward_parents = [parents for _, parents in backward]
+    pair_parts = []
+    paths: list[int] = []
+    lengths: list[int] = []
+    for chunk_start in range(0, n_sources, chunk_rows):
+        chunk = np.arange(chunk_start, min(chunk_start + chunk_rows, n_sources))
+        dist, predecessors = dijkstra(
+            joined,
+            indices=n_local + chunk,
+            return_predecessors=True,
+            limit=limit,
+        )
+        costs = dist[:, first_target:] - 2 * VIRTUAL_EDGE_COST
+        if max_cost is not None:
+            costs[costs > max_cost] = np.inf
+        distances[chunk] = costs
+
+        pair_rows, pair_columns = np.nonzero(np.isfinite(costs))
+        pair_parts.append(np.column_stack([chunk[pair_rows], pair_columns]))
+
+        # Joined paths run virtual source → meeting or core nodes → virtual
+        # target; the inner nodes link the two upward search trees
+        joined_nodes, joined_offsets = reconstruct_paths_batch(
+            predecessors,
+            pair_rows,
+            first_target + pair_columns,
+            n_local + chunk[pair_rows],
+            reverse_walks=True,
+        )
+        # The virtual ends are sliced off below; clip them to any valid id
+        inner_nodes = local_nodes[np.minimum(joined_nodes, n_local - 1)].tolist()
+        joined_offsets = joined_offsets.tolist()
+        for k, (row, j) in enumerate(
+            zip(pair_rows.tolist(), pair_columns.tolist(), strict=True)
+        ):
+            inner = inner_nodes[joined_offsets[k] + 1 : joined_offsets[k + 1] - 1]
+            path = _parent_chain(forward_parents[chunk_start + row], inner[0])
+            path.reverse()
+            path.extend(inner[1:])
+            path.extend(_parent_chain(backward_parents[j], inner[-1])[1:])
+            paths.extend(path)
+            lengths.append(len(path))
+
+    path_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    path_offsets[1:] = np.cumsum(lengths)
+    return ShortestPathTable(
+        sources,
+        targets,
+        distances,
+        pairs=np.concatenate(pair_parts),
+        path_nodes=np.array(paths, dtype=np.int32),
+        path_offsets=path_offsets,
+    )
+
+
+def table_paths(
+    hierarchy: ContractionHierarchy,
+    table: ShortestPathTable,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Unpack the shortest path of every reachable pair in a table.
+
+    Args:
+        hierarchy: Hierarchy the table was computed with
+        table: Result of many_to_many
+
+    Returns:
+        Tuple of (path_sources, nodes, offsets) in the flat layout of
+        reconstruct_paths_batch, ordered by source then target
+    """
+    nodes, offsets = hierarchy.unpack_paths(table.path_nodes, table.path_offsets)
+    return table.sources[table.pairs[:, 0]], nodes, offsets
+
+
+def find_connections_with_hierarchy(
+    hierarchy: ContractionHierarchy,
+    graph: sp.csr_matrix,
+    artist_to_idx: dict[str, int],
+    idx_to_artist: dict[int, str],
+    source_artists: list[str],
+    *,
+    target_artists: list[str],
+    strengths: np.ndarray,
+    events: list[Event],
+    max_cost: float | None = None,
+    memory_budget_bytes: int | None = None,
+) -> list[ArtistPairConnections]:
+    """
+    Find the best path for every event artist and favorite pair.
+
+    Equivalent to find_optimal_paths with max_paths_per_pair=1.
+
+    Args:
+        hierarchy: Contraction hierarchy built over graph
+        graph: Sparse CSR matrix with edge costs
+        artist_to_idx: Mapping from artist name to index
+        idx_to_artist: Mapping from index to artist name
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        strengths: Relationship strengths aligned with graph.data
+        events: List of Event objects
+        max_cost: Only keep paths whose total cost is at most this
+        memory_budget_bytes: Cap on the query's Dijkstra working matrices
+
+    Returns:
+        List of ArtistPairConnections, sorted by best_avg_strength (descending)
+    """
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
+    if not source_nodes or not target_indices:
+        return []
+
+    table = many_to_many(
+        hierarchy,
+        sorted(source_nodes),
+        target_indices,
+        max_cost=max_cost,
+        memory_budget_bytes=memory_budget_bytes,
+    )
+    path_sources, nodes, offsets = table_paths(hierarchy, table)
+    return group_found_paths(
+        path_sources,
+        nodes,
+        offsets,
+        source_nodes,
+        graph,
+        strengths=strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=1,
+    )
+
+
+def save_contraction_hierarchy(
+    hierarchy: ContractionHierarchy, directory: Path, source_hash: str
+):
+    """
+    Write a contraction hierarchy to directory, replacing any previous one.
+
+    Args:
+        hierarchy: Hierarchy to write
+        directory: Target directory
+        source_hash: Content hash of the similarity map the graph came from
+    """
+    scratch_dir = directory.with_name(f".{directory.name}.tmp")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir(parents=True)
+
+    np.save(scratch_dir / "rank.npy", hierarchy.rank)
+    for side in ("up", "down"):
+        upward = getattr(hierarchy, side)
+        for name in UPWARD_ARRAYS:
+            np.save(scratch_dir / f"{side}_{name}.npy", getattr(upward, name))
+    meta = {
+        "format_version": CONTRACTION_FORMAT_VERSION,
+        "source_hash": source_hash,
+        "nodes": len(hierarchy.rank),
+        "core_start": hierarchy.core_start,
+    }
+    with open(scratch_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    scratch_dir.rename(directory)
+
+
+def open_contraction_hierarchy(
+    directory: Path, source_hash: str
+) -> ContractionHierarchy | None:
+    """
+    Memory-map a saved contraction hierarchy.
+
+    Returns:
+        The hierarchy, or None if it is missing, outdated or for another graph
+    """
+    try:
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if (
+        meta.get("format_version") != CONTRACTION_FORMAT_VERSION
+        or meta.get("source_hash") != source_hash
+    ):
+        return None
+
+    upward = {
+        side: UpwardGraph(
+            **{
+                name: np.load(directory / f"{side}_{name}.npy", mmap_mode="r")
+                for name in UPWARD_ARRAYS
+            }
+        )
+        for side in ("up", "down")
+    }
+    return ContractionHierarchy(
+        rank=np.load(directory / "rank.npy", mmap_mode="r"),
+        core_start=meta["core_start"],
+        **upward,
+    )
+
+
+def load_contraction_hierarchy(compiled_graph: CompiledGraph) -> ContractionHierarchy:
+    """
+    Load the hierarchy cached with a compiled graph, building it if needed.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+
+    Returns:
+        ContractionHierarchy for compiled_graph
+    """
+    directory = compiled_graph.cache_dir / CONTRACTION_DIR_NAME
+    hierarchy = open_contraction_hierarchy(directory, compiled_graph.source_hash)
+    if hierarchy is not None:
+        logger.info("Using contraction hierarchy cache: %s", directory)
+        return hierarchy
+
+    logger.info(
+        "Building contraction hierarchy for %d nodes", len(compiled_graph.names)
+    )
+    hierarchy = build_contraction_hierarchy(compiled_graph.graph)
+    save_contraction_hierarchy(hierarchy, directory, compiled_graph.source_hash)
+    return (
+        open_contraction_hierarchy(directory, compiled_graph.source_hash) or hierarchy
+    )
@@ -0,0 +1,217 @@
+"""
+Pluggable edge cost models for the connection search.
+
+The search minimizes the summed cost of a path's edges, and a cost model
+decides how a link's relationship strength and rank turn into that cost.
+The compiled graph stores reciprocal costs; every other model's CSR data
+arrays (forward and reverse) are computed once with vectorized NumPy and
+cached in the compiled graph's directory, so switching models reuses the
+graph's structure and costs no rebuild.
+
+Paths are scored 1/total_cost, except where a model says otherwise:
+log costs of the strongest links are next to zero, so their paths are
+scored by the product of their normalized strengths instead.
+"""
+
+import logging
+import math
+import os
+from collections.abc import Callable
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.graph_cache import CompiledGraph
+from src.models import ArtistPairConnections
+
+logger = logging.getLogger(__name__)
+
+COST_MODEL_DIR_NAME = "cost_models"
+DEFAULT_COST_MODEL = "reciprocal"
+
+# Costs must stay positive: scipy's csgraph reads a zero cost as no edge
+MIN_EDGE_COST = 1e-6
+
+# Share of the rank cost in the blend model
+BLEND_RANK_WEIGHT = 0.5
+
+
+def reciprocal_costs(strengths: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Cost 1/strength: strong links are cheap, weak ones very expensive."""
+    return 1.0 / strengths
+
+
+def log_costs(strengths: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """
+    Cost -log(strength / max strength).
+
+    Summing these costs multiplies the normalized strengths along a path,
+    so the cheapest path is the most probable chain of links.
+    """
+    if len(strengths) == 0:
+        return np.zeros(0, dtype=np.float64)
+    return np.maximum(-np.log(strengths / strengths.max()), MIN_EDGE_COST)
+
+
+def rank_costs(strengths: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """Cost equal to the link's rank in its artist's similar-artist list."""
+    return np.maximum(ranks.astype(np.float64), 1.0)
+
+
+def blend_costs(strengths: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """
+    Weighted mix of the reciprocal and rank costs.
+
+    Each part is scaled by its mean first, so neither dominates just by
+    being measured in larger units.
+    """
+    reciprocal = reciprocal_costs(strengths, ranks)
+    rank = rank_costs(strengths, ranks)
+    if len(strengths) == 0:
+        return reciprocal
+    return (1.0 - BLEND_RANK_WEIGHT) * reciprocal / reciprocal.mean() + (
+        BLEND_RANK_WEIGHT * rank / rank.mean()
+    )
+
+
+# Model name → function(strengths, ranks) → costs, all aligned with the
+# graph's CSR data
+COST_MODELS: dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    "reciprocal": reciprocal_costs,
+    "log": log_costs,
+    "rank": rank_costs,
+    "blend": blend_costs,
+}
+
+# Model name → function(total_cost) → path_score, for models that don't
+# score paths 1/total_cost
+PATH_SCORES: dict[str, Callable[[float], float]] = {
+    # Product of the normalized strengths along the path, in (0, 1]
+    "log": lambda total_cost: math.exp(-total_cost),
+}
+
+
+def edge_costs(model: str, strengths: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """
+    Compute a cost model's edge costs.
+
+    Args:
+        model: Name of a model in COST_MODELS
+        strengths: Relationship strength per edge
+        ranks: Similar-artist rank per edge
+
+    Returns:
+        Cost per edge, parallel to strengths
+    """
+    if model not in COST_MODELS:
+        raise ValueError(
+            f"Unknown cost model: {model!r} (expected one of {sorted(COST_MODELS)})"
+        )
+    return COST_MODELS[model](np.asarray(strengths), np.asarray(ranks))
+
+
+def score_connections(
+    grouped_connections: list[ArtistPairConnections], model: str
+) -> list[ArtistPairConnections]:
+    """
+    Rescore found connections for a cost model.
+
+    The search scores paths 1/total_cost. Models in PATH_SCORES score by
+    another decreasing function of the cost, so paths keep their order.
+
+    Args:
+        grouped_connections: Connections found on the model's graph
+        model: Name of a model in COST_MODELS
+
+    Returns:
+        The connections with the model's path scores
+    """
+    score = PATH_SCORES.get(model)
+    if score is None:
+        return grouped_connections
+
+    rescored = []
+    for group in grouped_connections:
+        paths = tuple(
+            replace(path, path_score=score(path.total_cost)) for path in group.paths
+        )
+        rescored.append(
+            replace(group, paths=paths, best_path_score=paths[0].path_score)
+        )
+    return rescored
+
+
+def reverse_positions(graph: sp.csr_matrix) -> np.ndarray:
+    """
+    Map each reverse-graph entry to its forward-graph entry.
+
+    Args:
+        graph: Sparse CSR matrix
+
+    Returns:
+        positions such that entry p of the index-sorted transpose is
+        entry positions[p] of graph
+    """
+    positions = sp.csr_matrix(
+        (np.arange(graph.nnz, dtype=np.int64), graph.indices, graph.indptr),
+        shape=graph.shape,
+    )
+    reverse = positions.T.tocsr()
+    reverse.sort_indices()
+    return reverse.data
+
+
+def _save_array(path: Path, array: np.ndarray):
+    """Write then rename, so readers never see a partial file."""
+    scratch = path.with_name(f".{path.name}")
+    with open(scratch, "wb") as f:
+        np.save(f, array)
+    os.replace(scratch, path)
+
+
+def load_cost_model_graphs(
+    compiled_graph: CompiledGraph, model: str = DEFAULT_COST_MODEL
+) -> tuple[sp.csr_matrix, sp.csr_matrix]:
+    """
+    Forward and reverse graphs of a compiled graph under a cost model.
+
+    The model's data arrays are computed and cached if missing. Cached
+    arrays live in the compiled graph's directory, so they go away with
+    the graph when the similarity map changes.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+        model: Name of a model in COST_MODELS
+
+    Returns:
+        Tuple of (graph, reverse_graph) sharing compiled_graph's structure,
+        with the model's costs as data
+    """
+    if model == DEFAULT_COST_MODEL:
+        return compiled_graph.graph, compiled_graph.reverse_graph
+
+    directory = compiled_graph.cache_dir / COST_MODEL_DIR_NAME
+    forward_path = directory / f"{model}.npy"
+    reverse_path = directory / f"{model}_reverse.npy"
+    if forward_path.exists() and reverse_path.exists():
+        logger.info("Using cached %s edge costs: %s", model, directory)
+        costs = np.load(forward_path, mmap_mode="r")
+        reverse_costs = np.load(reverse_path, mmap_mode="r")
+    else:
+        logger.info("Computing %s edge costs", model)
+        costs = edge_costs(model, compiled_graph.strengths, compiled_graph.ranks)
+        reverse_costs = costs[reverse_positions(compiled_graph.graph)]
+        directory.mkdir(parents=True, exist_ok=True)
+        _save_array(forward_path, costs)
+        _save_array(reverse_path, reverse_costs)
+
+    graph, reverse_graph = compiled_graph.graph, compiled_graph.reverse_graph
+    return (
+        sp.csr_matrix((costs, graph.indices, graph.indptr), shape=graph.shape),
+        sp.csr_matrix(
+            (reverse_costs, reverse_graph.indices, reverse_graph.indptr),
+            shape=reverse_graph.shape,
+        ),
+    )
@@ -0,0 +1,319 @@
+"""
+Best-first crawl frontier expanding the similarity graph toward favorites.
+
+Connection paths can only run through artists whose pages were scraped,
+so scraping just the artists of one events file leaves paths to the
+favorites long or missing. The frontier crawl seeds from the event
+artists and the favorites, then expands in rounds through the similar
+artists listed on scraped pages, each round scraping the unscraped
+artists most likely to lie on a short path from an event artist to a
+favorite.
+
+An unscraped artist's priority is the estimated cost of such a path
+through it: the known cost from the event artists that cannot reach a
+favorite yet, plus its estimated cost to the favorites. Its own links
+are unknown until it is scraped, so the second part treats links as
+symmetric and uses the cost between it and the favorites over links in
+either direction. UNKNOWN_COST_ESTIMATE stands in for a side that has
+not reached the artist yet. Priorities are recomputed between rounds,
+and the crawl stops at an artist or request budget.
+
+The graph is kept between rounds and only the rows of newly scraped
+pages are replaced, so a round costs three Dijkstra runs rather than a
+rebuild of the whole map. If even that takes a noticeable share of the
+time spent on requests, rounds get bigger.
+"""
+
+import heapq
+import logging
+import math
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from src.music_map_crawler import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_REQUESTS_PER_SECOND,
+    HostRateLimiter,
+    crawl_artists,
+)
+from src.music_map_scraper import ScraperResult
+from src.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+FRONTIER_BATCH_SIZE = 25
+DEFAULT_FRONTIER_MAX_ARTISTS = 500
+# Cost assumed for a side of the path that hasn't reached an artist yet.
+# Well above typical path costs, so artists reached from both sides go
+# first and one-sided ones are ordered by their known side.
+UNKNOWN_COST_ESTIMATE = 10.0
+# Most of a round's time to spend reprioritizing rather than on requests
+MAX_REPRIORITIZE_SHARE = 0.1
+
+
+def _distances(
+    graph: sp.csr_matrix, sources: list[int], *, directed: bool = True
+) -> np.ndarray:
+    """Cheapest cost from any of the sources to each node (inf if none)."""
+    if not sources:
+        return np.full(graph.shape[0], np.inf)
+    return dijkstra(graph, directed=directed, indices=sources, min_only=True)
+
+
+class FrontierGraph:
+    """
+    Cost graph of the crawl so far, updated in place as pages come in.
+
+    Matches build_sparse_graph over parse_similar_artists_map of the same
+    results, up to node order: scraped pages give their own links (the
+    first listing of a similar artist wins) and artists without a page
+    get the strongest neighbor links recorded for them on other pages.
+    """
+
+    def __init__(self):
+        """Start with an empty graph."""
+        self.artist_to_idx: dict[str, int] = {}
+        self.names: list[str] = []
+        self.scraped: set[str] = set()  # Artists with a result of any status
+        self.graph = sp.csr_matrix((0, 0))
+        self._successful: set[str] = set()
+        self._derived: dict[str, dict[str, float]] = {}
+
+    def _node(self, name: str) -> int:
+        """Index of an artist, adding a node for a new one."""
+        idx = self.artist_to_idx.get(name)
+        if idx is None:
+            idx = self.artist_to_idx[name] = len(self.names)
+            self.names.append(name)
+        return idx
+
+    def update(self, results: dict[str, ScraperResult]):
+        """
+        Add or replace the links of newly scraped artists.
+
+        Args:
+            results: Scrape results by artist name
+        """
+        self.scraped.update(results)
+        rows: dict[str, dict[str, float]] = {}
+        for artist, result in results.items():
+            if result.status != "success":
+                self._successful.discard(artist)
+                rows[artist] = self._derived.get(artist, {})
+                continue
+            self._successful.add(artist)
+            self._derived.pop(artist, None)
+            links = rows[artist] = {}
+            for sim in result.similar_artists or []:
+                if (sim.relationship_strength or 0) > 0:
+                    links.setdefault(sim.name, sim.relationship_strength)
+
+        # Neighbor links stand in for pages not scraped (successfully) yet
+        for result in results.values():
+            if result.status != "success":
+                continue
+            for neighbor, links in (result.neighbor_links or {}).items():
+                if neighbor in self._successful:
+                    continue  # Its own page is authoritative
+                known = self._derived.setdefault(neighbor, {})
+                for target, strength in links.items():
+                    if strength > known.get(target, 0):
+                        known[target] = strength
+                rows[neighbor] = known
+
+        new_rows, new_cols, new_costs = [], [], []
+        for artist, links in rows.items():
+            row = self._node(artist)
+            for target, strength in links.items():
+                new_rows.append(row)
+                new_cols.append(self._node(target))
+                new_costs.append(1.0 / strength)
+
+        # Keep the untouched rows of the old graph, replace the others
+        n = len(self.names)
+        old_rows = np.repeat(np.arange(self.graph.shape[0]), np.diff(self.graph.indptr))
+        replaced = np.zeros(n, dtype=bool)
+        replaced[[self.artist_to_idx[artist] for artist in rows]] = True
+        kept = ~replaced[old_rows]
+        self.graph = sp.csr_matrix(
+            (
+                np.concatenate([self.graph.data[kept], np.array(new_costs)]),
+                (
+                    np.concatenate(
+                        [old_rows[kept], np.array(new_rows, dtype=np.int64)]
+                    ),
+                    np.concatenate(
+                        [self.graph.indices[kept], np.array(new_cols, dtype=np.int64)]
+                    ),
+                ),
+            ),
+            shape=(n, n),
+        )
+
+    def priorities(
+        self, event_artists: Sequence[str], favorites: Sequence[str]
+    ) -> dict[str, float]:
+        """
+        Estimated path cost through each unscraped artist; lower is better.
+
+        Args:
+            event_artists: Artists to connect
+            favorites: Favorite artists to connect them to
+
+        Returns:
+            Dict mapping each artist in the graph, but not scraped itself,
+            to its priority
+        """
+        artist_to_idx = self.artist_to_idx
+        frontier = [
+            idx for name, idx in artist_to_idx.items() if name not in self.scraped
+        ]
+        if not frontier:
+            return {}
+
+        favorite_indices = [artist_to_idx[a] for a in favorites if a in artist_to_idx]
+        event_indices = [artist_to_idx[a] for a in event_artists if a in artist_to_idx]
+
+        # Event artists that already reach a favorite need no more crawling,
+        # unless all of them do
+        to_favorites = _distances(self.graph.T.tocsr(), favorite_indices)
+        unconnected = [i for i in event_indices if np.isinf(to_favorites[i])]
+        from_events = _distances(self.graph, unconnected or event_indices)
+        near_favorites = _distances(self.graph, favorite_indices, directed=False)
+
+        priority = np.where(
+            np.isinf(from_events), UNKNOWN_COST_ESTIMATE, from_events
+        ) + np.where(np.isinf(near_favorites), UNKNOWN_COST_ESTIMATE, near_favorites)
+        return {self.names[idx]: float(priority[idx]) for idx in frontier}
+
+
+def frontier_priorities(
+    results: dict[str, ScraperResult],
+    event_artists: Sequence[str],
+    favorites: Sequence[str],
+) -> dict[str, float]:
+    """
+    Estimated path cost through each unscraped artist; lower is better.
+
+    Args:
+        results: Scrape results so far by artist name
+        event_artists: Artists to connect
+        favorites: Favorite artists to connect them to
+
+    Returns:
+        Dict mapping each artist listed on a scraped page, but not scraped
+        itself, to its priority
+    """
+    graph = FrontierGraph()
+    graph.update(results)
+    return graph.priorities(event_artists, favorites)
+
+
+async def crawl_frontier(
+    results: dict[str, ScraperResult],
+    event_artists: Sequence[str],
+    favorites: Sequence[str],
+    *,
+    max_artists: int = DEFAULT_FRONTIER_MAX_ARTISTS,
+    max_requests: int | None = None,
+    batch_size: int = FRONTIER_BATCH_SIZE,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    max_requests_per_second: float | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_result: Callable[[str, ScraperResult], None] | None = None,
+    page_cache: PageCache | None = None,
+) -> int:
+    """
+    Scrape the seeds, then the best frontier artists, within a budget.
+
+    Seeds are the event artists and favorites without a successful result.
+    Budgets are checked between rounds, so throttling retries can take the
+    request count slightly past max_requests. Rounds grow beyond
+    batch_size when reprioritizing would otherwise take more than
+    MAX_REPRIORITIZE_SHARE of a round.
+
+    Args:
+        results: Scrape results so far by artist name; new results are
+            added to it
+        event_artists: Artists to connect
+        favorites: Favorite artists to connect them to
+        max_artists: Most artists to scrape
+        max_requests: Most requests to send (default: no limit)
+        batch_size: Frontier artists scraped per round
+        requests_per_second: Starting requests per second
+        max_requests_per_second: Highest requests per second (default:
+            requests_per_second)
+        concurrency: Most requests in flight at once
+        on_result: Called with each artist and result as it completes
+        page_cache: Store to keep the fetched pages in (default: none)
+
+    Returns:
+        Number of artists scraped
+    """
+    limiter = HostRateLimiter(requests_per_second, max_requests_per_second)
+    graph = FrontierGraph()
+    graph.update(results)
+    batch = [
+        artist
+        for artist in dict.fromkeys([*event_artists, *favorites])
+        if artist not in results or results[artist].status == "error"
+    ]
+    logger.info("Frontier crawl: %d seeds to scrape first", len(batch))
+
+    scraped = 0
+    round_number = 0
+    while True:
+        budget = max_artists - scraped
+        if max_requests is not None:
+            budget = min(budget, max_requests - limiter.requests)
+        batch = batch[: max(budget, 0)]
+        if not batch:
+            break
+
+        round_number += 1
+        started = time.monotonic()
+        found = await crawl_artists(
+            batch,
+            concurrency=concurrency,
+            on_result=on_result,
+            limiter=limiter,
+            page_cache=page_cache,
+        )
+        results.update(found)
+        scraped += len(found)
+        crawl_seconds = time.monotonic() - started
+
+        started = time.monotonic()
+        graph.update(found)
+        priorities = graph.priorities(event_artists, favorites)
+        reprioritize_seconds = time.monotonic() - started
+
+        # Keep reprioritizing a small part of the round as the graph grows
+        seconds_per_artist = crawl_seconds / max(len(found), 1)
+        round_size = batch_size
+        if seconds_per_artist > 0:
+            round_size = max(
+                batch_size,
+                math.ceil(
+                    reprioritize_seconds / (MAX_REPRIORITIZE_SHARE * seconds_per_artist)
+                ),
+            )
+        batch = heapq.nsmallest(round_size, priorities, key=priorities.__getitem__)
+        logger.info(
+            "Frontier round %d: %d artists scraped, %d requests, "
+            "%d artists in the frontier (best priority %.3f), "
+            "reprioritized in %.2fs, next round %d artists",
+            round_number,
+            scraped,
+            limiter.requests,
+            len(priorities),
+            priorities[batch[0]] if batch else float("nan"),
+            reprioritize_seconds,
+            round_size,
+        )
+
+    return scraped
@@ -2,6 +2,7 @@
 
 import json
 import logging
+from collections import defaultdict
 from datetime import datetime, time
 from pathlib import Path
 
@@ -55,6 +56,43 @@ def load_similar_artists_map(
     with open(filepath, encoding="utf-8") as f:
         raw_data = json.load(f)
 
+    result = parse_similar_artists_map(raw_data)
+
+    total_artists = len(raw_data)
+    successful_count = sum(
+        1 for artist_data in raw_data.values() if artist_data.get("status") == "success"
+    )
+    failed_count = total_artists - successful_count
+
+    logger.info(
+        "Loaded %d successful artists (%d failed/skipped)",
+        successful_count,
+        failed_count,
+    )
+    if len(result) > successful_count:
+        logger.info(
+            "Plus links for %d artists from their neighbors' pages",
+            len(result) - successful_count,
+        )
+
+    return result
+
+
+def parse_similar_artists_map(raw_data: dict) -> dict[str, ArtistSimilarityData]:
+    """
+    Build similarity data from a parsed similar_artists_map.json.
+
+    Artists without a page of their own get the links recorded between the
+    similar artists on other artists' pages ("neighbor_links"), ranked by
+    strength; the strongest value seen for a pair is kept.
+
+    Args:
+        raw_data: Scrape results by artist name, as saved by the scraper
+
+    Returns:
+        Dict mapping artist name to ArtistSimilarityData (only successful
+        scrapes and artists linked from them)
+    """
     # Filter to only successful scrapes and convert to dataclasses
     successful_artists = {
         artist_name: artist_data
@@ -72,7 +110,8 @@ def load_similar_artists_map(
                 relationship_strength=sim["relationship_strength"],
             )
             for sim in artist_data["similar_artists"]
-            if sim["relationship_strength"] > 0  # Filter invalid strengths
+            # Filter invalid or missing strengths
+            if (sim["relationship_strength"] or 0) > 0
         )
 
         result[artist_name] = ArtistSimilarityData(
@@ -80,15 +119,26 @@ def load_similar_artists_map(
             similar_artists=similar_artists,
         )
 
-    total_artists = len(raw_data)
-    successful_count = len(result)
-    failed_count = total_artists - successful_count
-
-    logger.info(
-        "Loaded %d successful artists (%d failed/skipped)",
-        successful_count,
-        failed_count,
-    )
+    # Links between the similar artists shown on each page
+    neighbor_links: dict[str, dict[str, float]] = defaultdict(dict)
+    for artist_data in successful_artists.values():
+        for neighbor, links in artist_data.get("neighbor_links", {}).items():
+            if neighbor in successful_artists:
+                continue  # Its own page is authoritative
+            known = neighbor_links[neighbor]
+            for target, strength in links.items():
+                if strength > known.get(target, 0):
+                    known[target] = strength
+
+    for neighbor, links in neighbor_links.items():
+        ranked = sorted(links.items(), key=lambda link: link[1], reverse=True)
+        result[neighbor] = ArtistSimilarityData(
+            artist_name=neighbor,
+            similar_artists=tuple(
+                SimilarArtist(name=name, rank=rank, relationship_strength=strength)
+                for rank, (name, strength) in enumerate(ranked, 1)
+            ),
+        )
 
     return result
 
@@ -111,7 +161,23 @@ def load_events(filepath: Path) -> list[Event]:
     with open(filepath, encoding="utf-8") as f:
         data = json.load(f)
 
-    events = [
+    events = parse_events(data)
+    logger.info("Loaded %d events", len(events))
+
+    return events
+
+
+def parse_events(data: dict) -> list[Event]:
+    """
+    Build Event objects from parsed events JSON.
+
+    Args:
+        data: Parsed contents of an events file ({"events": [...]})
+
+    Returns:
+        List of Event objects
+    """
+    return [
         Event(
             name=event["name"],
             ticket_url=event["ticket_url"],
@@ -131,10 +197,6 @@ def load_events(filepath: Path) -> list[Event]:
         for event in data["events"]
     ]
 
-    logger.info("Loaded %d events", len(events))
-
-    return events
-
 
 def load_artist_list(filepath: Path) -> list[str]:
     """
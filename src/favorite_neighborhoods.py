@@ -0,0 +1,489 @@
+"""
+Precomputed k-hop neighborhoods of the favorite artists.
+
+Much of the report's value lies in connections of one to three links. So
+instead of searching from every event artist, the favorites' k-hop
+neighborhoods are built once: a sparse min-plus relaxation from all
+favorites at once over the reverse graph. For every artist within k
+links of a favorite, it keeps the cost of the cheapest such path, the
+path's length and its average link strength.
+
+The result is an artists-by-favorites sparse matrix cached next to the
+compiled graph. Asking which event artists lie within k hops of a
+favorite, and how strongly, is then a gather of the event artists' rows.
+The relaxation's levels are kept too, so the paths themselves can be
+rebuilt for the report.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from dataclasses import dataclass
+from itertools import pairwise
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.artist_connection_search import (
+    build_reverse_graph,
+    classify_tier,
+    group_found_paths,
+    resolve_search_endpoints,
+    walk_hop_levels,
+)
+from src.cost_models import reverse_positions
+from src.graph_cache import CompiledGraph
+from src.models import ArtistPairConnections, Event
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORHOOD_DIR_NAME = "neighborhoods"
+DEFAULT_NEIGHBORHOOD_HOPS = 3
+
+# Bump when the neighborhood layout changes to invalidate cached ones
+NEIGHBORHOOD_FORMAT_VERSION = 1
+NEIGHBORHOOD_KEY_LENGTH = 16
+
+NEIGHBORHOOD_ARRAYS = (
+    "indptr",
+    "indices",
+    "costs",
+    "hops",
+    "avg_strengths",
+    "level_states",
+    "level_predecessors",
+    "level_offsets",
+)
+
+
+@dataclass(frozen=True)
+class FavoriteNeighborhoods:
+    """
+    Cheapest paths of at most max_hops links into each favorite.
+
+    costs is an (n_nodes, len(favorites)) CSR matrix: entry (v, j) is the
+    cost of the cheapest path of at most max_hops links from artist v to
+    favorites[j]. hops and avg_strengths are aligned with costs.data and
+    hold that path's link count and average link strength. A favorite's
+    own zero-length path is not stored.
+
+    Level h of the relaxation records, as flat ids j * n_nodes + v sorted
+    ascending, the states whose cost improved at that level together with
+    the next artist on the improved path.
+    """
+
+    favorites: list[str]
+    max_hops: int
+    costs: sp.csr_matrix
+    hops: np.ndarray
+    avg_strengths: np.ndarray
+    level_states: list[np.ndarray]
+    level_predecessors: list[np.ndarray]
+
+
+@dataclass(frozen=True)
+class NeighborhoodMatch:
+    """An event artist within the neighborhood of a favorite."""
+
+    event_artist: str
+    favorite_artist: str
+    hops: int
+    total_cost: float
+    avg_strength: float
+
+    @property
+    def tier(self) -> str:
+        """Similarity tier of the cheapest path (see classify_tier)."""
+        return classify_tier(self.avg_strength)
+
+
+def build_neighborhoods(
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
+    names: list[str],
+    favorites: list[str],
+    max_hops: int = DEFAULT_NEIGHBORHOOD_HOPS,
+) -> FavoriteNeighborhoods:
+    """
+    Relax paths of up to max_hops links into every favorite at once.
+
+    Level h extends only the states that improved at level h - 1 by one
+    incoming link, keeping the cheapest candidate per state (ties go to
+    the lowest next artist, as in hop_limited_search). States are kept as
+    sorted flat ids, so memory grows with the neighborhoods, not with
+    favorites times artists.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs and sorted indices
+        strengths: Relationship strengths aligned with graph.data
+        names: Artist name of each node
+        favorites: Favorite artist names (unknown names are ignored)
+        max_hops: Maximum number of links per path
+
+    Returns:
+        FavoriteNeighborhoods over the favorites found in the graph
+    """
+    n_nodes = graph.shape[0]
+    artist_to_idx = {name: idx for idx, name in enumerate(names)}
+    favorite_names = sorted({name for name in favorites if name in artist_to_idx})
+    roots = np.array([artist_to_idx[name] for name in favorite_names], dtype=np.int64)
+
+    reverse_graph = build_reverse_graph(graph)
+    reverse_graph.sort_indices()
+    reverse_strengths = np.asarray(strengths)[reverse_positions(graph)]
+    indptr, indices, data = (
+        reverse_graph.indptr,
+        reverse_graph.indices,
+        reverse_graph.data,
+    )
+
+    # Every state is (favorite row, artist) with its best cost so far and
+    # the link count and strength sum of the path that achieved it
+    keys = np.arange(len(roots), dtype=np.int64) * n_nodes + roots
+    costs = np.zeros(len(keys))
+    hops = np.zeros(len(keys), dtype=np.int32)
+    strength_sums = np.zeros(len(keys))
+    frontier = keys
+    level_states: list[np.ndarray] = []
+    level_predecessors: list[np.ndarray] = []
+
+    for hop in range(1, max_hops + 1):
+        if len(frontier) == 0:
+            break
+        at = np.searchsorted(keys, frontier)
+        heads = frontier % n_nodes
+        starts = indptr[heads].astype(np.int64)
+        counts = indptr[heads + 1] - starts
+        # Positions of every incoming link of every frontier state
+        owner = np.repeat(np.arange(len(frontier)), counts)
+        positions = (
+            np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        ) + starts[owner]
+
+        candidate_keys = (frontier[owner] - heads[owner]) + indices[positions]
+        candidate_costs = costs[at][owner] + data[positions]
+        candidate_sums = strength_sums[at][owner] + reverse_strengths[positions]
+        successors = heads[owner]
+
+        # Cheapest candidate per state; ties go to the lowest next artist
+        order = np.lexsort((successors, candidate_costs, candidate_keys))
+        candidate_keys = candidate_keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = candidate_keys[1:] != candidate_keys[:-1]
+        best = order[first]
+        candidate_keys = candidate_keys[first]
+
+        slot = np.minimum(np.searchsorted(keys, candidate_keys), len(keys) - 1)
+        known = keys[slot] == candidate_keys
+        better = ~known | (candidate_costs[best] < costs[slot])
+        best, candidate_keys = best[better], candidate_keys[better]
+        known, slot = known[better], slot[better]
+
+        # Update known states in place and merge new ones into the arrays
+        updated = slot[known]
+        costs[updated] = candidate_costs[best[known]]
+        hops[updated] = hop
+        strength_sums[updated] = candidate_sums[best[known]]
+        added = best[~known]
+        keys = np.concatenate([keys, candidate_keys[~known]])
+        costs = np.concatenate([costs, candidate_costs[added]])
+        hops = np.concatenate([hops, np.full(len(added), hop, dtype=np.int32)])
+        strength_sums = np.concatenate([strength_sums, candidate_sums[added]])
+        merged = np.argsort(keys, kind="stable")
+        keys, costs = keys[merged], costs[merged]
+        hops, strength_sums = hops[merged], strength_sums[merged]
+
+        frontier = candidate_keys
+        level_states.append(frontier)
+        level_predecessors.append(successors[best].astype(np.int32))
+
+    # Lay the states out as an artists-by-favorites CSR, dropping the
+    # favorites' own zero-length paths
+    reached = hops > 0
+    rows, nodes = np.divmod(keys[reached], n_nodes)
+    order = np.lexsort((rows, nodes))
+    matrix_indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(nodes, minlength=n_nodes), out=matrix_indptr[1:])
+    return FavoriteNeighborhoods(
+        favorites=favorite_names,
+        max_hops=max_hops,
+        costs=sp.csr_matrix(
+            (costs[reached][order], rows[order].astype(np.int32), matrix_indptr),
+            shape=(n_nodes, len(roots)),
+        ),
+        hops=hops[reached][order],
+        avg_strengths=(strength_sums[reached] / hops[reached])[order],
+        level_states=level_states,
+        level_predecessors=level_predecessors,
+    )
+
+
+def neighborhood_matches(
+    neighborhoods: FavoriteNeighborhoods,
+    artist_to_idx: dict[str, int],
+    event_artists: list[str],
+    *,
+    max_cost: float | None = None,
+) -> list[NeighborhoodMatch]:
+    """
+    Event artists within the favorites' neighborhoods, by row gather.
+
+    Args:
+        neighborhoods: Neighborhoods from build_neighborhoods
+        artist_to_idx: Mapping from artist name to index
+        event_artists: List of event artist names
+        max_cost: Only keep paths whose total cost is at most this
+
+    Returns:
+        One NeighborhoodMatch per event artist and favorite pair, sorted by
+        avg_strength (descending)
+    """
+    names = sorted({name for name in event_artists if name in artist_to_idx})
+    nodes = np.array([artist_to_idx[name] for name in names], dtype=np.int64)
+    indptr = neighborhoods.costs.indptr
+    counts = indptr[nodes + 1] - indptr[nodes]
+    owner = np.repeat(np.arange(len(nodes)), counts)
+    positions = (
+        np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    ) + indptr[nodes][owner]
+
+    costs = np.asarray(neighborhoods.costs.data)[positions]
+    keep = (
+        np.ones(len(positions), dtype=bool) if max_cost is None else costs <= max_cost
+    )
+    matches = [
+        NeighborhoodMatch(
+            event_artist=names[artist],
+            favorite_artist=neighborhoods.favorites[favorite],
+            hops=int(hops),
+            total_cost=float(cost),
+            avg_strength=float(avg_strength),
+        )
+        for artist, favorite, hops, cost, avg_strength in zip(
+            owner[keep].tolist(),
+            neighborhoods.costs.indices[positions[keep]].tolist(),
+            neighborhoods.hops[positions[keep]].tolist(),
+            costs[keep].tolist(),
+            neighborhoods.avg_strengths[positions[keep]].tolist(),
+            strict=True,
+        )
+    ]
+    matches.sort(key=lambda match: match.avg_strength, reverse=True)
+    return matches
+
+
+def find_connections_from_neighborhoods(
+    neighborhoods: FavoriteNeighborhoods,
+    graph: sp.csr_matrix,
+    artist_to_idx: dict[str, int],
+    idx_to_artist: dict[int, str],
+    source_artists: list[str],
+    *,
+    target_artists: list[str],
+    strengths: np.ndarray,
+    events: list[Event],
+    max_cost: float | None = None,
+) -> list[ArtistPairConnections]:
+    """
+    Find the best bounded path for every event artist and favorite pair.
+
+    Equivalent to find_optimal_paths with max_hops=neighborhoods.max_hops
+    and max_paths_per_pair=1, for the favorites the neighborhoods were
+    built for.
+
+    Args:
+        neighborhoods: Neighborhoods from build_neighborhoods over graph
+        graph: Sparse CSR matrix with edge costs
+        artist_to_idx: Mapping from artist name to index
+        idx_to_artist: Mapping from index to artist name
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        strengths: Relationship strengths aligned with graph.data
+        events: List of Event objects
+        max_cost: Only keep paths whose total cost is at most this
+
+    Returns:
+        List of ArtistPairConnections, sorted by best_avg_strength (descending)
+    """
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
+    favorite_rows = {
+        artist_to_idx[name]: row for row, name in enumerate(neighborhoods.favorites)
+    }
+    wanted = np.zeros(len(neighborhoods.favorites), dtype=bool)
+    wanted[[favorite_rows[t] for t in target_indices if t in favorite_rows]] = True
+    if not source_nodes or not wanted.any():
+        return []
+
+    # Gather the event artists' rows, keeping the requested favorites
+    sources = np.array(sorted(source_nodes), dtype=np.int64)
+    rows_of = neighborhoods.costs[sources].tocoo()
+    pair_sources = sources[rows_of.row]
+    pair_rows = rows_of.col.astype(np.int64)
+    keep = wanted[pair_rows]
+    if max_cost is not None:
+        keep &= rows_of.data <= max_cost
+    pair_sources, pair_rows = pair_sources[keep], pair_rows[keep]
+
+    # Walks from the event artist follow the levels to the favorite
+    nodes, offsets = walk_hop_levels(
+        neighborhoods.level_states,
+        neighborhoods.level_predecessors,
+        pair_rows,
+        pair_sources,
+        np.ones(len(pair_rows), dtype=bool),
+        n_nodes=graph.shape[0],
+    )
+    return group_found_paths(
+        pair_sources,
+        nodes,
+        offsets,
+        source_nodes,
+        graph,
+        strengths=strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=1,
+    )
+
+
+def _neighborhood_key(favorites: list[str], max_hops: int) -> str:
+    """Cache key for the neighborhoods over one compiled graph."""
+    payload = json.dumps(
+        {
+            "format_version": NEIGHBORHOOD_FORMAT_VERSION,
+            "favorites": sorted(set(favorites)),
+            "max_hops": max_hops,
+        }
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return digest[:NEIGHBORHOOD_KEY_LENGTH]
+
+
+def save_neighborhoods(neighborhoods: FavoriteNeighborhoods, directory: Path):
+    """Write neighborhoods to a directory, replacing any earlier copy."""
+    scratch_dir = directory.with_name(f".{directory.name}.tmp")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir(parents=True)
+
+    level_offsets = np.zeros(len(neighborhoods.level_states) + 1, dtype=np.int64)
+    np.cumsum(
+        [len(states) for states in neighborhoods.level_states], out=level_offsets[1:]
+    )
+    arrays = {
+        "indptr": neighborhoods.costs.indptr,
+        "indices": neighborhoods.costs.indices,
+        "costs": neighborhoods.costs.data,
+        "hops": neighborhoods.hops,
+        "avg_strengths": neighborhoods.avg_strengths,
+        "level_states": np.concatenate(
+            [np.zeros(0, dtype=np.int64), *neighborhoods.level_states]
+        ),
+        "level_predecessors": np.concatenate(
+            [np.zeros(0, dtype=np.int32), *neighborhoods.level_predecessors]
+        ),
+        "level_offsets": level_offsets,
+    }
+    for name, array in arrays.items():
+        np.save(scratch_dir / f"{name}.npy", np.ascontiguousarray(array))
+    meta = {
+        "format_version": NEIGHBORHOOD_FORMAT_VERSION,
+        "favorites": neighborhoods.favorites,
+        "max_hops": neighborhoods.max_hops,
+        "shape": list(neighborhoods.costs.shape),
+    }
+    with open(scratch_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    scratch_dir.rename(directory)
+
+
+def open_neighborhoods(directory: Path) -> FavoriteNeighborhoods | None:
+    """
+    Memory-map saved neighborhoods.
+
+    Returns:
+        The neighborhoods, or None if they are missing or outdated
+    """
+    try:
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if meta.get("format_version") != NEIGHBORHOOD_FORMAT_VERSION:
+        return None
+
+    arrays = {
+        name: np.load(directory / f"{name}.npy", mmap_mode="r")
+        for name in NEIGHBORHOOD_ARRAYS
+    }
+    level_offsets = arrays["level_offsets"]
+    levels = list(pairwise(level_offsets.tolist()))
+    return FavoriteNeighborhoods(
+        favorites=meta["favorites"],
+        max_hops=meta["max_hops"],
+        costs=sp.csr_matrix(
+            (arrays["costs"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(meta["shape"]),
+        ),
+        hops=arrays["hops"],
+        avg_strengths=arrays["avg_strengths"],
+        level_states=[arrays["level_states"][start:end] for start, end in levels],
+        level_predecessors=[
+            arrays["level_predecessors"][start:end] for start, end in levels
+        ],
+    )
+
+
+def load_neighborhoods(
+    compiled_graph: CompiledGraph,
+    favorites: list[str],
+    max_hops: int = DEFAULT_NEIGHBORHOOD_HOPS,
+) -> FavoriteNeighborhoods:
+    """
+    Load the favorites' neighborhoods cached with a compiled graph.
+
+    The neighborhoods are built and cached if missing. Cached copies live
+    in the compiled graph's directory, keyed by the favorites and
+    max_hops, so they go away with the graph when the similarity map
+    changes.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+        favorites: Favorite artist names (unknown names are ignored)
+        max_hops: Maximum number of links per path
+
+    Returns:
+        FavoriteNeighborhoods for compiled_graph
+    """
+    directory = (
+        compiled_graph.cache_dir
+        / NEIGHBORHOOD_DIR_NAME
+        / _neighborhood_key(favorites, max_hops)
+    )
+    neighborhoods = open_neighborhoods(directory)
+    if neighborhoods is not None:
+        logger.info("Using favorite neighborhood cache: %s", directory)
+        return neighborhoods
+
+    logger.info(
+        "Building %d-hop neighborhoods of %d favorites", max_hops, len(favorites)
+    )
+    neighborhoods = build_neighborhoods(
+        compiled_graph.graph,
+        compiled_graph.strengths,
+        compiled_graph.names,
+        favorites,
+        max_hops,
+    )
+    logger.info(
+        "  %d artists within %d hops of a favorite (%d artist-favorite pairs)",
+        int(np.count_nonzero(np.diff(neighborhoods.costs.indptr))),
+        max_hops,
+        neighborhoods.costs.nnz,
+    )
+    save_neighborhoods(neighborhoods, directory)
+    return open_neighborhoods(directory) or neighborhoods
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Rank event artists by personalized PageRank from the favorites.
+
+Shortest paths only capture the single best route to a favorite. This
+engine instead lets a random walker start at a favorite, follow
+similarity links in proportion to their strength and jump back to a
+random favorite with probability 1 - damping. How often the walker visits
+an artist scores its relevance to the favorites as a whole, over every
+route at once.
+
+The score vector is computed by power iteration on the row-normalized
+strength matrix, one sparse mat-vec per step, and cached next to the
+compiled graph keyed by the favorites and parameters.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.data_loader import load_artist_list, load_events
+from src.graph_cache import CompiledGraph, load_compiled_graph
+
+logger = logging.getLogger(__name__)
+
+PAGERANK_DIR_NAME = "pagerank"
+DEFAULT_DAMPING = 0.85
+DEFAULT_TOLERANCE = 1e-10
+DEFAULT_MAX_ITERATIONS = 200
+
+# Bump when the score computation changes to invalidate cached vectors
+PAGERANK_FORMAT_VERSION = 1
+PAGERANK_KEY_LENGTH = 16
+
+
+def transition_matrix(graph: sp.csr_matrix, strengths: np.ndarray) -> sp.csr_matrix:
+    """
+    Transposed random-walk transition matrix of the similarity graph.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
+
+    Returns:
+        CSR matrix whose (v, u) entry is the probability of stepping from
+        u to v: u's strength to v over u's total outgoing strength
+    """
+    rows = np.repeat(np.arange(graph.shape[0]), np.diff(graph.indptr))
+    out_strength = np.bincount(rows, weights=strengths, minlength=graph.shape[0])
+    probabilities = strengths / out_strength[rows]
+    forward = sp.csr_matrix(
+        (probabilities, graph.indices, graph.indptr), shape=graph.shape
+    )
+    return forward.T.tocsr()
+
+
+def personalized_pagerank(
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
+    seeds: list[int] | np.ndarray,
+    *,
+    damping: float = DEFAULT_DAMPING,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+) -> np.ndarray:
+    """
+    Personalized PageRank scores for a set of seed nodes.
+
+    Walkers at artists with no outgoing links jump back to the seeds.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
+        seeds: Node indices the walk restarts from, weighted equally
+        damping: Probability of following a link rather than restarting
+        tolerance: Stop once the L1 change of the scores falls below this
+        max_iterations: Stop after this many steps even if not converged
+
+    Returns:
+        Score per node, summing to 1 (all zeros without seeds)
+    """
+    n_nodes = graph.shape[0]
+    seeds = np.unique(np.asarray(seeds, dtype=np.int64))
+    if len(seeds) == 0:
+        return np.zeros(n_nodes)
+
+    restart = np.zeros(n_nodes)
+    restart[seeds] = 1.0 / len(seeds)
+    transition = transition_matrix(graph, strengths)
+    dangling = np.diff(graph.indptr) == 0
+
+    scores = restart.copy()
+    for iteration in range(1, max_iterations + 1):
+        stranded = scores[dangling].sum()
+        updated = (
+            damping * (transition @ scores)
+            + (damping * stranded + 1.0 - damping) * restart
+        )
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            logger.info(
+                "Personalized PageRank converged after %d iterations", iteration
+            )
+            break
+    else:
+        logger.warning(
+            "Personalized PageRank did not converge in %d iterations (change %.2e)",
+            max_iterations,
+            change,
+        )
+    return scores
+
+
+def _scores_key(
+    favorites: list[str], damping: float, tolerance: float, max_iterations: int
+) -> str:
+    """Cache key for a score vector over one compiled graph."""
+    payload = json.dumps(
+        {
+            "format_version": PAGERANK_FORMAT_VERSION,
+            "favorites": sorted(set(favorites)),
+            "damping": damping,
+            "tolerance": tolerance,
+            "max_iterations": max_iterations,
+        }
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:PAGERANK_KEY_LENGTH]
+
+
+def load_favorite_scores(
+    compiled_graph: CompiledGraph,
+    favorites: list[str],
+    *,
+    damping: float = DEFAULT_DAMPING,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+) -> np.ndarray:
+    """
+    Load the favorites' score vector cached with a compiled graph.
+
+    The vector is computed and cached if missing. Cached vectors live in
+    the compiled graph's directory, so they go away with the graph when
+    the similarity map changes.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+        favorites: Favorite artist names (unknown names are ignored)
+        damping: Probability of following a link rather than restarting
+        tolerance: Stop once the L1 change of the scores falls below this
+        max_iterations: Stop after this many steps even if not converged
+
+    Returns:
+        Score per node of compiled_graph
+    """
+    directory = compiled_graph.cache_dir / PAGERANK_DIR_NAME
+    path = directory / (
+        _scores_key(favorites, damping, tolerance, max_iterations) + ".npy"
+    )
+    if path.exists():
+        logger.info("Using cached favorite scores: %s", path)
+        return np.load(path)
+
+    artist_to_idx = compiled_graph.artist_to_idx
+    seeds = [artist_to_idx[name] for name in favorites if name in artist_to_idx]
+    logger.info(
+        "Computing favorite scores from %d of %d favorites", len(seeds), len(favorites)
+    )
+    scores = personalized_pagerank(
+        compiled_graph.graph,
+        compiled_graph.strengths,
+        seeds,
+        damping=damping,
+        tolerance=tolerance,
+        max_iterations=max_iterations,
+    )
+
+    # Write then rename, so readers never see a partial file
+    directory.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f".{path.name}")
+    with open(scratch, "wb") as f:
+        np.save(f, scores)
+    os.replace(scratch, path)
+    return scores
+
+
+def rank_artists(
+    scores: np.ndarray,
+    artist_to_idx: dict[str, int],
+    artists: list[str],
+) -> list[tuple[str, float]]:
+    """
+    Order artists by score.
+
+    Args:
+        scores: Score per node
+        artist_to_idx: Mapping from artist name to index
+        artists: Artist names to rank; names not in the graph score 0
+
+    Returns:
+        List of (artist, score), highest score first, ties by name
+    """
+    ranked = [
+        (
+            artist,
+            float(scores[artist_to_idx[artist]]) if artist in artist_to_idx else 0.0,
+        )
+        for artist in set(artists)
+    ]
+    ranked.sort(key=lambda item: (-item[1], item[0]))
+    return ranked
+
+
+def main():
+    """Rank the artists of an events file by relevance to the favorites."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.favorite_relevance",
+        description="Rank event artists by personalized PageRank from favorites.",
+    )
+    parser.add_argument("events_file", type=Path, help="Events JSON file")
+    parser.add_argument(
+        "--similar-artists-file",
+        type=Path,
+        default=Path("output") / "similar_artists_map.json",
+        help="Similarity map JSON (default: output/similar_artists_map.json)",
+    )
+    parser.add_argument(
+        "--favorites-file",
+        type=Path,
+        default=Path("output") / "my_artists.json",
+        help="Favorite artists JSON (default: output/my_artists.json)",
+    )
+    parser.add_argument("--top", type=int, default=50, help="Number of artists to show")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    compiled_graph = load_compiled_graph(args.similar_artists_file)
+    favorites = load_artist_list(args.favorites_file)
+    scores = load_favorite_scores(compiled_graph, favorites)
+
+    event_artists = [
+        artist.name
+        for event in load_events(args.events_file)
+        for artist in event.artists
+    ]
+    ranked = rank_artists(scores, compiled_graph.artist_to_idx, event_artists)
+    for position, (artist, score) in enumerate(ranked[: args.top], start=1):
+        logger.info("%3d. %s (%.3e)", position, artist, score)
+
+
+if __name__ == "__main__":
+    main()
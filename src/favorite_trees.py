@@ -0,0 +1,513 @@
+"""
+Favorite-rooted shortest path trees cached across weekly runs.
+
+The favorites barely change from week to week; only the event artists
+do. So one reverse shortest path tree is computed per favorite and kept
+on disk as float32 distance and int32 predecessor matrices (one row per
+favorite). A run then answers every event artist → favorite connection
+by a lookup and a batch walk down the tree, without any Dijkstra.
+
+When the similarity map changes, the trees are refreshed incrementally
+against a snapshot of the graph they were built on:
+
+- a favorite whose tree used an edge that was removed or got costlier is
+  rebuilt from scratch;
+- added or cheaper edges are repaired in place, by a Dijkstra that only
+  visits the artists whose distance actually improves.
+"""
+
+import heapq
+import json
+import logging
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from src.artist_connection_search import (
+    NO_PATH_SENTINEL,
+    group_found_paths,
+    reconstruct_paths_batch,
+    resolve_search_endpoints,
+    search_chunk_rows,
+)
+from src.graph_cache import NAME_SEPARATOR, CompiledGraph
+from src.models import ArtistPairConnections, Event
+
+logger = logging.getLogger(__name__)
+
+FAVORITE_TREES_FORMAT_VERSION = 1
+FAVORITE_TREES_DIR = Path("output") / "favorite_trees"
+
+# Relative improvement a repair must make to count; float32 distances
+# cannot resolve smaller differences
+FLOAT32_SLACK = 2.0**-20
+
+# Snapshot of the graph the trees were built on, for diffing on refresh
+SNAPSHOT_ARRAYS = ("indptr", "indices", "costs")
+
+
+@dataclass(frozen=True)
+class FavoriteTrees:
+    """
+    Reverse shortest path trees rooted at the favorites.
+
+    distances[i, v] is the cost of the cheapest path from v to
+    favorites[i] (inf if none) and predecessors[i, v] the next artist on
+    that path (NO_PATH_SENTINEL at the favorite and for unreachable
+    artists).
+    """
+
+    favorites: list[str]
+    distances: np.ndarray
+    predecessors: np.ndarray
+
+
+@dataclass(frozen=True)
+class EdgeChanges:
+    """Edges that differ between two versions of the graph."""
+
+    # Edges (in the old graph's ids) that were removed or got costlier
+    worse_tails: np.ndarray
+    worse_heads: np.ndarray
+    # Edges (in the new graph's ids) that were added or got cheaper
+    better_tails: np.ndarray
+    better_heads: np.ndarray
+    better_costs: np.ndarray
+
+
+def compute_trees(
+    reverse_graph: sp.csr_matrix,
+    roots: np.ndarray,
+    memory_budget_bytes: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Full reverse shortest path trees for some favorites.
+
+    Args:
+        reverse_graph: Transposed cost graph
+        roots: Favorite node indices
+        memory_budget_bytes: Cap on Dijkstra's working matrices
+
+    Returns:
+        Tuple of (distances, predecessors) as float32 and int32 matrices
+        with one row per root
+    """
+    n_nodes = reverse_graph.shape[0]
+    distances = np.empty((len(roots), n_nodes), dtype=np.float32)
+    predecessors = np.empty((len(roots), n_nodes), dtype=np.int32)
+    chunk_rows = search_chunk_rows(n_nodes, len(roots), memory_budget_bytes)
+    for start in range(0, len(roots), chunk_rows):
+        chunk = slice(start, start + chunk_rows)
+        dist, pred = dijkstra(
+            reverse_graph, indices=roots[chunk], return_predecessors=True
+        )
+        distances[chunk] = dist
+        predecessors[chunk] = pred
+    return distances, predecessors
+
+
+def diff_graphs(
+    old_graph: sp.csr_matrix,
+    old_to_new: np.ndarray,
+    new_graph: sp.csr_matrix,
+) -> EdgeChanges:
+    """
+    Compare the edges of two versions of the graph.
+
+    Args:
+        old_graph: Cost graph the trees were built on
+        old_to_new: New id of each old node (-1 if it is gone)
+        new_graph: Current cost graph
+
+    Returns:
+        EdgeChanges between the two graphs
+    """
+    n_new = new_graph.shape[0]
+    old_tails = np.repeat(np.arange(old_graph.shape[0]), np.diff(old_graph.indptr))
+    old_heads = np.asarray(old_graph.indices, dtype=np.int64)
+    old_costs = np.asarray(old_graph.data)
+    mapped_tails = old_to_new[old_tails]
+    mapped_heads = old_to_new[old_heads]
+    kept = (mapped_tails >= 0) & (mapped_heads >= 0)
+
+    new_tails = np.repeat(np.arange(n_new), np.diff(new_graph.indptr))
+    new_heads = np.asarray(new_graph.indices, dtype=np.int64)
+    new_costs = np.asarray(new_graph.data)
+    new_keys = new_tails * n_new + new_heads
+    order = np.argsort(new_keys, kind="stable")
+
+    # Locate every surviving old edge among the new edges
+    old_keys = np.where(kept, mapped_tails * n_new + mapped_heads, -1)
+    sorted_positions = np.searchsorted(new_keys[order], old_keys)
+    positions = order[np.minimum(sorted_positions, max(len(new_keys) - 1, 0))]
+    found = kept & (len(new_keys) > 0)
+    found[found] = new_keys[positions[found]] == old_keys[found]
+    worse = ~found
+    worse[found] = new_costs[positions[found]] > old_costs[found]
+
+    # New edges that did not exist before, or got cheaper
+    better = np.ones(len(new_keys), dtype=bool)
+    better[positions[found]] = new_costs[positions[found]] < old_costs[found]
+
+    return EdgeChanges(
+        worse_tails=old_tails[worse],
+        worse_heads=old_heads[worse],
+        better_tails=new_tails[better],
+        better_heads=new_heads[better],
+        better_costs=new_costs[better],
+    )
+
+
+def repair_tree(
+    reverse_graph: sp.csr_matrix,
+    distances: np.ndarray,
+    predecessors: np.ndarray,
+    changes: EdgeChanges,
+) -> int:
+    """
+    Update one tree in place for added or cheaper edges.
+
+    Only distances can drop, so a Dijkstra seeded with the improvements
+    the changed edges offer and spreading only further improvements
+    yields the new tree.
+
+    Args:
+        reverse_graph: Transposed current cost graph
+        distances: Tree distances, already in the current graph's ids
+        predecessors: Tree predecessors, already in the current graph's ids
+        changes: Edge changes; only the better edges are used
+
+    Returns:
+        Number of artists whose distance improved
+    """
+    offered = changes.better_costs + distances[changes.better_heads]
+    improves = offered < distances[changes.better_tails] * (1 - FLOAT32_SLACK)
+    heap = list(
+        zip(
+            offered[improves].tolist(),
+            changes.better_tails[improves].tolist(),
+            changes.better_heads[improves].tolist(),
+            strict=True,
+        )
+    )
+    heapq.heapify(heap)
+
+    indptr, indices, costs = (
+        reverse_graph.indptr,
+        reverse_graph.indices,
+        reverse_graph.data,
+    )
+    improved = set()
+    while heap:
+        dist, node, successor = heapq.heappop(heap)
+        if node in improved or not dist < distances[node] * (1 - FLOAT32_SLACK):
+            continue
+        improved.add(node)
+        distances[node] = dist
+        predecessors[node] = successor
+
+        # Artists linking to node may now reach the favorite through it
+        start, end = indptr[node], indptr[node + 1]
+        for tail, cost in zip(
+            indices[start:end].tolist(), costs[start:end].tolist(), strict=True
+        ):
+            if dist + cost < distances[tail] * (1 - FLOAT32_SLACK):
+                heapq.heappush(heap, (dist + cost, tail, node))
+    return len(improved)
+
+
+def refresh_trees(
+    trees: FavoriteTrees,
+    old_graph: sp.csr_matrix,
+    old_names: list[str],
+    compiled_graph: CompiledGraph,
+    favorites: list[str],
+    *,
+    memory_budget_bytes: int | None = None,
+) -> FavoriteTrees:
+    """
+    Bring cached trees up to date with the current graph and favorites.
+
+    Args:
+        trees: Trees built on old_graph
+        old_graph: Cost graph the trees were built on
+        old_names: Artist name of each node of old_graph
+        compiled_graph: Current graph
+        favorites: Current favorites in the graph, sorted
+        memory_budget_bytes: Cap on Dijkstra's working matrices
+
+    Returns:
+        FavoriteTrees for the current graph and favorites (in memory)
+    """
+    artist_to_idx = compiled_graph.artist_to_idx
+    n_nodes = len(compiled_graph.names)
+    if compiled_graph.names[: len(old_names)] == old_names:
+        # Compiled graphs keep node ids stable across map updates
+        old_to_new = np.arange(len(old_names), dtype=np.int64)
+    else:
+        old_to_new = np.array(
+            [artist_to_idx.get(name, -1) for name in old_names], dtype=np.int64
+        )
+    changes = diff_graphs(old_graph, old_to_new, compiled_graph.graph)
+
+    old_rows = {name: row for row, name in enumerate(trees.favorites)}
+    distances = np.full((len(favorites), n_nodes), np.inf, dtype=np.float32)
+    predecessors = np.full((len(favorites), n_nodes), NO_PATH_SENTINEL, dtype=np.int32)
+    kept_old = np.flatnonzero(old_to_new >= 0)
+    kept_new = old_to_new[kept_old]
+
+    rebuild = []
+    repaired = 0
+    for row, favorite in enumerate(favorites):
+        old_row = old_rows.get(favorite)
+        if old_row is None:
+            rebuild.append(row)
+            continue
+
+        # A removed or costlier edge only matters if the tree used it
+        old_predecessors = np.asarray(trees.predecessors[old_row])
+        if (old_predecessors[changes.worse_tails] == changes.worse_heads).any():
+            rebuild.append(row)
+            continue
+
+        distances[row, kept_new] = trees.distances[old_row, kept_old]
+        moved = old_predecessors[kept_old]
+        predecessors[row, kept_new] = np.where(
+            moved == NO_PATH_SENTINEL,
+            NO_PATH_SENTINEL,
+            old_to_new[np.maximum(moved, 0)],
+        )
+        repaired += repair_tree(
+            compiled_graph.reverse_graph,
+            distances[row],
+            predecessors[row],
+            changes,
+        )
+
+    if rebuild:
+        roots = np.array([artist_to_idx[favorites[row]] for row in rebuild])
+        distances[rebuild], predecessors[rebuild] = compute_trees(
+            compiled_graph.reverse_graph, roots, memory_budget_bytes
+        )
+
+    logger.info(
+        "Refreshed favorite trees: %d rebuilt, %d repaired (%d artists improved)",
+        len(rebuild),
+        len(favorites) - len(rebuild),
+        repaired,
+    )
+    return FavoriteTrees(favorites, distances, predecessors)
+
+
+def _sparsification_meta(compiled_graph: CompiledGraph) -> dict | None:
+    """Sparsification of the graph, as recorded with the trees."""
+    if compiled_graph.sparsification is None:
+        return None
+    return asdict(compiled_graph.sparsification)
+
+
+def save_favorite_trees(
+    trees: FavoriteTrees, compiled_graph: CompiledGraph, directory: Path
+):
+    """
+    Write trees and a snapshot of their graph, replacing any previous ones.
+
+    Args:
+        trees: Trees to write
+        compiled_graph: Graph the trees were built on
+        directory: Target directory
+    """
+    scratch_dir = directory.with_name(f".{directory.name}.tmp")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir(parents=True)
+
+    np.save(scratch_dir / "distances.npy", trees.distances)
+    np.save(scratch_dir / "predecessors.npy", trees.predecessors)
+    graph = compiled_graph.graph
+    for name, array in zip(
+        SNAPSHOT_ARRAYS, (graph.indptr, graph.indices, graph.data), strict=True
+    ):
+        np.save(scratch_dir / f"graph_{name}.npy", np.ascontiguousarray(array))
+    (scratch_dir / "names.bin").write_bytes(
+        NAME_SEPARATOR.join(compiled_graph.names).encode("utf-8")
+    )
+    meta = {
+        "format_version": FAVORITE_TREES_FORMAT_VERSION,
+        "source_hash": compiled_graph.source_hash,
+        "sparsification": _sparsification_meta(compiled_graph),
+        "n_nodes": len(compiled_graph.names),
+        "favorites": trees.favorites,
+    }
+    with open(scratch_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    scratch_dir.rename(directory)
+
+
+def open_favorite_trees(
+    directory: Path,
+) -> tuple[dict, FavoriteTrees] | None:
+    """
+    Memory-map saved trees.
+
+    Returns:
+        Tuple of (meta, trees), or None if missing or outdated
+    """
+    try:
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if meta.get("format_version") != FAVORITE_TREES_FORMAT_VERSION:
+        return None
+
+    trees = FavoriteTrees(
+        favorites=meta["favorites"],
+        distances=np.load(directory / "distances.npy", mmap_mode="r"),
+        predecessors=np.load(directory / "predecessors.npy", mmap_mode="r"),
+    )
+    return meta, trees
+
+
+def _open_snapshot(directory: Path, meta: dict) -> tuple[sp.csr_matrix, list[str]]:
+    """Graph and names the saved trees were built on."""
+    arrays = {
+        name: np.load(directory / f"graph_{name}.npy", mmap_mode="r")
+        for name in SNAPSHOT_ARRAYS
+    }
+    n = meta["n_nodes"]
+    names_blob = (directory / "names.bin").read_bytes().decode("utf-8")
+    graph = sp.csr_matrix(
+        (arrays["costs"], arrays["indices"], arrays["indptr"]), shape=(n, n)
+    )
+    return graph, names_blob.split(NAME_SEPARATOR) if n else []
+
+
+def load_favorite_trees(
+    compiled_graph: CompiledGraph,
+    favorites: list[str],
+    directory: Path = FAVORITE_TREES_DIR,
+    memory_budget_bytes: int | None = None,
+) -> FavoriteTrees:
+    """
+    Load the favorites' trees, building or refreshing them if needed.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+        favorites: Favorite artist names (unknown names are ignored)
+        directory: Directory holding the cached trees
+        memory_budget_bytes: Cap on Dijkstra's working matrices
+
+    Returns:
+        FavoriteTrees backed by read-only memory maps
+    """
+    artist_to_idx = compiled_graph.artist_to_idx
+    favorites = sorted({name for name in favorites if name in artist_to_idx})
+
+    opened = open_favorite_trees(directory)
+    if opened is not None:
+        meta, cached = opened
+        if (
+            meta["source_hash"] == compiled_graph.source_hash
+            and meta.get("sparsification") == _sparsification_meta(compiled_graph)
+            and cached.favorites == favorites
+        ):
+            logger.info("Using favorite tree cache: %s", directory)
+            return cached
+
+        logger.info("Refreshing favorite tree cache: %s", directory)
+        old_graph, old_names = _open_snapshot(directory, meta)
+        trees = refresh_trees(
+            cached,
+            old_graph,
+            old_names,
+            compiled_graph,
+            favorites,
+            memory_budget_bytes=memory_budget_bytes,
+        )
+    else:
+        logger.info("Building favorite trees for %d favorites", len(favorites))
+        roots = np.array([artist_to_idx[name] for name in favorites], dtype=np.int64)
+        trees = FavoriteTrees(
+            favorites,
+            *compute_trees(compiled_graph.reverse_graph, roots, memory_budget_bytes),
+        )
+
+    save_favorite_trees(trees, compiled_graph, directory)
+    return open_favorite_trees(directory)[1]
+
+
+def find_connections_from_trees(
+    trees: FavoriteTrees,
+    graph: sp.csr_matrix,
+    artist_to_idx: dict[str, int],
+    idx_to_artist: dict[int, str],
+    source_artists: list[str],
+    *,
+    target_artists: list[str],
+    strengths: np.ndarray,
+    events: list[Event],
+    max_cost: float | None = None,
+) -> list[ArtistPairConnections]:
+    """
+    Find the best path for every event artist and favorite pair from trees.
+
+    Equivalent to find_optimal_paths with max_paths_per_pair=1, for the
+    favorites the trees were built for.
+
+    Args:
+        trees: Trees from load_favorite_trees over graph
+        graph: Sparse CSR matrix with edge costs
+        artist_to_idx: Mapping from artist name to index
+        idx_to_artist: Mapping from index to artist name
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        strengths: Relationship strengths aligned with graph.data
+        events: List of Event objects
+        max_cost: Only keep paths whose total cost is at most this
+
+    Returns:
+        List of ArtistPairConnections, sorted by best_avg_strength (descending)
+    """
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
+    tree_rows = {artist_to_idx[name]: row for row, name in enumerate(trees.favorites)}
+    rows = np.array(
+        [tree_rows[target] for target in target_indices if target in tree_rows],
+        dtype=np.int64,
+    )
+    if not source_nodes or len(rows) == 0:
+        return []
+
+    sources = np.array(sorted(source_nodes), dtype=np.int64)
+    pair_rows = np.tile(rows, len(sources))
+    pair_sources = np.repeat(sources, len(rows))
+    costs = np.asarray(trees.distances[pair_rows, pair_sources])
+    keep = np.isfinite(costs)
+    if max_cost is not None:
+        # The float32 distances only preselect; the float64 path cost decides
+        keep &= costs <= max_cost * (1 + FLOAT32_SLACK)
+
+    # Walks from the event artist follow the tree to its favorite root
+    nodes, offsets = reconstruct_paths_batch(
+        trees.predecessors, pair_rows[keep], pair_sources[keep]
+    )
+    grouped = group_found_paths(
+        pair_sources[keep],
+        nodes,
+        offsets,
+        source_nodes,
+        graph,
+        strengths=strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=1,
+    )
+    if max_cost is not None:
+        grouped = [group for group in grouped if group.paths[0].total_cost <= max_cost]
+    return grouped
@@ -6,26 +6,43 @@ Loads event data, favorite artists, and similar artists graph,
 then finds optimal paths connecting them using weighted Dijkstra search.
 """
 
+import argparse
 import json
 import logging
 import subprocess
-import sys
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
 from pathlib import Path
 
-import scipy.sparse as sp
-
-from src.artist_connection_search import (
-    build_sparse_graph,
-    build_strength_lookup,
-    find_optimal_paths,
+from src.artist_connection_search import EdgeSparsification, find_optimal_paths
+from src.contraction_hierarchy import (
+    find_connections_with_hierarchy,
+    load_contraction_hierarchy,
+)
+from src.cost_models import (
+    COST_MODELS,
+    DEFAULT_COST_MODEL,
+    load_cost_model_graphs,
+    score_connections,
+)
+from src.data_loader import load_artist_list, load_events
+from src.favorite_neighborhoods import (
+    DEFAULT_NEIGHBORHOOD_HOPS,
+    find_connections_from_neighborhoods,
+    load_neighborhoods,
+    neighborhood_matches,
 )
-from src.data_loader import load_artist_list, load_events, load_similar_artists_map
+from src.favorite_trees import find_connections_from_trees, load_favorite_trees
+from src.graph_cache import load_compiled_graph
 from src.models import ArtistPairConnections, ConnectionPath, Event
+from src.search_pruning import prune_search_graph
+from src.widest_paths import find_widest_paths
 
 logger = logging.getLogger(__name__)
 
+# Cap on Dijkstra's working matrices; larger lineups are searched in chunks
+SEARCH_MEMORY_BUDGET_BYTES = 1 << 30
+
 
 def extract_unique_artists(events: list[Event]) -> list[str]:
     """Extract unique artist names from events."""
@@ -253,42 +270,15 @@ def save_summary_json_report(
         output_file: Path to save JSON report
     """
 
-    def serialize_pair(pair: ArtistPairConnections) -> dict:
-        """Convert ArtistPairConnections to dict."""
-        return {
-            "event_artist": pair.event_artist,
-            "favorite_artist": pair.favorite_artist,
-            "event_name": pair.event_name,
-            "event_venue": pair.event_venue,
-            "event_url": pair.event_url,
-            "best_path_score": pair.best_path_score,
-            "best_avg_strength": pair.best_avg_strength,
-            "hops": pair.paths[0].hops,
-            "paths": [
-                {
-                    "path": list(path.path),
-                    "path_strengths": list(path.path_strengths),
-                    "total_cost": path.total_cost,
-                    "path_score": path.path_score,
-                    "min_strength": path.min_strength,
-                    "max_strength": path.max_strength,
-                    "avg_strength": path.avg_strength,
-                    "hops": path.hops,
-                    "tier": path.tier,
-                }
-                for path in pair.paths
-            ],
-        }
-
     report = {
         "timestamp": datetime.now().isoformat(),
         "stats": stats,
-        "top_five_by_hops": [serialize_pair(pair) for pair in top_five_by_hops],
+        "top_five_by_hops": [pair.to_dict() for pair in top_five_by_hops],
         "top_five_by_best_path_score": [
-            serialize_pair(pair) for pair in top_five_by_best_path_score
+            pair.to_dict() for pair in top_five_by_best_path_score
         ],
         "connections": {
-            tier: [serialize_pair(pair) for pair in pairs]
+            tier: [pair.to_dict() for pair in pairs]
             for tier, pairs in connections_by_tier.items()
         },
     }
@@ -470,15 +460,141 @@ def git_commit_and_push(message: str, files: list[Path]):
         logger.warning("⚠ Git operation failed: %s", e)
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.find_event_connections",
+        description="Find connections between event artists and favorite artists.",
+    )
+    parser.add_argument("events_file", type=Path, help="Events JSON file")
+    parser.add_argument("date", help="Date label for the log and report files")
+    parser.add_argument(
+        "--max-hops",
+        type=int,
+        default=None,
+        help="Only consider paths with at most this many edges",
+    )
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        default=None,
+        help="Only consider paths whose total cost (sum of edge costs) is at most this",
+    )
+    parser.add_argument(
+        "--max-edges-per-artist",
+        type=int,
+        default=None,
+        help="Build the graph from only each artist's k strongest links",
+    )
+    parser.add_argument(
+        "--min-strength",
+        type=float,
+        default=None,
+        help="Build the graph from only links at least this strong",
+    )
+    parser.add_argument(
+        "--cost-model",
+        choices=sorted(COST_MODELS),
+        default=DEFAULT_COST_MODEL,
+        help=f"How link strength and rank turn into edge costs "
+        f"(default: {DEFAULT_COST_MODEL})",
+    )
+    parser.add_argument(
+        "--contraction-hierarchy",
+        action="store_true",
+        help="Answer from a cached contraction hierarchy (best path per pair only)",
+    )
+    parser.add_argument(
+        "--favorite-trees",
+        action="store_true",
+        help="Answer from cached per-favorite shortest path trees "
+        "(best path per pair only)",
+    )
+    parser.add_argument(
+        "--favorite-neighborhoods",
+        action="store_true",
+        help="Answer from the cached k-hop neighborhoods of the favorites, "
+        f"k = --max-hops (default: {DEFAULT_NEIGHBORHOOD_HOPS}; best path per "
+        "pair only)",
+    )
+    parser.add_argument(
+        "--no-prune",
+        action="store_true",
+        help="Search the whole graph instead of the part that can connect "
+        "event artists to favorites",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for large searches (default: 1)",
+    )
+    parser.add_argument(
+        "--widest",
+        action="store_true",
+        help="Maximize the weakest link instead of minimizing total cost",
+    )
+    parser.add_argument(
+        "--tree-paths",
+        action="store_true",
+        help="With --widest, report the spanning forest paths instead of the "
+        "fewest hops among equally wide paths (faster, but far longer paths)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.widest and (
+        args.max_hops is not None
+        or args.max_cost is not None
+        or args.contraction_hierarchy
+        or args.favorite_trees
+        or args.favorite_neighborhoods
+    ):
+        parser.error(
+            "--widest cannot be combined with --max-hops, --max-cost, "
+            "--contraction-hierarchy, --favorite-trees or --favorite-neighborhoods"
+        )
+    if args.tree_paths and not args.widest:
+        parser.error("--tree-paths requires --widest")
+    if args.contraction_hierarchy and args.max_hops is not None:
+        parser.error("--max-hops is not supported with --contraction-hierarchy")
+    if args.favorite_trees and (
+        args.max_hops is not None or args.contraction_hierarchy
+    ):
+        parser.error(
+            "--favorite-trees cannot be combined with --max-hops or "
+            "--contraction-hierarchy"
+        )
+    if args.favorite_neighborhoods and (
+        args.contraction_hierarchy or args.favorite_trees
+    ):
+        parser.error(
+            "--favorite-neighborhoods cannot be combined with "
+            "--contraction-hierarchy or --favorite-trees"
+        )
+    if args.cost_model != DEFAULT_COST_MODEL and (
+        args.contraction_hierarchy
+        or args.favorite_trees
+        or args.favorite_neighborhoods
+        or args.widest
+    ):
+        parser.error(
+            "--cost-model cannot be combined with --contraction-hierarchy, "
+            "--favorite-trees, --favorite-neighborhoods or --widest"
+        )
+    if args.max_hops is not None and args.max_hops < 1:
+        parser.error("--max-hops must be at least 1")
+    if args.max_cost is not None and args.max_cost <= 0:
+        parser.error("--max-cost must be positive")
+    if args.max_edges_per_artist is not None and args.max_edges_per_artist < 1:
+        parser.error("--max-edges-per-artist must be at least 1")
+    return args
+
+
 def main():
     """Main function to find and report artist connections."""
-    # Get parameters from command line
-    if len(sys.argv) < 3:
-        logger.error("Usage: python -m src.find_event_connections <events_file> <date>")
-        sys.exit(1)
-
-    events_file = Path(sys.argv[1])
-    date_str = sys.argv[2]
+    args = parse_args()
+    events_file = args.events_file
+    date_str = args.date
 
     # Configure logging
     output_dir = Path("output")
@@ -504,8 +620,20 @@ def main():
     similar_artists_file = output_dir / "similar_artists_map.json"
     favorites_file = output_dir / "my_artists.json"
 
-    similar_artists_map = load_similar_artists_map(similar_artists_file)
-    logger.info("  ✓ Loaded similar artists map: %d artists", len(similar_artists_map))
+    sparsification = None
+    if args.max_edges_per_artist is not None or args.min_strength is not None:
+        sparsification = EdgeSparsification(
+            max_edges_per_artist=args.max_edges_per_artist,
+            min_strength=args.min_strength,
+        )
+        logger.info("  Sparsifying graph: %s", sparsification)
+    compiled_graph = load_compiled_graph(
+        similar_artists_file, sparsification=sparsification
+    )
+    logger.info(
+        "  ✓ Loaded compiled similar artists graph: %d artists",
+        len(compiled_graph.names),
+    )
 
     events = load_events(events_file)
     logger.info("  ✓ Loaded events: %d events", len(events))
@@ -518,32 +646,155 @@ def main():
     event_artists = extract_unique_artists(events)
     logger.info("  ✓ Found %d unique artists across events", len(event_artists))
 
-    # Step 3: Build sparse graph and strength lookup
-    logger.info("Step 3: Building sparse graph from similarity data...")
-    graph: sp.csr_matrix
-    artist_to_idx: dict[str, int]
-    idx_to_artist: dict[int, str]
-    graph, artist_to_idx, idx_to_artist = build_sparse_graph(similar_artists_map)
+    # Step 3: Unpack sparse graph and edge strengths
+    logger.info("Step 3: Preparing sparse graph from compiled similarity data...")
+    graph, reverse_graph = load_cost_model_graphs(compiled_graph, args.cost_model)
+    artist_to_idx = compiled_graph.artist_to_idx
+    idx_to_artist = compiled_graph.idx_to_artist
     logger.info(
-        "  ✓ Graph built: %d nodes, %d edges", graph.shape[0], graph.nnz
+        "  ✓ Graph ready: %d nodes, %d edges (%s costs)",
+        graph.shape[0],
+        graph.nnz,
+        args.cost_model,
     )
 
-    logger.info("  Building strength lookup for fast path reconstruction...")
-    strength_lookup = build_strength_lookup(similar_artists_map)
-    logger.info("  ✓ Strength lookup built: %d edges", len(strength_lookup))
+
+    # Prune to the artists on some event artist → favorite path. Cached
+    # indexes cover the whole graph and widest paths ignore link direction,
+    # so those modes search the graph as is.
+    strengths = compiled_graph.strengths
+    if not (
+        args.no_prune
+        or args.contraction_hierarchy
+        or args.favorite_trees
+        or args.favorite_neighborhoods
+        or args.widest
+    ):
+        pruned = prune_search_graph(
+            graph,
+            strengths,
+            compiled_graph.names,
+            event_artists,
+            favorites,
+            reverse_graph=reverse_graph,
+        )
+        graph, strengths, reverse_graph = (
+            pruned.graph,
+            pruned.strengths,
+            pruned.reverse_graph,
+        )
+        artist_to_idx = pruned.artist_to_idx
+        idx_to_artist = pruned.idx_to_artist
+        logger.info(
+            "  ✓ Pruned graph: %d nodes, %d edges (%d of %d event artists "
+            "can reach a favorite)",
+            graph.shape[0],
+            graph.nnz,
+            pruned.report.n_reachable_sources,
+            pruned.report.n_sources,
+        )
 
     # Step 4: Find connections
     logger.info("Step 4: Running Dijkstra search to find optimal paths...")
-    grouped_connections = find_optimal_paths(
-        graph,
-        artist_to_idx,
-        idx_to_artist,
-        event_artists,
-        favorites,
-        strength_lookup,
-        events,
-        max_paths_per_pair=3,
-    )
+    if args.max_hops is not None or args.max_cost is not None:
+        logger.info(
+            "  Search bounds: max_hops=%s, max_cost=%s", args.max_hops, args.max_cost
+        )
+    if args.widest:
+        logger.info(
+            "  Using widest paths (best path per pair only, tree paths: %s)",
+            args.tree_paths,
+        )
+        grouped_connections = find_widest_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            favorites,
+            strengths=strengths,
+            events=events,
+            prefer_fewer_hops=not args.tree_paths,
+        )
+    elif args.contraction_hierarchy:
+        logger.info("  Using contraction hierarchy (best path per pair only)")
+        grouped_connections = find_connections_with_hierarchy(
+            load_contraction_hierarchy(compiled_graph),
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            target_artists=favorites,
+            strengths=compiled_graph.strengths,
+            events=events,
+            max_cost=args.max_cost,
+            memory_budget_bytes=SEARCH_MEMORY_BUDGET_BYTES,
+        )
+    elif args.favorite_trees:
+        logger.info("  Using favorite shortest path trees (best path per pair only)")
+        grouped_connections = find_connections_from_trees(
+            load_favorite_trees(
+                compiled_graph,
+                favorites,
+                memory_budget_bytes=SEARCH_MEMORY_BUDGET_BYTES,
+            ),
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            target_artists=favorites,
+            strengths=compiled_graph.strengths,
+            events=events,
+            max_cost=args.max_cost,
+        )
+    elif args.favorite_neighborhoods:
+        max_hops = args.max_hops or DEFAULT_NEIGHBORHOOD_HOPS
+        logger.info(
+            "  Using %d-hop favorite neighborhoods (best path per pair only)",
+            max_hops,
+        )
+        neighborhoods = load_neighborhoods(compiled_graph, favorites, max_hops)
+        matches = neighborhood_matches(
+            neighborhoods, artist_to_idx, event_artists, max_cost=args.max_cost
+        )
+        logger.info(
+            "  %d event artists within %d hops of a favorite: %s",
+            len({match.event_artist for match in matches}),
+            max_hops,
+            ", ".join(
+                f"{tier}: {count}"
+                for tier, count in sorted(
+                    Counter(match.tier for match in matches).items()
+                )
+            ),
+        )
+        grouped_connections = find_connections_from_neighborhoods(
+            neighborhoods,
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            target_artists=favorites,
+            strengths=compiled_graph.strengths,
+            events=events,
+            max_cost=args.max_cost,
+        )
+    else:
+        grouped_connections = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            favorites,
+            strengths,
+            events,
+            max_paths_per_pair=3,
+            reverse_graph=reverse_graph,
+            memory_budget_bytes=SEARCH_MEMORY_BUDGET_BYTES,
+            workers=args.workers,
+            max_hops=args.max_hops,
+            max_cost=args.max_cost,
+        )
+        grouped_connections = score_connections(grouped_connections, args.cost_model)
 
     # Count total paths
     total_paths = sum(len(group.paths) for group in grouped_connections)
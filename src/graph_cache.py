@@ -0,0 +1,549 @@
+"""
+Compiled, memory-mappable cache of the similar artists graph.
+
+Parsing similar_artists_map.json and building the CSR graph dominates the
+cold start of the connection search. The compiled form stores the CSR
+arrays (forward and reverse), the edge strengths and ranks and the artist
+name table as raw .npy/.bin files keyed by a content hash of the source
+JSON, so later runs only hash the file and memory-map the arrays.
+
+The scraper only ever appends artists to the map, so compiled graphs are
+append-only too. Node ids are stable: a recompile keeps the previous name
+table and appends new artists after it, so caches keyed on node ids stay
+valid across scraper runs. The adjacency is split into a base segment,
+hard-linked from the previous compile, and a small delta segment holding
+the rows that changed since the base was written. The delta is spliced
+into the CSR in memory on open and merged into a new base once it grows
+past DELTA_MERGE_FRACTION of the base.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.artist_connection_search import (
+    EdgeSparsification,
+    build_rank_lookup,
+    build_reverse_graph,
+    build_sparse_graph,
+    build_strength_lookup,
+)
+from src.data_loader import load_similar_artists_map
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes to invalidate old caches
+GRAPH_CACHE_FORMAT_VERSION = 4
+GRAPH_CACHE_DIR = Path("output") / "graph_cache"
+
+# Separator for the interned name table (cannot appear in artist names)
+NAME_SEPARATOR = "\x00"
+
+HASH_CHUNK_BYTES = 1 << 20
+HASH_PREFIX_LENGTH = 16
+
+ARRAY_FILES = (
+    "indptr",
+    "indices",
+    "costs",
+    "strengths",
+    "ranks",
+    "reverse_indptr",
+    "reverse_indices",
+    "reverse_costs",
+)
+
+# Rows replaced since the base segment was written, as a small CSR
+DELTA_ARRAY_FILES = (
+    "delta_rows",
+    "delta_indptr",
+    "delta_indices",
+    "delta_strengths",
+    "delta_ranks",
+)
+
+# Merge the delta into a new base once it holds this fraction of the
+# base's edges
+DELTA_MERGE_FRACTION = 0.1
+
+
+@dataclass(frozen=True)
+class CompiledGraph:
+    """
+    Similar artists graph in compiled form.
+
+    strengths is aligned with graph.data: strengths[p] is the relationship
+    strength of the edge stored at position p of the CSR arrays, and
+    ranks[p] its rank in the source artist's similar-artist list.
+    """
+
+    source_hash: str
+    names: list[str]
+    graph: sp.csr_matrix
+    reverse_graph: sp.csr_matrix
+    strengths: np.ndarray
+    ranks: np.ndarray
+    cache_dir: Path
+    sparsification: EdgeSparsification | None = None
+
+    @property
+    def artist_to_idx(self) -> dict[str, int]:
+        """Map artist name to node index."""
+        return {name: idx for idx, name in enumerate(self.names)}
+
+    @property
+    def idx_to_artist(self) -> dict[int, str]:
+        """Map node index to artist name."""
+        return dict(enumerate(self.names))
+
+
+def hash_file(filepath: Path) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def changed_rows(
+    base_graph: sp.csr_matrix,
+    base_edges: tuple[np.ndarray, ...],
+    graph: sp.csr_matrix,
+    edges: tuple[np.ndarray, ...],
+) -> np.ndarray:
+    """
+    Find the rows of a graph that differ from an earlier base graph.
+
+    Both graphs share node ids; the base may have fewer nodes, whose
+    missing rows count as empty.
+
+    Args:
+        base_graph: Earlier graph with sorted indices
+        base_edges: Per-edge arrays aligned with base_graph.data, such as
+            (strengths, ranks)
+        graph: Current graph with sorted indices
+        edges: The same per-edge arrays, aligned with graph.data
+
+    Returns:
+        Sorted ids of the rows whose edges or per-edge values differ
+    """
+    n_nodes, n_base = graph.shape[0], base_graph.shape[0]
+    base_indptr = np.full(n_nodes, base_graph.nnz, dtype=np.int64)
+    base_indptr[:n_base] = base_graph.indptr[:-1]
+    base_lengths = np.zeros(n_nodes, dtype=np.int64)
+    base_lengths[:n_base] = np.diff(base_graph.indptr)
+    lengths = np.diff(graph.indptr)
+
+    # Rows of equal length still differ if any entry does
+    same_length = base_lengths == lengths
+    rows = np.repeat(np.arange(n_nodes), lengths)
+    positions = np.flatnonzero(same_length[rows])
+    position_rows = rows[positions]
+    base_positions = (
+        base_indptr[position_rows] + positions - graph.indptr[position_rows]
+    )
+    differs = base_graph.indices[base_positions] != graph.indices[positions]
+    for base_values, values in zip(base_edges, edges, strict=True):
+        differs |= base_values[base_positions] != values[positions]
+
+    changed = ~same_length
+    changed[position_rows[differs]] = True
+    return np.flatnonzero(changed)
+
+
+def merge_delta(
+    base_graph: sp.csr_matrix,
+    base_strengths: np.ndarray,
+    base_ranks: np.ndarray,
+    n_nodes: int,
+    delta: dict[str, np.ndarray],
+) -> tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Splice the delta segment's rows into the base graph.
+
+    Args:
+        base_graph: Base segment's cost graph
+        base_strengths: Strengths aligned with base_graph.data
+        base_ranks: Ranks aligned with base_graph.data
+        n_nodes: Number of nodes of the merged graph
+        delta: Delta segment arrays, keyed by DELTA_ARRAY_FILES
+
+    Returns:
+        Tuple of (graph, strengths, ranks) with sorted indices
+    """
+    n_base = base_graph.shape[0]
+    delta_rows = np.asarray(delta["delta_rows"], dtype=np.int64)
+    delta_lengths = np.diff(delta["delta_indptr"])
+
+    lengths = np.zeros(n_nodes, dtype=np.int64)
+    lengths[:n_base] = np.diff(base_graph.indptr)
+    lengths[delta_rows] = delta_lengths
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+
+    # Every row comes whole from one segment, so each edge moves by its
+    # row's offset change
+    replaced = np.zeros(n_nodes, dtype=bool)
+    replaced[delta_rows] = True
+    base_rows = np.repeat(np.arange(n_base), np.diff(base_graph.indptr))
+    kept = np.flatnonzero(~replaced[base_rows])
+    base_shift = indptr[:n_base] - base_graph.indptr[:-1]
+    base_dest = kept + base_shift[base_rows[kept]]
+
+    delta_edge_rows = np.repeat(delta_rows, delta_lengths)
+    delta_dest = (
+        indptr[delta_edge_rows]
+        + np.arange(len(delta["delta_indices"]))
+        - np.repeat(delta["delta_indptr"][:-1], delta_lengths)
+    )
+
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    costs = np.empty(indptr[-1], dtype=np.float64)
+    strengths = np.empty(indptr[-1], dtype=np.float64)
+    ranks = np.empty(indptr[-1], dtype=np.int32)
+    indices[base_dest] = base_graph.indices[kept]
+    costs[base_dest] = base_graph.data[kept]
+    strengths[base_dest] = base_strengths[kept]
+    ranks[base_dest] = base_ranks[kept]
+    indices[delta_dest] = delta["delta_indices"]
+    costs[delta_dest] = 1.0 / delta["delta_strengths"]
+    strengths[delta_dest] = delta["delta_strengths"]
+    ranks[delta_dest] = delta["delta_ranks"]
+
+    graph = sp.csr_matrix(
+        (costs, indices, indptr.astype(np.int32)), shape=(n_nodes, n_nodes)
+    )
+    return graph, strengths, ranks
+
+
+def _write_base(
+    target_dir: Path, graph: sp.csr_matrix, strengths: np.ndarray, ranks: np.ndarray
+):
+    """Write a full base segment (forward and reverse CSR arrays)."""
+    reverse_graph = build_reverse_graph(graph)
+    reverse_graph.sort_indices()
+
+    arrays = {
+        "indptr": graph.indptr,
+        "indices": graph.indices,
+        "costs": graph.data,
+        "strengths": strengths,
+        "ranks": ranks,
+        "reverse_indptr": reverse_graph.indptr,
+        "reverse_indices": reverse_graph.indices,
+        "reverse_costs": reverse_graph.data,
+    }
+    for name, array in arrays.items():
+        np.save(target_dir / f"{name}.npy", np.ascontiguousarray(array))
+
+
+def _link_base(previous_dir: Path, target_dir: Path):
+    """Share the previous compile's base segment, copying if links fail."""
+    for name in ARRAY_FILES:
+        source = previous_dir / f"{name}.npy"
+        try:
+            os.link(source, target_dir / source.name)
+        except OSError:
+            shutil.copy2(source, target_dir / source.name)
+
+
+def _open_base(
+    graph_dir: Path, meta: dict
+) -> tuple[sp.csr_matrix, np.ndarray, np.ndarray]:
+    """Memory-map a compiled graph's base segment (forward only)."""
+    n_base = meta["n_base_nodes"]
+    arrays = {
+        name: np.load(graph_dir / f"{name}.npy", mmap_mode="r")
+        for name in ("indptr", "indices", "costs", "strengths", "ranks")
+    }
+    graph = sp.csr_matrix(
+        (arrays["costs"], arrays["indices"], arrays["indptr"]),
+        shape=(n_base, n_base),
+    )
+    return graph, arrays["strengths"], arrays["ranks"]
+
+
+def _read_names(graph_dir: Path, n_nodes: int) -> list[str]:
+    """Read a compiled graph's name table."""
+    names_blob = (graph_dir / "names.bin").read_bytes().decode("utf-8")
+    return names_blob.split(NAME_SEPARATOR) if n_nodes else []
+
+
+def compile_graph(
+    similar_artists_file: Path,
+    source_hash: str,
+    cache_dir: Path = GRAPH_CACHE_DIR,
+    previous_dir: Path | None = None,
+    sparsification: EdgeSparsification | None = None,
+) -> Path:
+    """
+    Parse the similarity map and write its compiled form to disk.
+
+    Args:
+        similar_artists_file: Path to similar_artists_map.json
+        source_hash: Content hash of similar_artists_file
+        cache_dir: Root directory for compiled graphs
+        previous_dir: Compiled graph of an earlier version of the map, whose
+            node ids and base segment are reused
+        sparsification: Weak links to drop (see build_sparse_graph)
+
+    Returns:
+        Directory holding the compiled graph
+    """
+    previous_meta = None if previous_dir is None else _read_meta(previous_dir)
+    previous_names = (
+        None
+        if previous_meta is None
+        else _read_names(previous_dir, previous_meta["n_nodes"])
+    )
+
+    similarity_map = load_similar_artists_map(similar_artists_file)
+    graph, artist_to_idx, _ = build_sparse_graph(
+        similarity_map, names=previous_names, sparsification=sparsification
+    )
+    names = sorted(artist_to_idx, key=artist_to_idx.__getitem__)
+    strengths = build_strength_lookup(
+        graph, similarity_map, artist_to_idx, sparsification=sparsification
+    )
+    ranks = build_rank_lookup(
+        graph, similarity_map, artist_to_idx, sparsification=sparsification
+    )
+
+    # Write into a scratch directory and rename, so readers never see a
+    # partially written cache
+    target_dir = cache_dir / source_hash[:HASH_PREFIX_LENGTH]
+    scratch_dir = cache_dir / f".{target_dir.name}.tmp"
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir(parents=True)
+
+    delta_rows = np.zeros(0, dtype=np.int64)
+    if previous_meta is not None:
+        base_graph, base_strengths, base_ranks = _open_base(previous_dir, previous_meta)
+        delta_rows = changed_rows(
+            base_graph, (base_strengths, base_ranks), graph, (strengths, ranks)
+        )
+    delta_lengths = np.diff(graph.indptr)[delta_rows]
+
+    if previous_meta is None or (
+        delta_lengths.sum() > DELTA_MERGE_FRACTION * base_graph.nnz
+    ):
+        _write_base(scratch_dir, graph, strengths, ranks)
+        delta_rows, delta_lengths = delta_rows[:0], delta_lengths[:0]
+        n_base_nodes, n_base_edges = len(names), int(graph.nnz)
+    else:
+        _link_base(previous_dir, scratch_dir)
+        n_base_nodes = previous_meta["n_base_nodes"]
+        n_base_edges = int(base_graph.nnz)
+
+    # Slice strengths rather than invert costs, which would not round-trip
+    delta_graph = sp.csr_matrix(
+        (strengths, graph.indices, graph.indptr), shape=graph.shape
+    )[delta_rows]
+    delta_ranks = sp.csr_matrix(
+        (ranks, graph.indices, graph.indptr), shape=graph.shape
+    )[delta_rows]
+    delta = {
+        "delta_rows": delta_rows,
+        "delta_indptr": delta_graph.indptr,
+        "delta_indices": delta_graph.indices,
+        "delta_strengths": delta_graph.data,
+        "delta_ranks": delta_ranks.data,
+    }
+    for name, array in delta.items():
+        np.save(scratch_dir / f"{name}.npy", np.ascontiguousarray(array))
+    (scratch_dir / "names.bin").write_bytes(NAME_SEPARATOR.join(names).encode("utf-8"))
+    meta = {
+        "format_version": GRAPH_CACHE_FORMAT_VERSION,
+        "source_file": str(similar_artists_file),
+        "source_hash": source_hash,
+        "n_nodes": len(names),
+        "n_edges": int(graph.nnz),
+        "n_base_nodes": n_base_nodes,
+        "n_base_edges": n_base_edges,
+        "n_delta_rows": len(delta_rows),
+        "n_delta_edges": int(delta_lengths.sum()),
+        "sparsification": _sparsification_meta(sparsification),
+        "created": datetime.now().isoformat(),
+    }
+    with open(scratch_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(target_dir, ignore_errors=True)
+    scratch_dir.rename(target_dir)
+
+    logger.info(
+        "Compiled graph (%d nodes, %d edges; delta of %d rows, %d edges) to %s",
+        meta["n_nodes"],
+        meta["n_edges"],
+        meta["n_delta_rows"],
+        meta["n_delta_edges"],
+        target_dir,
+    )
+    return target_dir
+
+
+def _sparsification_meta(sparsification: EdgeSparsification | None) -> dict | None:
+    """Metadata form of a sparsification (None when every link is kept)."""
+    if sparsification is None or sparsification == EdgeSparsification():
+        return None
+    return asdict(sparsification)
+
+
+def _read_meta(graph_dir: Path) -> dict | None:
+    """Read a compiled graph's metadata, or None if missing or unreadable."""
+    try:
+        with open(graph_dir / "meta.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _latest_compiled(cache_dir: Path) -> Path | None:
+    """Most recently compiled graph of the current format, if any."""
+    if not cache_dir.is_dir():
+        return None
+    candidates = []
+    for entry in cache_dir.iterdir():
+        meta = _read_meta(entry) if not entry.name.startswith(".") else None
+        if meta and meta.get("format_version") == GRAPH_CACHE_FORMAT_VERSION:
+            candidates.append((meta["created"], entry))
+    return max(candidates)[1] if candidates else None
+
+
+def _prune_stale(cache_dir: Path, keep: Path):
+    """Remove compiled graphs for older versions of the source file."""
+    for entry in cache_dir.iterdir():
+        if entry.is_dir() and entry != keep and not entry.name.startswith("."):
+            shutil.rmtree(entry, ignore_errors=True)
+            logger.info("Removed stale compiled graph: %s", entry)
+
+
+def _read_only(*arrays: np.ndarray):
+    """Freeze in-memory arrays, matching the read-only memory maps."""
+    for array in arrays:
+        array.flags.writeable = False
+
+
+def open_compiled_graph(graph_dir: Path) -> CompiledGraph:
+    """
+    Memory-map a compiled graph directory.
+
+    Without a delta segment the graph is served straight from the memory
+    maps; otherwise the delta rows are spliced in and the reverse graph
+    rebuilt in memory.
+
+    Args:
+        graph_dir: Directory written by compile_graph
+
+    Returns:
+        CompiledGraph backed by read-only memory maps
+    """
+    meta = _read_meta(graph_dir)
+    if meta is None:
+        raise FileNotFoundError(f"No compiled graph in {graph_dir}")
+
+    n = meta["n_nodes"]
+    names = _read_names(graph_dir, n)
+    graph, strengths, ranks = _open_base(graph_dir, meta)
+
+    if meta["n_delta_rows"] == 0 and meta["n_base_nodes"] == n:
+        arrays = {
+            name: np.load(graph_dir / f"{name}.npy", mmap_mode="r")
+            for name in ("reverse_indptr", "reverse_indices", "reverse_costs")
+        }
+        reverse_graph = sp.csr_matrix(
+            (
+                arrays["reverse_costs"],
+                arrays["reverse_indices"],
+                arrays["reverse_indptr"],
+            ),
+            shape=(n, n),
+        )
+    else:
+        delta = {name: np.load(graph_dir / f"{name}.npy") for name in DELTA_ARRAY_FILES}
+        graph, strengths, ranks = merge_delta(graph, strengths, ranks, n, delta)
+        reverse_graph = build_reverse_graph(graph)
+        reverse_graph.sort_indices()
+        _read_only(
+            graph.indptr,
+            graph.indices,
+            graph.data,
+            strengths,
+            ranks,
+            reverse_graph.indptr,
+            reverse_graph.indices,
+            reverse_graph.data,
+        )
+
+    return CompiledGraph(
+        source_hash=meta["source_hash"],
+        names=names,
+        graph=graph,
+        reverse_graph=reverse_graph,
+        strengths=strengths,
+        ranks=ranks,
+        cache_dir=graph_dir,
+        sparsification=EdgeSparsification(**meta["sparsification"])
+        if meta["sparsification"]
+        else None,
+    )
+
+
+def load_compiled_graph(
+    similar_artists_file: Path,
+    cache_dir: Path = GRAPH_CACHE_DIR,
+    sparsification: EdgeSparsification | None = None,
+) -> CompiledGraph:
+    """
+    Load the compiled graph for a similarity map, compiling it if needed.
+
+    The cache is keyed by the SHA-256 of the JSON file, so it is rebuilt
+    exactly when the map's contents change. A rebuild extends the most
+    recent compiled graph, keeping its node ids.
+
+    Args:
+        similar_artists_file: Path to similar_artists_map.json
+        cache_dir: Root directory for compiled graphs
+        sparsification: Weak links to drop; a cache compiled with a
+            different sparsification is recompiled
+
+    Returns:
+        CompiledGraph backed by read-only memory maps
+    """
+    if not similar_artists_file.exists():
+        error_msg = f"File not found: {similar_artists_file}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    source_hash = hash_file(similar_artists_file)
+    graph_dir = cache_dir / source_hash[:HASH_PREFIX_LENGTH]
+    meta = _read_meta(graph_dir)
+
+    if (
+        meta is not None
+        and meta.get("source_hash") == source_hash
+        and meta.get("format_version") == GRAPH_CACHE_FORMAT_VERSION
+        and meta.get("sparsification") == _sparsification_meta(sparsification)
+    ):
+        logger.info("Using compiled graph cache: %s", graph_dir)
+    else:
+        logger.info("Compiled graph cache miss, compiling %s", similar_artists_file)
+        graph_dir = compile_graph(
+            similar_artists_file,
+            source_hash,
+            cache_dir,
+            previous_dir=_latest_compiled(cache_dir),
+            sparsification=sparsification,
+        )
+        _prune_stale(cache_dir, keep=graph_dir)
+
+    return open_compiled_graph(graph_dir)
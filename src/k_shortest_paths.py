@@ -0,0 +1,355 @@
+"""Yen-style k-shortest loopless paths over the CSR cost graph."""
+
+import heapq
+from bisect import bisect_left
+from itertools import pairwise
+from math import inf
+
+import scipy.sparse as sp
+
+# Plain-list view of a CSR matrix: (indptr, indices, data)
+Adjacency = tuple[list[int], list[int], list[float]]
+
+
+def build_adjacency(graph: sp.csr_matrix) -> Adjacency:
+    """
+    Convert a CSR matrix to plain Python lists for fast scalar access.
+
+    Spur searches touch one edge at a time, where list indexing is much
+    cheaper than indexing into NumPy arrays.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs (sorted indices)
+
+    Returns:
+        Tuple of (indptr, indices, data) lists
+    """
+    if not graph.has_sorted_indices:
+        graph = graph.sorted_indices()
+    return graph.indptr.tolist(), graph.indices.tolist(), graph.data.tolist()
+
+
+def edge_cost(adjacency: Adjacency, tail: int, head: int) -> float | None:
+    """Return the cost of edge tail → head, or None if it does not exist."""
+    indptr, indices, data = adjacency
+    lo, hi = indptr[tail], indptr[tail + 1]
+    pos = bisect_left(indices, head, lo, hi)
+    if pos < hi and indices[pos] == head:
+        return data[pos]
+    return None
+
+
+def _prefix_costs(adjacency: Adjacency, path: tuple[int, ...]) -> list[float]:
+    """Cumulative cost from path[0] to each node of path."""
+    prefix = [0.0]
+    for tail, head in pairwise(path):
+        cost = edge_cost(adjacency, tail, head)
+        if cost is None:
+            raise ValueError(f"Edge {tail} -> {head} is not in the graph")
+        prefix.append(prefix[-1] + cost)
+    return prefix
+
+
+def _spur_search(
+    adjacency: Adjacency,
+    spur: int,
+    target: int,
+    *,
+    heuristic: list[float],
+    blocked_nodes: set[int],
+    blocked_next: set[int],
+    cost_limit: float,
+) -> tuple[float, list[int]] | None:
+    """
+    A* search from spur to target with nodes and spur edges removed.
+
+    The heuristic is the unrestricted distance to the target, which stays
+    admissible and consistent on any subgraph. Nodes whose optimistic total
+    cost exceeds cost_limit are never expanded.
+
+    Returns:
+        Tuple of (spur_cost, node_path) or None if no path within the limit
+    """
+    indptr, indices, data = adjacency
+    best = {spur: 0.0}
+    parent = {spur: -1}
+    closed: set[int] = set()
+    heap = [(heuristic[spur], 0.0, spur)]
+
+    while heap:
+        _, dist, node = heapq.heappop(heap)
+        if node in closed:
+            continue
+        if node == target:
+            path = [node]
+            while parent[node] != -1:
+                node = parent[node]
+                path.append(node)
+            path.reverse()
+            return dist, path
+        closed.add(node)
+
+        for pos in range(indptr[node], indptr[node + 1]):
+            nxt = indices[pos]
+            if nxt in closed or nxt in blocked_nodes:
+                continue
+            if node == spur and nxt in blocked_next:
+                continue
+            estimate = heuristic[nxt]
+            if estimate == inf:
+                continue
+            new_dist = dist + data[pos]
+            if new_dist + estimate > cost_limit:
+                continue
+            if new_dist < best.get(nxt, inf):
+                best[nxt] = new_dist
+                parent[nxt] = node
+                heapq.heappush(heap, (new_dist + estimate, new_dist, nxt))
+
+    return None
+
+
+def _hop_limited_spur_search(
+    adjacency: Adjacency,
+    spur: int,
+    target: int,
+    *,
+    heuristic: list[float],
+    min_hops: list[int],
+    max_hops: int,
+    blocked_nodes: set[int],
+    blocked_next: set[int],
+    cost_limit: float,
+) -> tuple[float, list[int]] | None:
+    """
+    Cheapest spur path with at most max_hops edges, by hop-level relaxation.
+
+    Level h relaxes the edges out of nodes improved at level h - 1, so after
+    max_hops levels every node holds its cheapest distance over paths of at
+    most max_hops edges. heuristic and min_hops are lower bounds on the
+    remaining cost and hop count, used only for pruning.
+
+    Returns:
+        Tuple of (spur_cost, node_path) or None if no path within the limits
+    """
+    indptr, indices, data = adjacency
+    dist = {spur: 0.0}
+    frontier = {spur: 0.0}
+    # parents[h - 1][node]: predecessor of node when it improved at level h
+    parents: list[dict[int, int]] = []
+
+    for hop in range(1, max_hops + 1):
+        improved: dict[int, float] = {}
+        level_parents: dict[int, int] = {}
+        remaining = max_hops - hop
+        for node, node_dist in frontier.items():
+            for pos in range(indptr[node], indptr[node + 1]):
+                nxt = indices[pos]
+                if nxt == spur or nxt in blocked_nodes or min_hops[nxt] > remaining:
+                    continue
+                if node == spur and nxt in blocked_next:
+                    continue
+                new_dist = node_dist + data[pos]
+                if new_dist + heuristic[nxt] > cost_limit:
+                    continue
+                if new_dist < dist.get(nxt, inf) and new_dist < improved.get(nxt, inf):
+                    improved[nxt] = new_dist
+                    level_parents[nxt] = node
+        if not improved:
+            break
+        dist.update(improved)
+        parents.append(level_parents)
+        frontier = improved
+
+    if target not in dist:
+        return None
+
+    # A node's value at level h comes from its latest improvement at or
+    # below h, so walk the levels top-down following those improvements
+    path = [target]
+    node = target
+    for level_parents in reversed(parents):
+        if node in level_parents:
+            node = level_parents[node]
+            path.append(node)
+    path.reverse()
+    return dist[target], path
+
+
+def _tree_spur(
+    adjacency: Adjacency,
+    spur: int,
+    target: int,
+    *,
+    heuristic: list[float],
+    successors: list[int],
+    blocked_nodes: set[int],
+    blocked_next: set[int],
+    cost_limit: float,
+) -> tuple[float, list[int]] | bool | None:
+    """
+    Try to answer a spur search straight from the shortest-path tree.
+
+    The cheapest allowed first edge by cost + tree distance is a lower bound
+    on every spur path. If the tree path behind that edge avoids the root,
+    it is the optimal spur path and no search is needed.
+
+    Returns:
+        Tuple of (spur_cost, node_path), None if no spur path can stay within
+        cost_limit, or False if a full search is required
+    """
+    indptr, indices, data = adjacency
+    best_estimate = inf
+    best_next = -1
+    best_cost = 0.0
+    for pos in range(indptr[spur], indptr[spur + 1]):
+        nxt = indices[pos]
+        if nxt in blocked_next or nxt in blocked_nodes or nxt == spur:
+            continue
+        estimate = data[pos] + heuristic[nxt]
+        if estimate < best_estimate:
+            best_estimate = estimate
+            best_next = nxt
+            best_cost = data[pos]
+
+    if best_next == -1 or best_estimate > cost_limit:
+        return None
+
+    path = [spur, best_next]
+    node = best_next
+    while node != target:
+        node = successors[node]
+        if node < 0 or node in blocked_nodes or node == spur:
+            return False
+        path.append(node)
+
+    return best_cost + heuristic[best_next], path
+
+
+def _candidate_bound(candidates: list[tuple], needed: int) -> float:
+    """Largest cost that can still make it into the final k paths."""
+    if len(candidates) < needed:
+        return inf
+    return heapq.nsmallest(needed, candidates)[-1][0]
+
+
+def yen_k_shortest_paths(
+    adjacency: Adjacency,
+    first_path: tuple[int, ...],
+    k: int,
+    heuristic: list[float],
+    successors: list[int] | None = None,
+    *,
+    cost_limit: float = inf,
+    max_hops: int | None = None,
+    min_hops: list[int] | None = None,
+) -> list[tuple[float, tuple[int, ...]]]:
+    """
+    Find up to k shortest loopless paths, starting from a known shortest path.
+
+    Uses Yen's algorithm with Lawler's deviation-index optimization. Spur
+    searches reuse the shortest-path tree towards the target: most are
+    answered by following the tree from the best deviating edge, and the
+    rest run A* guided by tree distances. A spur is skipped outright when
+    its root cost plus the tree distance already exceeds the cost of the
+    k-th best candidate or cost_limit.
+
+    With max_hops, only paths of at most max_hops edges are considered and
+    spur searches use hop-level relaxation instead of A*. heuristic must
+    then be the cheapest distance over paths of at most max_hops edges,
+    and the tree shortcut is not used.
+
+    Args:
+        adjacency: CSR adjacency lists from build_adjacency
+        first_path: A shortest source → target path (node ids)
+        k: Maximum number of paths to return
+        heuristic: Unrestricted distance from every node to the target
+        successors: Next hop from every node towards the target on the
+            shortest-path tree (negative if none); enables tree shortcuts
+        cost_limit: Paths costing more than this are never returned
+        max_hops: Maximum number of edges per path
+        min_hops: Lower bound on the edge count from every node to the
+            target; required with max_hops
+
+    Returns:
+        List of (total_cost, node_path) tuples sorted by cost ascending
+    """
+    target = first_path[-1]
+    first_prefix = _prefix_costs(adjacency, first_path)
+    accepted = [(first_prefix[-1], first_path, first_prefix, 0)]
+    seen = {first_path}
+    # Candidate heap entries: (cost, path, deviation_index)
+    candidates: list[tuple[float, tuple[int, ...], int]] = []
+
+    while len(accepted) < k:
+        _, prev_path, prev_prefix, deviation = accepted[-1]
+        needed = k - len(accepted)
+
+        for i in range(deviation, len(prev_path) - 1):
+            spur = prev_path[i]
+            root = prev_path[: i + 1]
+            root_cost = prev_prefix[i]
+
+            bound = min(_candidate_bound(candidates, needed), cost_limit)
+            if root_cost + heuristic[spur] > bound:
+                continue
+            if max_hops is not None and i + min_hops[spur] > max_hops:
+                continue
+
+            blocked_next = {
+                path[i + 1]
+                for _, path, _, _ in accepted
+                if len(path) > i + 1 and path[: i + 1] == root
+            }
+            blocked_nodes = set(root[:-1])
+            result = False
+            if max_hops is not None:
+                result = _hop_limited_spur_search(
+                    adjacency,
+                    spur,
+                    target,
+                    heuristic=heuristic,
+                    min_hops=min_hops,
+                    max_hops=max_hops - i,
+                    blocked_nodes=blocked_nodes,
+                    blocked_next=blocked_next,
+                    cost_limit=bound - root_cost,
+                )
+            elif successors is not None:
+                result = _tree_spur(
+                    adjacency,
+                    spur,
+                    target,
+                    heuristic=heuristic,
+                    successors=successors,
+                    blocked_nodes=blocked_nodes,
+                    blocked_next=blocked_next,
+                    cost_limit=bound - root_cost,
+                )
+            if result is False:
+                result = _spur_search(
+                    adjacency,
+                    spur,
+                    target,
+                    heuristic=heuristic,
+                    blocked_nodes=blocked_nodes,
+                    blocked_next=blocked_next,
+                    cost_limit=bound - root_cost,
+                )
+            if result is None:
+                continue
+
+            spur_cost, spur_path = result
+            candidate = root[:-1] + tuple(spur_path)
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+            heapq.heappush(candidates, (root_cost + spur_cost, candidate, i))
+
+        if not candidates:
+            break
+
+        cost, path, deviation = heapq.heappop(candidates)
+        accepted.append((cost, path, _prefix_costs(adjacency, path), deviation))
+
+    return [(cost, path) for cost, path, _, _ in accepted]
@@ -0,0 +1,365 @@
+"""
+Landmark (ALT) index for fast point-to-point shortest path queries.
+
+A few dozen landmark artists are picked spread out over the graph, and
+the cost distance from every node to each landmark and from each landmark
+to every node is stored as float32 matrices. By the triangle inequality
+these give lower bounds on any node-to-node distance, which guide a
+bidirectional A* search straight towards its target.
+
+The index lives next to the compiled graph it was built from, so it is
+rebuilt whenever the similarity map changes.
+"""
+
+import heapq
+import json
+import logging
+import math
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import dijkstra
+
+from src.graph_cache import CompiledGraph
+
+logger = logging.getLogger(__name__)
+
+LANDMARK_FORMAT_VERSION = 1
+LANDMARK_DIR_NAME = "landmarks"
+DEFAULT_LANDMARK_COUNT = 32
+
+# Landmarks used per query: the ones with the best bound for the pair
+ACTIVE_LANDMARKS = 6
+
+# Relative slack that keeps bounds admissible despite float32 rounding
+FLOAT32_SLACK = 2.0**-22
+
+
+@dataclass(frozen=True)
+class LandmarkIndex:
+    """
+    Landmark distances over one cost graph.
+
+    to_landmark[v, i] is the cost of the cheapest path from v to
+    landmarks[i] and from_landmark[v, i] from landmarks[i] to v (inf if
+    none). Rows are per node so one node's bounds are contiguous.
+    """
+
+    landmarks: np.ndarray
+    to_landmark: np.ndarray
+    from_landmark: np.ndarray
+
+    def lower_bound(self, source: int, target: int) -> float:
+        """Lower bound on the cost of the cheapest source → target path."""
+        return float(
+            _bounds(
+                self.to_landmark[source],
+                self.from_landmark[source],
+                self.to_landmark[target],
+                self.from_landmark[target],
+            )
+        )
+
+
+def _bounds(
+    node_to: np.ndarray,
+    node_from: np.ndarray,
+    target_to: np.ndarray,
+    target_from: np.ndarray,
+) -> np.ndarray:
+    """
+    Triangle-inequality lower bounds on d(node, target), over the last axis.
+
+    d(v, t) >= d(v, L) - d(t, L) and d(v, t) >= d(L, t) - d(L, v). Terms
+    where both distances are infinite carry no information and are
+    ignored; an infinite bound means the target is unreachable.
+    """
+    node_to = node_to.astype(np.float64)
+    node_from = node_from.astype(np.float64)
+    with np.errstate(invalid="ignore"):
+        terms = np.concatenate(
+            [
+                node_to * (1 - FLOAT32_SLACK) - target_to * (1 + FLOAT32_SLACK),
+                target_from * (1 - FLOAT32_SLACK) - node_from * (1 + FLOAT32_SLACK),
+            ],
+            axis=-1,
+        )
+    bound = np.fmax.reduce(terms, axis=-1)
+    return np.fmax(bound, 0.0)
+
+
+def select_landmarks(graph: sp.csr_matrix, count: int) -> np.ndarray:
+    """
+    Pick landmarks spread out over the graph (farthest-first).
+
+    The first landmark is the node with the most edges; each next one is
+    the node farthest, ignoring edge direction, from all landmarks so far.
+    Nodes in components without a landmark count as infinitely far, so
+    every component with enough nodes gets covered.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        count: Number of landmarks
+
+    Returns:
+        Landmark node indices in selection order
+    """
+    n_nodes = graph.shape[0]
+    count = min(count, n_nodes)
+    if count == 0:
+        return np.empty(0, dtype=np.int32)
+
+    degrees = np.diff(graph.indptr) + np.bincount(graph.indices, minlength=n_nodes)
+    landmarks = [int(np.argmax(degrees))]
+    nearest = dijkstra(graph, directed=False, indices=landmarks[0])
+
+    while len(landmarks) < count:
+        # Farthest node; ties (and the infinite distances of uncovered
+        # components) are broken by degree
+        order = np.lexsort((-degrees, -nearest))
+        candidate = int(order[0])
+        if nearest[candidate] == 0:
+            break
+        landmarks.append(candidate)
+        nearest = np.minimum(
+            nearest, dijkstra(graph, directed=False, indices=candidate)
+        )
+
+    return np.array(landmarks, dtype=np.int32)
+
+
+def build_landmark_index(
+    graph: sp.csr_matrix,
+    reverse_graph: sp.csr_matrix,
+    count: int = DEFAULT_LANDMARK_COUNT,
+) -> LandmarkIndex:
+    """
+    Select landmarks and compute their distance tables.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        reverse_graph: Transposed cost graph
+        count: Number of landmarks
+
+    Returns:
+        LandmarkIndex with float32 distance tables
+    """
+    landmarks = select_landmarks(graph, count)
+    from_landmark = dijkstra(graph, indices=landmarks)
+    to_landmark = dijkstra(reverse_graph, indices=landmarks)
+
+    return LandmarkIndex(
+        landmarks=landmarks,
+        to_landmark=np.ascontiguousarray(to_landmark.T, dtype=np.float32),
+        from_landmark=np.ascontiguousarray(from_landmark.T, dtype=np.float32),
+    )
+
+
+def save_landmark_index(index: LandmarkIndex, directory: Path, source_hash: str):
+    """
+    Write a landmark index to directory, replacing any previous one.
+
+    Args:
+        index: Index to write
+        directory: Target directory
+        source_hash: Content hash of the similarity map the graph came from
+    """
+    scratch_dir = directory.with_name(f".{directory.name}.tmp")
+    shutil.rmtree(scratch_dir, ignore_errors=True)
+    scratch_dir.mkdir(parents=True)
+
+    np.save(scratch_dir / "landmarks.npy", index.landmarks)
+    np.save(scratch_dir / "to_landmark.npy", index.to_landmark)
+    np.save(scratch_dir / "from_landmark.npy", index.from_landmark)
+    meta = {
+        "format_version": LANDMARK_FORMAT_VERSION,
+        "source_hash": source_hash,
+        "count": len(index.landmarks),
+    }
+    with open(scratch_dir / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    scratch_dir.rename(directory)
+
+
+def open_landmark_index(directory: Path, source_hash: str) -> LandmarkIndex | None:
+    """
+    Memory-map a saved landmark index.
+
+    Returns:
+        The index, or None if it is missing, outdated or for another graph
+    """
+    try:
+        with open(directory / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if (
+        meta.get("format_version") != LANDMARK_FORMAT_VERSION
+        or meta.get("source_hash") != source_hash
+    ):
+        return None
+
+    return LandmarkIndex(
+        landmarks=np.load(directory / "landmarks.npy"),
+        to_landmark=np.load(directory / "to_landmark.npy", mmap_mode="r"),
+        from_landmark=np.load(directory / "from_landmark.npy", mmap_mode="r"),
+    )
+
+
+def load_landmark_index(
+    compiled_graph: CompiledGraph,
+    count: int = DEFAULT_LANDMARK_COUNT,
+) -> LandmarkIndex:
+    """
+    Load the landmark index cached with a compiled graph, building it if needed.
+
+    Args:
+        compiled_graph: Graph from graph_cache.load_compiled_graph
+        count: Number of landmarks
+
+    Returns:
+        LandmarkIndex for compiled_graph
+    """
+    directory = compiled_graph.cache_dir / LANDMARK_DIR_NAME
+    index = open_landmark_index(directory, compiled_graph.source_hash)
+    expected = min(count, len(compiled_graph.names))
+    if index is not None and len(index.landmarks) == expected:
+        logger.info("Using landmark index cache: %s", directory)
+        return index
+
+    logger.info("Building landmark index with %d landmarks", count)
+    index = build_landmark_index(
+        compiled_graph.graph, compiled_graph.reverse_graph, count
+    )
+    save_landmark_index(index, directory, compiled_graph.source_hash)
+    return open_landmark_index(directory, compiled_graph.source_hash) or index
+
+
+def alt_shortest_path(
+    graph: sp.csr_matrix,
+    reverse_graph: sp.csr_matrix,
+    index: LandmarkIndex,
+    source: int,
+    target: int,
+) -> tuple[float, list[int]] | None:
+    """
+    Cheapest source → target path by bidirectional A* with landmark bounds.
+
+    Both searches use the average potential p(v) = (h_t(v) - h_s(v)) / 2,
+    where h_t bounds d(v, target) and h_s bounds d(source, v); this keeps
+    them consistent with each other, so the usual bidirectional stopping
+    rule applies. Only the ACTIVE_LANDMARKS landmarks giving the best
+    source → target bound are consulted.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        reverse_graph: Transposed cost graph
+        index: Landmark index built over graph
+        source: Source node index
+        target: Target node index
+
+    Returns:
+        Tuple of (total_cost, node_path), or None if target is unreachable
+    """
+    if source == target:
+        return 0.0, [source]
+
+    # Rank landmarks by the bound each gives for this pair
+    s_to, s_from = index.to_landmark[source], index.from_landmark[source]
+    t_to, t_from = index.to_landmark[target], index.from_landmark[target]
+    with np.errstate(invalid="ignore"):
+        per_landmark = np.fmax(
+            s_to.astype(np.float64) - t_to, t_from.astype(np.float64) - s_from
+        )
+    if np.isposinf(per_landmark).any():
+        return None
+    active = np.argsort(-np.nan_to_num(per_landmark, nan=-np.inf), kind="stable")
+    active = np.sort(active[:ACTIVE_LANDMARKS])
+    s_to, s_from = s_to[active].astype(np.float64), s_from[active].astype(np.float64)
+    t_to, t_from = t_to[active].astype(np.float64), t_from[active].astype(np.float64)
+    lo, hi = 1 - FLOAT32_SLACK, 1 + FLOAT32_SLACK
+
+    # Lean, vectorized _bounds for both sides over a batch of nodes
+    def potentials(nodes: np.ndarray) -> np.ndarray:
+        node_to = index.to_landmark[nodes][:, active]
+        node_from = index.from_landmark[nodes][:, active]
+        with np.errstate(invalid="ignore"):
+            to_target = np.fmax.reduce(
+                np.fmax(node_to * lo - t_to * hi, t_from * lo - node_from * hi),
+                axis=1,
+            )
+            from_source = np.fmax.reduce(
+                np.fmax(s_to * lo - node_to * hi, node_from * lo - s_from * hi),
+                axis=1,
+            )
+            return (np.fmax(to_target, 0.0) - np.fmax(from_source, 0.0)) / 2
+
+    # Forward keys are d + p, backward keys d - p; per side:
+    # (graph, sign, dist, parent, heap)
+    source_key, target_key = potentials(np.array([source, target])).tolist()
+    searches = [
+        (graph, 1.0, {source: 0.0}, {source: -1}, [(source_key, 0.0, source)]),
+        (
+            reverse_graph,
+            -1.0,
+            {target: 0.0},
+            {target: -1},
+            [(-target_key, 0.0, target)],
+        ),
+    ]
+    settled: list[set[int]] = [set(), set()]
+    best_cost = math.inf
+    meeting = -1
+
+    while searches[0][4] and searches[1][4]:
+        if searches[0][4][0][0] + searches[1][4][0][0] >= best_cost:
+            break
+        side = 0 if searches[0][4][0][0] <= searches[1][4][0][0] else 1
+        side_graph, sign, dist, parent, heap = searches[side]
+        other_dist = searches[1 - side][2]
+
+        _, node_dist, node = heapq.heappop(heap)
+        if node in settled[side]:
+            continue
+        settled[side].add(node)
+
+        start, end = side_graph.indptr[node], side_graph.indptr[node + 1]
+        neighbors = side_graph.indices[start:end]
+        keys = (node_dist + side_graph.data[start:end]) + sign * potentials(neighbors)
+        for nxt, cost, key in zip(
+            neighbors.tolist(),
+            side_graph.data[start:end].tolist(),
+            keys.tolist(),
+            strict=True,
+        ):
+            new_dist = node_dist + cost
+            # Non-finite keys come from nodes that cannot lie on any path
+            if new_dist >= dist.get(nxt, math.inf) or not math.isfinite(key):
+                continue
+            dist[nxt] = new_dist
+            parent[nxt] = node
+            heapq.heappush(heap, (key, new_dist, nxt))
+            if nxt in other_dist and new_dist + other_dist[nxt] < best_cost:
+                best_cost = new_dist + other_dist[nxt]
+                meeting = nxt
+
+    if meeting == -1:
+        return None
+
+    forward_parent, backward_parent = searches[0][3], searches[1][3]
+    path = []
+    node = meeting
+    while node != -1:
+        path.append(node)
+        node = forward_parent[node]
+    path.reverse()
+    node = backward_parent[meeting]
+    while node != -1:
+        path.append(node)
+        node = backward_parent[node]
+    return float(best_cost), path
@@ -31,7 +31,8 @@ class ArtistSimilarityData:
     Contains similarity data for a successfully scraped artist.
 
     Note: Only successful scrapes should be loaded into this structure.
-    Failed/skipped scrapes are filtered out at load time.
+    Failed/skipped scrapes are filtered out at load time. Artists shown on
+    other artists' pages also get their links from those pages' Aid matrix.
     """
 
     artist_name: str
@@ -92,7 +93,7 @@ class ConnectionPath:
     path: tuple[str, ...]  # Full path including source and target
     path_strengths: tuple[float, ...]  # Relationship strength for each edge
     total_cost: float  # Sum of 1/strength (Dijkstra cost)
-    path_score: float  # 1/total_cost (higher = better)
+    path_score: float  # 1/total_cost, exp(-total_cost) for log costs (higher = better)
     min_strength: float  # Weakest link
     max_strength: float  # Strongest link
     avg_strength: float  # Average edge strength
@@ -120,3 +121,35 @@ class ArtistPairConnections:
     event_name: str
     event_venue: str | None
     event_url: str
+
+    def to_dict(self) -> dict:
+        """
+        Convert the pair and its paths to a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary in the layout of the summary JSON report
+        """
+        return {
+            "event_artist": self.event_artist,
+            "favorite_artist": self.favorite_artist,
+            "event_name": self.event_name,
+            "event_venue": self.event_venue,
+            "event_url": self.event_url,
+            "best_path_score": self.best_path_score,
+            "best_avg_strength": self.best_avg_strength,
+            "hops": self.paths[0].hops,
+            "paths": [
+                {
+                    "path": list(path.path),
+                    "path_strengths": list(path.path_strengths),
+                    "total_cost": path.total_cost,
+                    "path_score": path.path_score,
+                    "min_strength": path.min_strength,
+                    "max_strength": path.max_strength,
+                    "avg_strength": path.avg_strength,
+                    "hops": path.hops,
+                    "tier": path.tier,
+                }
+                for path in self.paths
+            ],
+        }
@@ -0,0 +1,375 @@
+"""
+Concurrent music-map crawler.
+
+The serial scraper spends each artist on one round trip plus a fixed
+two second sleep. This crawler keeps a bounded number of requests in
+flight over pooled keep-alive connections and paces them with a per-host
+token bucket, so throughput is set by the configured polite rate alone.
+
+The rate adapts per host (AIMD): throttling (429/503), timeouts or a
+latency spike cut it in half, a Retry-After header pauses the host for
+as long as asked, and each healthy response adds a little back. It never
+climbs past the starting rate, which defaults to the serial scraper's
+pace, unless a higher maximum is given.
+Throttled artists are retried later. Rate changes, backoffs and periodic
+pacing metrics are logged.
+
+Pages are fetched and parsed by music_map_scraper on a small thread
+pool, so results are the same ScraperResult records the serial scraper
+produces.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import Counter, deque
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.music_map_scraper import (
+    PageFetch,
+    ScraperResult,
+    artist_url,
+    fetch_page,
+    parse_artist_page,
+)
+from src.page_cache import PageCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_SECOND = 0.5  # The serial scraper's two second delay
+MIN_REQUESTS_PER_SECOND = 0.05
+DEFAULT_CONCURRENCY = 4
+DEFAULT_BURST = 1
+
+# AIMD pacing
+RATE_INCREASE = 0.05  # Requests/s added per healthy response
+RATE_DECREASE_FACTOR = 0.5
+LATENCY_BACKOFF_RATIO = 2.0  # Back off when a response is this much slower
+LATENCY_SMOOTHING = 0.2  # Weight of each new response in the average latency
+LATENCY_WARMUP_RESPONSES = 5
+MAX_THROTTLE_RETRIES = 3
+METRICS_LOG_INTERVAL = 25  # Completed artists between pacing metric lines
+
+
+class TokenBucket:
+    """Token bucket pacing requests to a steady rate with bounded bursts."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = DEFAULT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Start with a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Most tokens the bucket holds, i.e. the largest burst
+            clock: Monotonic time source in seconds
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = -math.inf
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Add the tokens accrued since the last update."""
+        now = self._clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        """Change the rate, keeping the tokens accrued at the old one."""
+        self._refill()
+        self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hold every acquire for at least this long from now."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self):
+        """Wait for a token and take it; waiters are served in order."""
+        async with self._lock:
+            while True:
+                paused = self._paused_until - self._clock()
+                if paused > 0:
+                    await asyncio.sleep(paused)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+            self.tokens -= 1
+
+
+class AimdRateController:
+    """Additive-increase, multiplicative-decrease pacing of one host."""
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        *,
+        max_rate: float | None = None,
+        min_rate: float = MIN_REQUESTS_PER_SECOND,
+        host: str = "",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Steer a token bucket's rate from the responses it paces.
+
+        Args:
+            bucket: Token bucket of the host
+            max_rate: Highest rate to climb to (default: the bucket's rate)
+            min_rate: Lowest rate to back off to
+            host: Host name for log lines
+            clock: Time source that request start times are measured on
+        """
+        self.bucket = bucket
+        self.max_rate = bucket.rate if max_rate is None else max_rate
+        self.min_rate = min_rate
+        self.host = host
+        self._clock = clock
+        self.latency: float | None = None  # Smoothed seconds per response
+        self.responses = 0
+        self.throttled = 0
+        self.backoffs = 0
+        self._latency_samples = 0
+        self._last_backoff = -math.inf
+
+    def record(self, fetch: PageFetch, started: float):
+        """
+        Adjust the rate after a response.
+
+        Args:
+            fetch: Outcome of the request
+            started: Clock time the request was sent
+        """
+        self.responses += 1
+        if fetch.throttled:
+            self.throttled += 1
+            self._back_off(f"HTTP {fetch.status}", started)
+            if fetch.retry_after:
+                logger.warning(
+                    "Pausing %s for %.1fs (Retry-After)", self.host, fetch.retry_after
+                )
+                self.bucket.pause(fetch.retry_after)
+            return
+        if fetch.timed_out:
+            self._back_off("a timeout", started)
+            return
+        if fetch.status is None:
+            # Connection failures say nothing about the server's load
+            return
+
+        slow = (
+            self.latency is not None
+            and self._latency_samples >= LATENCY_WARMUP_RESPONSES
+            and fetch.elapsed > LATENCY_BACKOFF_RATIO * self.latency
+        )
+        baseline = self.latency
+        self.latency = (
+            fetch.elapsed
+            if self.latency is None
+            else (1 - LATENCY_SMOOTHING) * self.latency
+            + LATENCY_SMOOTHING * fetch.elapsed
+        )
+        self._latency_samples += 1
+        if slow:
+            self._back_off(
+                f"a {fetch.elapsed:.2f}s response (average {baseline:.2f}s)", started
+            )
+        elif self.bucket.rate < self.max_rate:
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + RATE_INCREASE))
+
+    def _back_off(self, reason: str, started: float):
+        """Cut the rate, once per batch of requests sent at the old rate."""
+        if started < self._last_backoff:
+            # Sent before the last backoff took effect; already accounted for
+            return
+        old_rate = self.bucket.rate
+        self.bucket.set_rate(max(self.min_rate, old_rate * RATE_DECREASE_FACTOR))
+        self._last_backoff = self._clock()
+        self.backoffs += 1
+        logger.warning(
+            "Backing off %s after %s: %.2f -> %.2f requests/s",
+            self.host,
+            reason,
+            old_rate,
+            self.bucket.rate,
+        )
+
+    def log_metrics(self):
+        """Log the current pacing of the host."""
+        logger.info(
+            "Pacing %s: rate=%.2f/s responses=%d throttled=%d backoffs=%d "
+            "latency=%.2fs",
+            self.host,
+            self.bucket.rate,
+            self.responses,
+            self.throttled,
+            self.backoffs,
+            self.latency or 0.0,
+        )
+
+
+class HostRateLimiter:
+    """One adaptively paced token bucket per host."""
+
+    def __init__(
+        self,
+        rate: float,
+        max_rate: float | None = None,
+        capacity: float = DEFAULT_BURST,
+    ):
+        """
+        Start without buckets; each host gets one on its first request.
+
+        Args:
+            rate: Starting requests per second for each host
+            max_rate: Highest requests per second for each host (default:
+                the starting rate, so the rate only recovers from backoffs)
+            capacity: Largest burst allowed to each host
+        """
+        self.rate = rate
+        self.max_rate = rate if max_rate is None else max(max_rate, rate)
+        self.capacity = capacity
+        self.controllers: dict[str, AimdRateController] = {}
+
+    def controller(self, url: str) -> AimdRateController:
+        """Pacing controller of the URL's host."""
+        host = urlsplit(url).netloc
+        if host not in self.controllers:
+            self.controllers[host] = AimdRateController(
+                TokenBucket(self.rate, self.capacity),
+                max_rate=self.max_rate,
+                min_rate=min(MIN_REQUESTS_PER_SECOND, self.rate),
+                host=host,
+            )
+        return self.controllers[host]
+
+    @property
+    def requests(self) -> int:
+        """Requests answered so far, over all hosts."""
+        return sum(controller.responses for controller in self.controllers.values())
+
+    async def acquire(self, url: str):
+        """Wait until a request to the URL's host is allowed."""
+        await self.controller(url).bucket.acquire()
+
+    def record(self, url: str, fetch: PageFetch, started: float):
+        """Feed a response back into the pacing of the URL's host."""
+        self.controller(url).record(fetch, started)
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """Session keeping up to pool_size keep-alive connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _scrape(
+    artist_name: str, session: requests.Session, page_cache: PageCache | None
+) -> tuple[PageFetch, ScraperResult]:
+    """Fetch, keep and parse one artist's page."""
+    logger.info("Scraping: %s", artist_name)
+    fetch = fetch_page(artist_name, session)
+    if page_cache is not None:
+        page_cache.store(artist_name, fetch)
+    return fetch, parse_artist_page(fetch.html)
+
+
+async def crawl_artists(
+    artists: Iterable[str],
+    *,
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    max_requests_per_second: float | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    on_result: Callable[[str, ScraperResult], None] | None = None,
+    limiter: HostRateLimiter | None = None,
+    page_cache: PageCache | None = None,
+) -> dict[str, ScraperResult]:
+    """
+    Scrape artists concurrently at a polite rate.
+
+    Args:
+        artists: Artist names to scrape
+        requests_per_second: Starting requests per second to each host
+        max_requests_per_second: Highest requests per second to each host
+            (default: requests_per_second)
+        concurrency: Most requests in flight at once
+        on_result: Called with each artist and result as it completes
+        limiter: Pacing to continue from, e.g. across crawl rounds (default:
+            a new one at requests_per_second)
+        page_cache: Store to keep the fetched pages in (default: none)
+
+    Returns:
+        Dictionary mapping artist names to ScraperResults, in completion order
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    if limiter is None:
+        limiter = HostRateLimiter(requests_per_second, max_requests_per_second)
+    loop = asyncio.get_running_loop()
+    results: dict[str, ScraperResult] = {}
+    pending = deque(artists)
+    retries: Counter[str] = Counter()
+    started = time.monotonic()
+
+    with (
+        make_session(concurrency) as session,
+        ThreadPoolExecutor(max_workers=concurrency) as executor,
+    ):
+
+        async def worker():
+            while pending:
+                artist = pending.popleft()
+                url = artist_url(artist)
+                await limiter.acquire(url)
+                started = time.monotonic()
+                fetch, result = await loop.run_in_executor(
+                    executor, _scrape, artist, session, page_cache
+                )
+                limiter.record(url, fetch, started)
+                if fetch.throttled and retries[artist] < MAX_THROTTLE_RETRIES:
+                    # Try again once the host has had a rest
+                    retries[artist] += 1
+                    pending.append(artist)
+                    continue
+
+                results[artist] = result
+                if on_result is not None:
+                    on_result(artist, result)
+                if len(results) % METRICS_LOG_INTERVAL == 0:
+                    for controller in limiter.controllers.values():
+                        controller.log_metrics()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Crawled %d artists in %.1fs (%.2f artists/s)",
+        len(results),
+        elapsed,
+        len(results) / elapsed if elapsed else 0.0,
+    )
+    for controller in limiter.controllers.values():
+        controller.log_metrics()
+    return results
@@ -4,21 +4,40 @@ Music-Map Scraper
 Scrapes similar artist data from music-map.com including relationship strength scores.
 """
 
+import argparse
+import asyncio
+import heapq
 import json
 import logging
 import re
 import subprocess
-import sys
 import time
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
 from http import HTTPStatus
+from operator import itemgetter
 from pathlib import Path
 
 import requests
 from bs4 import BeautifulSoup
 
+from src.data_loader import load_artist_list
+
 logger = logging.getLogger(__name__)
 
+MUSIC_MAP_URL = "https://www.music-map.com"
+REQUEST_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36")
+}
+FETCH_TIMEOUT_SECONDS = 10
+# Responses asking us to slow down
+THROTTLE_STATUSES = frozenset(
+    {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+)
+# Strongest links kept per similar artist from a page's Aid matrix
+MAX_NEIGHBOR_LINKS = 10
+
 
 @dataclass
 class SimilarArtist:
@@ -36,13 +55,16 @@ class ScraperResult:
     status: str
     similar_artists: list[SimilarArtist] | None = None
     error: str | None = None
+    # Links between the similar artists on the page: for each similar
+    # artist, its strongest links to the other artists shown
+    neighbor_links: dict[str, dict[str, float]] | None = None
 
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
         if self.status == "error":
             return {"status": "error", "error": self.error}
 
-        return {
+        data = {
             "status": "success",
             "similar_artists": [
                 {
@@ -54,49 +76,142 @@ class ScraperResult:
             ],
             "total_count": len(self.similar_artists or []),
         }
+        if self.neighbor_links:
+            data["neighbor_links"] = self.neighbor_links
+        return data
+
+
+@dataclass(frozen=True)
+class PageFetch:
+    """Outcome of one page request, as seen by the crawl pacing."""
+
+    html: str | None
+    status: int | None = None  # None if no response arrived
+    elapsed: float = 0.0  # Seconds until the response (or failure)
+    retry_after: float | None = None  # Seconds the server asked us to wait
+    timed_out: bool = False
+    etag: str | None = None
+
+    @property
+    def throttled(self) -> bool:
+        """Whether the server asked us to slow down."""
+        return self.status in THROTTLE_STATUSES
+
+
+def artist_url(artist_name: str) -> str:
+    """Music-Map page URL for an artist."""
+    # Convert artist name to URL format (spaces to +)
+    url_artist = artist_name.replace(" ", "+").lower()
+    return f"{MUSIC_MAP_URL}/{url_artist}"
 
 
-def fetch_artist_page(artist_name: str) -> str | None:
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
     """
-    Fetch the Music-Map page for a given artist.
+    Read a Retry-After header.
 
     Args:
-        artist_name: Name of the artist to search for
+        value: Header value, either delay seconds or an HTTP date
+        now: Current time, for HTTP dates (default: now)
 
     Returns:
-        HTML content as string, or None if request fails
+        Seconds to wait, or None if the header is absent or malformed
     """
-    # Convert artist name to URL format (spaces to +)
-    url_artist = artist_name.replace(" ", "+").lower()
-    url = f"https://www.music-map.com/{url_artist}"
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - (now or datetime.now(UTC))).total_seconds())
 
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
-        )
-    }
+
+def fetch_page(artist_name: str, session: requests.Session | None = None) -> PageFetch:
+    """
+    Fetch the Music-Map page for a given artist, keeping the response details.
+
+    Args:
+        artist_name: Name of the artist to search for
+        session: Session whose pooled connections to reuse (default: a
+            one-off request)
+
+    Returns:
+        PageFetch with the HTML (None if the request failed), status and timing
+    """
+    url = artist_url(artist_name)
+    started = time.monotonic()
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = (session or requests).get(
+            url, headers=REQUEST_HEADERS, timeout=FETCH_TIMEOUT_SECONDS
+        )
+        elapsed = time.monotonic() - started
+        status = response.status_code
 
-        if response.status_code == HTTPStatus.NOT_FOUND:
+        if status == HTTPStatus.NOT_FOUND:
             logger.info("  ✗ Artist not found: %s", artist_name)
-            return None
-
-        response.raise_for_status()
-        return response.text
+            return PageFetch(html=None, status=status, elapsed=elapsed)
+
+        if status in THROTTLE_STATUSES:
+            retry_after = response.headers.get("Retry-After")
+            logger.warning(
+                "  ✗ Throttled fetching %s: HTTP %d (Retry-After: %s)",
+                artist_name,
+                status,
+                retry_after,
+            )
+            return PageFetch(
+                html=None,
+                status=status,
+                elapsed=elapsed,
+                retry_after=parse_retry_after(retry_after),
+            )
+
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            logger.error("  ✗ Server error fetching %s: HTTP %d", artist_name, status)
+        elif status >= HTTPStatus.BAD_REQUEST:
+            logger.error("  ✗ Error fetching %s: HTTP %d", artist_name, status)
+        else:
+            return PageFetch(
+                html=response.text,
+                status=status,
+                elapsed=elapsed,
+                etag=response.headers.get("ETag"),
+            )
+        return PageFetch(html=None, status=status, elapsed=elapsed)
 
     except requests.Timeout:
         logger.warning("  ✗ Timeout fetching: %s", artist_name)
-        return None
+        return PageFetch(html=None, elapsed=time.monotonic() - started, timed_out=True)
     except requests.RequestException as e:
         logger.error("  ✗ Error fetching %s: %s", artist_name, e)
-        return None
+        return PageFetch(html=None, elapsed=time.monotonic() - started)
 
 
-def parse_artist_names(html: str) -> list[str]:
+def fetch_artist_page(
+    artist_name: str, session: requests.Session | None = None
+) -> str | None:
     """
-    Extract similar artist names from HTML.
+    Fetch the Music-Map page for a given artist.
+
+    Args:
+        artist_name: Name of the artist to search for
+        session: Session whose pooled connections to reuse (default: a
+            one-off request)
+
+    Returns:
+        HTML content as string, or None if request fails
+    """
+    return fetch_page(artist_name, session).html
+
+
+def parse_page_artists(html: str) -> list[str]:
+    """
+    Extract all artist names shown on a page, the queried artist first.
 
     Args:
         html: HTML content as string
@@ -107,19 +222,27 @@ def parse_artist_names(html: str) -> list[str]:
     try:
         soup = BeautifulSoup(html, "html.parser")
         artist_links = soup.find_all("a", class_="S")
-        artists = [link.get_text(strip=True) for link in artist_links]
-
-        # First artist is the queried artist itself, remove it
-        if not artists:
-            return []
-
-        return artists[1:]
+        return [link.get_text(strip=True) for link in artist_links]
 
     except (AttributeError, ValueError, IndexError, TypeError) as e:
         logger.error("  ✗ Error parsing artist names: %s", e)
         return []
 
 
+def parse_artist_names(html: str) -> list[str]:
+    """
+    Extract similar artist names from HTML.
+
+    Args:
+        html: HTML content as string
+
+    Returns:
+        List of artist name strings
+    """
+    # First artist is the queried artist itself, remove it
+    return parse_page_artists(html)[1:]
+
+
 def parse_relationship_data(html: str) -> list[float]:
     """
     Extract relationship strength data from JavaScript Aid array.
@@ -155,12 +278,69 @@ def parse_relationship_data(html: str) -> list[float]:
         return []
 
 
-def scrape_artist(artist_name: str) -> ScraperResult:
+def parse_relationship_matrix(html: str) -> dict[int, list[float]]:
+    """
+    Extract every row of the JavaScript Aid matrix.
+
+    Aid[i] holds the strengths between the i-th artist on the page (0 is
+    the queried artist) and each artist on the page, -1 for itself.
+
+    Args:
+        html: HTML content as string
+
+    Returns:
+        Dict mapping row index to the row's values
+    """
+    try:
+        # Pattern: Aid[3]=new Array(4.1,0.8,6.25,-1,...);
+        pattern = r"Aid\[(\d+)\]=new Array\(([^)]+)\);"
+        return {
+            int(match.group(1)): [float(v.strip()) for v in match.group(2).split(",")]
+            for match in re.finditer(pattern, html)
+        }
+
+    except (AttributeError, ValueError, IndexError, TypeError) as e:
+        logger.error("  ✗ Error parsing relationship matrix: %s", e)
+        return {}
+
+
+def parse_neighbor_links(
+    page_artists: list[str], matrix: dict[int, list[float]]
+) -> dict[str, dict[str, float]]:
+    """
+    Read the links between the similar artists from a page's Aid matrix.
+
+    Args:
+        page_artists: Artist names on the page, the queried artist first
+        matrix: Aid rows by index (see parse_relationship_matrix)
+
+    Returns:
+        Dict mapping each similar artist to its MAX_NEIGHBOR_LINKS strongest
+        links (artist name -> strength), strongest first
+    """
+    links = {}
+    for i, name in enumerate(page_artists[1:], 1):
+        strengths = {
+            page_artists[j]: strength
+            for j, strength in enumerate(matrix.get(i, [])[: len(page_artists)])
+            if j != i and strength > 0
+        }
+        if strengths:
+            links[name] = dict(
+                heapq.nlargest(MAX_NEIGHBOR_LINKS, strengths.items(), key=itemgetter(1))
+            )
+    return links
+
+
+def scrape_artist(
+    artist_name: str, session: requests.Session | None = None
+) -> ScraperResult:
     """
     Scrape similar artists and relationship data for a given artist.
 
     Args:
         artist_name: Name of the artist to scrape
+        session: Session whose pooled connections to reuse
 
     Returns:
         ScraperResult with similar artists data or error information
@@ -168,17 +348,31 @@ def scrape_artist(artist_name: str) -> ScraperResult:
     logger.info("Scraping: %s", artist_name)
 
     # Fetch the page
-    html = fetch_artist_page(artist_name)
+    return parse_artist_page(fetch_artist_page(artist_name, session))
+
+
+def parse_artist_page(html: str | None) -> ScraperResult:
+    """
+    Build a scrape result from a fetched Music-Map page.
+
+    Args:
+        html: HTML content, or None if the page could not be fetched
+
+    Returns:
+        ScraperResult with similar artists data or error information
+    """
     if html is None:
         return ScraperResult(status="error", error="Failed to fetch page")
 
-    # Parse artist names
-    similar_artists = parse_artist_names(html)
+    # Parse artist names; the first is the queried artist itself
+    page_artists = parse_page_artists(html)
+    similar_artists = page_artists[1:]
     if not similar_artists:
         return ScraperResult(status="error", error="No similar artists found")
 
     # Parse relationship strengths
     strengths = parse_relationship_data(html)
+    neighbor_links = parse_neighbor_links(page_artists, parse_relationship_matrix(html))
 
     # Combine artists with their relationship strengths
     artists_with_strength = []
@@ -188,7 +382,11 @@ def scrape_artist(artist_name: str) -> ScraperResult:
             SimilarArtist(name=artist, rank=i + 1, relationship_strength=strength)
         )
 
-    return ScraperResult(status="success", similar_artists=artists_with_strength)
+    return ScraperResult(
+        status="success",
+        similar_artists=artists_with_strength,
+        neighbor_links=neighbor_links or None,
+    )
 
 
 def load_artists(events_file: Path) -> list[str]:
@@ -224,6 +422,31 @@ def load_existing_results(output_file: Path) -> dict[str, dict]:
         return {}
 
 
+def results_from_dicts(data: dict[str, dict]) -> dict[str, ScraperResult]:
+    """Convert saved results back to ScraperResult objects."""
+    results = {}
+    for artist, artist_data in data.items():
+        if artist_data.get("status") == "success":
+            similar = [
+                SimilarArtist(
+                    name=a["name"],
+                    rank=a["rank"],
+                    relationship_strength=a.get("relationship_strength"),
+                )
+                for a in artist_data.get("similar_artists", [])
+            ]
+            results[artist] = ScraperResult(
+                status="success",
+                similar_artists=similar,
+                neighbor_links=artist_data.get("neighbor_links"),
+            )
+        else:
+            results[artist] = ScraperResult(
+                status="error", error=artist_data.get("error")
+            )
+    return results
+
+
 def save_results(results: dict[str, ScraperResult], output_file: Path):
     """Save results to JSON file."""
     # Convert ScraperResult objects to dictionaries
@@ -259,6 +482,21 @@ def git_commit_results(output_file: Path, count: int):
 
 def main():
     """Main function to process all artists from events file."""
+    # Imported here because the crawlers build on this module
+    from src.crawl_frontier import (  # noqa: PLC0415
+        DEFAULT_FRONTIER_MAX_ARTISTS,
+        crawl_frontier,
+    )
+    from src.music_map_crawler import (  # noqa: PLC0415
+        DEFAULT_REQUESTS_PER_SECOND,
+        crawl_artists,
+    )
+    from src.page_cache import (  # noqa: PLC0415
+        PAGE_CACHE_DIR,
+        PageCache,
+        reparse_cache,
+    )
+
     # Configure logging
     logging.basicConfig(
         level=logging.DEBUG,
@@ -270,12 +508,98 @@ def main():
         ],
     )
 
-    # Get events file from command line argument
-    if len(sys.argv) < 2:
-        logger.error("Usage: python -m src.music_map_scraper <events_file>")
-        sys.exit(1)
-
-    events_file = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        prog="python -m src.music_map_scraper",
+        description="Scrape similar artists from music-map.com.",
+    )
+    parser.add_argument(
+        "events_file",
+        type=Path,
+        nargs="?",
+        help="Events JSON file (not needed with --reparse-from-cache)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Most requests in flight at once (default: 1)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_REQUESTS_PER_SECOND,
+        help=(
+            "Starting requests per second; backs off when the server "
+            f"struggles (default: {DEFAULT_REQUESTS_PER_SECOND})"
+        ),
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        help=(
+            "Let the rate climb to this many requests per second while the "
+            "server keeps up (default: never above --rate)"
+        ),
+    )
+    parser.add_argument(
+        "--frontier",
+        action="store_true",
+        help=(
+            "Also crawl outward from the event artists and favorites, "
+            "best candidates for new connection paths first"
+        ),
+    )
+    parser.add_argument(
+        "--favorites-file",
+        type=Path,
+        default=Path("output") / "my_artists.json",
+        help="Favorite artists JSON for --frontier (default: output/my_artists.json)",
+    )
+    parser.add_argument(
+        "--max-artists",
+        type=int,
+        default=DEFAULT_FRONTIER_MAX_ARTISTS,
+        help=(
+            "Most artists to scrape with --frontier "
+            f"(default: {DEFAULT_FRONTIER_MAX_ARTISTS})"
+        ),
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=None,
+        help="Most requests to send with --frontier (default: no limit)",
+    )
+    parser.add_argument(
+        "--page-cache-dir",
+        type=Path,
+        default=PAGE_CACHE_DIR,
+        help=f"Where fetched pages are kept (default: {PAGE_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-page-cache",
+        action="store_true",
+        help="Don't keep the fetched pages",
+    )
+    parser.add_argument(
+        "--reparse-from-cache",
+        action="store_true",
+        help=(
+            "Rebuild the similarity map from the kept pages, without any "
+            "requests, then exit"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parser processes for --reparse-from-cache (default: one per CPU)",
+    )
+    args = parser.parse_args()
+    events_file = args.events_file
+    if events_file is None and not args.reparse_from_cache:
+        parser.error("events_file is required unless --reparse-from-cache is given")
+    page_cache = None if args.no_page_cache else PageCache(args.page_cache_dir)
 
     # Setup output directory - use global cache file
     output_dir = Path("output")
@@ -285,6 +609,17 @@ def main():
     # Load existing results from global cache
     existing_data = load_existing_results(output_file)
 
+    if args.reparse_from_cache:
+        results = results_from_dicts(existing_data)
+        results.update(
+            reparse_cache(
+                PageCache(args.page_cache_dir), existing_data, workers=args.workers
+            )
+        )
+        save_results(results, output_file)
+        logger.info("Rebuilt %s from %s", output_file, args.page_cache_dir)
+        return
+
     # Load artists from the specific events file
     artists = load_artists(events_file)
     logger.info("Loaded %d unique artists from %s", len(artists), events_file)
@@ -310,29 +645,17 @@ def main():
     logger.info("Starting scraping process...")
 
     # Convert existing data to ScraperResult objects
-    results = {}
-    for artist, data in existing_data.items():
-        if data.get("status") == "success":
-            similar = [
-                SimilarArtist(
-                    name=a["name"],
-                    rank=a["rank"],
-                    relationship_strength=a.get("relationship_strength"),
-                )
-                for a in data.get("similar_artists", [])
-            ]
-            results[artist] = ScraperResult(status="success", similar_artists=similar)
-        else:
-            results[artist] = ScraperResult(status="error", error=data.get("error"))
+    results = results_from_dicts(existing_data)
 
-    # Process each new artist
     processed_count = 0
-    for i, artist in enumerate(to_process, 1):
-        logger.info("[%d/%d] %s", i, len(to_process), artist)
+    total = args.max_artists if args.frontier else len(to_process)
 
-        result = scrape_artist(artist)
+    def record_result(artist: str, result: ScraperResult):
+        """Store a result and periodically save progress."""
+        nonlocal processed_count
         results[artist] = result
         processed_count += 1
+        logger.info("[%d/%d] %s", processed_count, total, artist)
 
         # Show success/error
         if result.status == "success":
@@ -345,9 +668,27 @@ def main():
             git_commit_results(output_file, len(results))
             logger.info("  💾 Progress saved (%d total artists)", len(results))
 
-        # Be nice to the server - delay between requests
-        if i < len(to_process):
-            time.sleep(2.0)
+    # Be nice to the server - the crawl paces itself to its responses
+    pacing = {
+        "requests_per_second": args.rate,
+        "max_requests_per_second": args.max_rate,
+        "concurrency": args.concurrency,
+        "on_result": record_result,
+        "page_cache": page_cache,
+    }
+    if args.frontier:
+        asyncio.run(
+            crawl_frontier(
+                results,
+                artists,
+                load_artist_list(args.favorites_file),
+                max_artists=args.max_artists,
+                max_requests=args.max_requests,
+                **pacing,
+            )
+        )
+    else:
+        asyncio.run(crawl_artists(to_process, **pacing))
 
     # Save final results
     save_results(results, output_file)
@@ -0,0 +1,213 @@
+"""
+Compressed raw page store for music-map responses.
+
+Scraping throws the HTML away after parsing, so a change to the parsing
+used to mean crawling music-map.com again. The crawler keeps every page
+it fetches here instead: bodies are gzip-compressed and stored under the
+SHA-256 of their content, so identical pages are stored once, and a
+small JSON record per normalized artist URL holds the fetch metadata
+(status, time, ETag) and the hash of its body.
+
+    page_cache/
+        objects/<2 hex digits>/<sha256>.html.gz
+        pages/<sha256 of the url>.json
+
+reparse_cache rebuilds scrape results from the stored pages alone,
+parsing them in parallel across processes.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from functools import partial
+from http import HTTPStatus
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
+
+from src.music_map_scraper import (
+    PageFetch,
+    ScraperResult,
+    artist_url,
+    parse_artist_page,
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE_DIR = Path("output") / "page_cache"
+OBJECTS_DIR_NAME = "objects"
+PAGES_DIR_NAME = "pages"
+COMPRESSION_LEVEL = 6
+REPARSE_CHUNK_SIZE = 64
+# Responses worth keeping: pages and definite "not found"s, not throttling
+# or server errors
+CACHED_STATUSES = frozenset({HTTPStatus.OK, HTTPStatus.NOT_FOUND})
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    """Fetch metadata of a stored page."""
+
+    url: str  # Normalized
+    artist_name: str
+    status: int
+    fetched_at: str  # ISO 8601, UTC
+    etag: str | None = None
+    body_sha256: str | None = None  # None if the response had no page
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a page URL: lowercase, no query or trailing slash."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/").lower() or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, "", ""))
+
+
+def _sha256(data: bytes) -> str:
+    """Hex SHA-256 digest."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write a file via a scratch file and rename, so readers never see half."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+    scratch.write_bytes(data)
+    os.replace(scratch, path)
+
+
+class PageCache:
+    """Content-addressed store of fetched pages and their metadata."""
+
+    def __init__(self, root: Path = PAGE_CACHE_DIR):
+        """
+        Open a page store; directories are created on the first write.
+
+        Args:
+            root: Directory of the store
+        """
+        self.root = root
+
+    def _record_path(self, url: str) -> Path:
+        """Metadata file of a normalized URL."""
+        return self.root / PAGES_DIR_NAME / f"{_sha256(url.encode('utf-8'))}.json"
+
+    def _object_path(self, digest: str) -> Path:
+        """Compressed body file of a content hash."""
+        return self.root / OBJECTS_DIR_NAME / digest[:2] / f"{digest}.html.gz"
+
+    def store(self, artist_name: str, fetch: PageFetch) -> CachedPage | None:
+        """
+        Keep a fetched page and its metadata.
+
+        Args:
+            artist_name: Artist the page was fetched for
+            fetch: Outcome of the request
+
+        Returns:
+            The stored record, or None if the response isn't worth keeping
+        """
+        if fetch.status not in CACHED_STATUSES:
+            return None
+
+        digest = None
+        if fetch.html is not None:
+            body = fetch.html.encode("utf-8")
+            digest = _sha256(body)
+            object_path = self._object_path(digest)
+            if not object_path.exists():
+                _write_atomic(object_path, gzip.compress(body, COMPRESSION_LEVEL))
+
+        page = CachedPage(
+            url=normalize_url(artist_url(artist_name)),
+            artist_name=artist_name,
+            status=fetch.status,
+            fetched_at=datetime.now(UTC).isoformat(timespec="seconds"),
+            etag=fetch.etag,
+            body_sha256=digest,
+        )
+        _write_atomic(
+            self._record_path(page.url),
+            json.dumps(asdict(page), ensure_ascii=False).encode("utf-8"),
+        )
+        return page
+
+    def get(self, artist_name: str) -> CachedPage | None:
+        """Stored record of an artist's page, or None if not stored."""
+        record_path = self._record_path(normalize_url(artist_url(artist_name)))
+        if not record_path.exists():
+            return None
+        return CachedPage(**json.loads(record_path.read_text(encoding="utf-8")))
+
+    def pages(self) -> Iterator[CachedPage]:
+        """All stored records."""
+        for record_path in sorted((self.root / PAGES_DIR_NAME).glob("*.json")):
+            yield CachedPage(**json.loads(record_path.read_text(encoding="utf-8")))
+
+    def read_body(self, page: CachedPage) -> str | None:
+        """HTML of a stored page, or None if the response had no page."""
+        if page.body_sha256 is None:
+            return None
+        compressed = self._object_path(page.body_sha256).read_bytes()
+        return gzip.decompress(compressed).decode("utf-8")
+
+
+def _reparse_page(root: Path, page: CachedPage) -> ScraperResult:
+    """Parse one stored page (runs in a worker process)."""
+    return parse_artist_page(PageCache(root).read_body(page))
+
+
+def reparse_cache(
+    cache: PageCache,
+    artist_names: Iterable[str] = (),
+    *,
+    workers: int | None = None,
+) -> dict[str, ScraperResult]:
+    """
+    Rebuild scrape results from stored pages, without any requests.
+
+    Args:
+        cache: Page store
+        artist_names: More artists to look up, e.g. names spelled
+            differently from the one a page was stored under
+        workers: Parser processes (default: one per CPU)
+
+    Returns:
+        Dictionary mapping artist names to ScraperResults
+    """
+    started = time.monotonic()
+    targets = {page.artist_name: page for page in cache.pages()}
+    for artist_name in artist_names:
+        if artist_name not in targets and (page := cache.get(artist_name)):
+            targets[artist_name] = page
+
+    # Spawned workers: forking a process that runs crawler threads is unsafe
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = dict(
+            zip(
+                targets,
+                executor.map(
+                    partial(_reparse_page, cache.root),
+                    targets.values(),
+                    chunksize=REPARSE_CHUNK_SIZE,
+                ),
+                strict=True,
+            )
+        )
+
+    logger.info(
+        "Reparsed %d cached pages in %.1fs",
+        len(results),
+        time.monotonic() - started,
+    )
+    return results
@@ -0,0 +1,234 @@
+"""
+Prune the similarity graph to the part a connection search can use.
+
+Most scraped artists are leaves that were never scraped themselves: they
+have no outgoing links, so no path to a favorite runs through them. And
+an event artist that cannot reach any favorite still costs a full
+Dijkstra row. Before searching, the graph is cut down to the artists that
+are reachable from some event artist and can themselves reach some
+favorite. Every event artist → favorite path, shortest or not, runs
+through those artists only, so searching the pruned graph gives the same
+connections.
+"""
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import breadth_first_order, connected_components
+
+from src.artist_connection_search import build_reverse_graph
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PruningReport:
+    """How much of the graph a pruning pass removed."""
+
+    n_nodes: int
+    n_edges: int
+    n_components: int  # Strongly connected components
+    largest_component: int
+    n_sources: int
+    n_reachable_sources: int  # Sources that reach at least one favorite
+    n_targets: int
+    n_reachable_targets: int  # Favorites reached from at least one source
+    kept_nodes: int
+    kept_edges: int
+
+    @property
+    def pruned_node_fraction(self) -> float:
+        """Fraction of the nodes removed."""
+        return 1.0 - self.kept_nodes / self.n_nodes if self.n_nodes else 0.0
+
+    @property
+    def pruned_edge_fraction(self) -> float:
+        """Fraction of the edges removed."""
+        return 1.0 - self.kept_edges / self.n_edges if self.n_edges else 0.0
+
+
+@dataclass(frozen=True)
+class PrunedGraph:
+    """
+    Subgraph induced by the artists that can lie on a search path.
+
+    Node i of the subgraph is node nodes[i] of the full graph; strengths
+    is aligned with graph.data.
+    """
+
+    graph: sp.csr_matrix
+    reverse_graph: sp.csr_matrix
+    strengths: np.ndarray
+    names: list[str]
+    nodes: np.ndarray
+    report: PruningReport
+
+    @property
+    def artist_to_idx(self) -> dict[str, int]:
+        """Map artist name to subgraph node index."""
+        return {name: idx for idx, name in enumerate(self.names)}
+
+    @property
+    def idx_to_artist(self) -> dict[int, str]:
+        """Map subgraph node index to artist name."""
+        return dict(enumerate(self.names))
+
+
+def reachable_from(graph: sp.csr_matrix, roots: np.ndarray) -> np.ndarray:
+    """
+    Mark the nodes reachable from any of the roots.
+
+    A single breadth-first search runs from a virtual node linked to
+    every root.
+
+    Args:
+        graph: Sparse CSR adjacency (costs are ignored)
+        roots: Node indices to start from
+
+    Returns:
+        Boolean mask over the nodes of graph
+    """
+    n_nodes = graph.shape[0]
+    if len(roots) == 0:
+        return np.zeros(n_nodes, dtype=bool)
+
+    # Append the virtual node as an extra last row pointing at the roots
+    roots = np.unique(roots)
+    indptr = np.append(graph.indptr, graph.indptr[-1] + len(roots))
+    indices = np.concatenate([graph.indices, roots]).astype(np.int32)
+    extended = sp.csr_matrix(
+        (np.ones(len(indices)), indices, indptr), shape=(n_nodes + 1, n_nodes + 1)
+    )
+    order = breadth_first_order(
+        extended, n_nodes, directed=True, return_predecessors=False
+    )
+
+    reached = np.zeros(n_nodes + 1, dtype=bool)
+    reached[order] = True
+    return reached[:n_nodes]
+
+
+def induced_subgraph(
+    graph: sp.csr_matrix, strengths: np.ndarray, nodes: np.ndarray
+) -> tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Restrict a graph to some of its nodes.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs and sorted indices
+        strengths: Relationship strengths aligned with graph.data
+        nodes: Sorted node indices to keep
+
+    Returns:
+        Tuple of (subgraph, strengths) with nodes renumbered by their
+        position in nodes; indices stay sorted
+    """
+    n_nodes = graph.shape[0]
+    local = np.full(n_nodes, -1, dtype=np.int64)
+    local[nodes] = np.arange(len(nodes))
+
+    rows = np.repeat(np.arange(n_nodes), np.diff(graph.indptr))
+    kept = (local[rows] >= 0) & (local[graph.indices] >= 0)
+    indptr = np.zeros(len(nodes) + 1, dtype=np.int32)
+    np.cumsum(np.bincount(local[rows[kept]], minlength=len(nodes)), out=indptr[1:])
+
+    subgraph = sp.csr_matrix(
+        (
+            np.asarray(graph.data)[kept],
+            local[graph.indices[kept]].astype(np.int32),
+            indptr,
+        ),
+        shape=(len(nodes), len(nodes)),
+    )
+    return subgraph, np.asarray(strengths)[kept]
+
+
+def prune_search_graph(
+    graph: sp.csr_matrix,
+    strengths: np.ndarray,
+    names: list[str],
+    source_artists: list[str],
+    target_artists: list[str],
+    *,
+    reverse_graph: sp.csr_matrix | None = None,
+) -> PrunedGraph:
+    """
+    Cut the graph down to the artists on some event artist → favorite path.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs and sorted indices
+        strengths: Relationship strengths aligned with graph.data
+        names: Artist name of each node
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        reverse_graph: Pre-built build_reverse_graph(graph), if available
+
+    Returns:
+        PrunedGraph holding the subgraph and a PruningReport
+    """
+    if reverse_graph is None:
+        reverse_graph = build_reverse_graph(graph)
+    artist_to_idx = {name: idx for idx, name in enumerate(names)}
+    sources = np.array(
+        sorted({artist_to_idx[a] for a in source_artists if a in artist_to_idx}),
+        dtype=np.int64,
+    )
+    targets = np.array(
+        sorted({artist_to_idx[a] for a in target_artists if a in artist_to_idx}),
+        dtype=np.int64,
+    )
+
+    # A node is on some source → favorite path exactly when a source
+    # reaches it and it reaches a favorite
+    from_sources = reachable_from(graph, sources)
+    to_targets = reachable_from(reverse_graph, targets)
+    nodes = np.flatnonzero(from_sources & to_targets)
+
+    n_components, labels = connected_components(
+        graph, directed=True, connection="strong"
+    )
+    subgraph, sub_strengths = induced_subgraph(graph, strengths, nodes)
+    report = PruningReport(
+        n_nodes=graph.shape[0],
+        n_edges=int(graph.nnz),
+        n_components=int(n_components),
+        largest_component=int(np.bincount(labels).max()) if len(labels) else 0,
+        n_sources=len(sources),
+        n_reachable_sources=int(np.count_nonzero(to_targets[sources])),
+        n_targets=len(targets),
+        n_reachable_targets=int(np.count_nonzero(from_sources[targets])),
+        kept_nodes=len(nodes),
+        kept_edges=int(subgraph.nnz),
+    )
+    logger.info(
+        "Pruned search graph to %d of %d nodes (%.1f%% pruned) and %d of %d "
+        "edges (%.1f%% pruned); %d strongly connected components, largest %d",
+        report.kept_nodes,
+        report.n_nodes,
+        100 * report.pruned_node_fraction,
+        report.kept_edges,
+        report.n_edges,
+        100 * report.pruned_edge_fraction,
+        report.n_components,
+        report.largest_component,
+    )
+    logger.info(
+        "  %d of %d event artists reach a favorite; %d of %d favorites reachable",
+        report.n_reachable_sources,
+        report.n_sources,
+        report.n_reachable_targets,
+        report.n_targets,
+    )
+
+    sub_reverse = build_reverse_graph(subgraph)
+    sub_reverse.sort_indices()
+    return PrunedGraph(
+        graph=subgraph,
+        reverse_graph=sub_reverse,
+        strengths=sub_strengths,
+        names=[names[node] for node in nodes],
+        nodes=nodes,
+        report=report,
+    )
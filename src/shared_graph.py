@@ -0,0 +1,104 @@
+"""
+Share CSR graphs with worker processes through shared memory.
+
+The parent copies a graph's indptr/indices/data arrays into named
+multiprocessing.shared_memory segments once; workers attach to the
+segments by name and wrap them in a CSR matrix without copying.
+"""
+
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import scipy.sparse as sp
+
+CSR_ARRAYS = ("indptr", "indices", "data")
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """Picklable description of an array stored in shared memory."""
+
+    segment: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class SharedCSRSpec:
+    """Picklable description of a CSR matrix stored in shared memory."""
+
+    shape: tuple[int, int]
+    arrays: dict[str, SharedArraySpec]
+
+
+class SharedCSR:
+    """
+    Owner of the shared memory segments holding one CSR matrix.
+
+    Use as a context manager; the segments are unlinked on exit.
+    """
+
+    def __init__(self, graph: sp.csr_matrix):
+        """
+        Copy a CSR matrix into new shared memory segments.
+
+        Args:
+            graph: Sparse CSR matrix to share
+        """
+        self._segments: list[SharedMemory] = []
+        arrays = {}
+        try:
+            for name in CSR_ARRAYS:
+                source = np.ascontiguousarray(getattr(graph, name))
+                # Zero-size segments are not allowed
+                segment = SharedMemory(create=True, size=max(source.nbytes, 1))
+                self._segments.append(segment)
+                np.ndarray(source.shape, source.dtype, buffer=segment.buf)[:] = source
+                arrays[name] = SharedArraySpec(
+                    segment.name, source.shape, source.dtype.str
+                )
+        except BaseException:
+            self.close()
+            raise
+        self.spec = SharedCSRSpec(shape=graph.shape, arrays=arrays)
+
+    def close(self):
+        """Release and unlink all segments."""
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+    def __enter__(self) -> "SharedCSR":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_csr(spec: SharedCSRSpec) -> tuple[sp.csr_matrix, list[SharedMemory]]:
+    """
+    Wrap shared memory segments in a CSR matrix without copying.
+
+    Args:
+        spec: SharedCSR.spec from the owning process
+
+    Returns:
+        Tuple of (graph, segments). The segments must stay referenced for
+        as long as the graph is used.
+    """
+    segments = []
+    arrays = {}
+    for name in CSR_ARRAYS:
+        array_spec = spec.arrays[name]
+        segment = SharedMemory(name=array_spec.segment)
+        segments.append(segment)
+        arrays[name] = np.ndarray(
+            array_spec.shape, np.dtype(array_spec.dtype), buffer=segment.buf
+        )
+
+    graph = sp.csr_matrix(
+        (arrays["data"], arrays["indices"], arrays["indptr"]), shape=spec.shape
+    )
+    return graph, segments
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark edge sparsification against the full similarity graph.
+
+For each sparsification, the graph is rebuilt in memory with only the
+kept links and the best path per event artist → favorite pair is
+searched. The report gives the search speedup over the full graph and how
+many of the full graph's best paths change or disappear.
+"""
+
+import argparse
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.artist_connection_search import (
+    EdgeSparsification,
+    build_reverse_graph,
+    build_sparse_graph,
+    build_strength_lookup,
+    find_optimal_paths,
+)
+from src.data_loader import load_artist_list, load_events, load_similar_artists_map
+from src.models import ArtistSimilarityData, Event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EDGES = (5, 10, 20)
+DEFAULT_REPEATS = 3
+
+
+@dataclass(frozen=True)
+class SparsificationResult:
+    """Search cost and best-path changes under one sparsification."""
+
+    sparsification: EdgeSparsification
+    n_edges: int
+    search_seconds: float  # Best of the repeats
+    n_pairs: int  # Pairs connected under the sparsification
+    n_lost_pairs: int  # Pairs connected in the full graph only
+    n_changed_paths: int  # Pairs still connected through a different path
+    mean_cost_increase: float  # Relative, over the changed paths
+
+
+def _best_paths(
+    similarity_map: dict[str, ArtistSimilarityData],
+    event_artists: list[str],
+    favorites: list[str],
+    events: list[Event],
+    *,
+    sparsification: EdgeSparsification | None,
+    repeats: int,
+) -> tuple[int, float, dict[tuple[str, str], tuple[tuple[str, ...], float]]]:
+    """
+    Best path per pair on a (possibly sparsified) graph.
+
+    Returns:
+        Tuple of (edge count, best search time in seconds, {(event artist,
+        favorite): (path, total cost)})
+    """
+    graph, artist_to_idx, idx_to_artist = build_sparse_graph(
+        similarity_map, sparsification=sparsification
+    )
+    strengths = build_strength_lookup(
+        graph, similarity_map, artist_to_idx, sparsification=sparsification
+    )
+    reverse_graph = build_reverse_graph(graph)
+
+    best_seconds = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        grouped = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            event_artists,
+            favorites,
+            strengths,
+            events,
+            max_paths_per_pair=1,
+            reverse_graph=reverse_graph,
+        )
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+
+    paths = {
+        (group.event_artist, group.favorite_artist): (
+            tuple(group.paths[0].path),
+            group.paths[0].total_cost,
+        )
+        for group in grouped
+    }
+    return int(graph.nnz), best_seconds, paths
+
+
+def compare_sparsifications(
+    similarity_map: dict[str, ArtistSimilarityData],
+    event_artists: list[str],
+    favorites: list[str],
+    events: list[Event],
+    sparsifications: list[EdgeSparsification],
+    *,
+    repeats: int = DEFAULT_REPEATS,
+) -> tuple[SparsificationResult, list[SparsificationResult]]:
+    """
+    Measure each sparsification against the full graph.
+
+    Args:
+        similarity_map: Dict of artist similarity data
+        event_artists: List of event artist names
+        favorites: List of favorite artist names
+        events: List of Event objects
+        sparsifications: Sparsifications to measure
+        repeats: Searches per graph; the fastest one is reported
+
+    Returns:
+        Tuple of (full graph result, one result per sparsification)
+    """
+    args = (similarity_map, event_artists, favorites, events)
+    n_edges, seconds, baseline = _best_paths(
+        *args, sparsification=None, repeats=repeats
+    )
+    full = SparsificationResult(
+        sparsification=EdgeSparsification(),
+        n_edges=n_edges,
+        search_seconds=seconds,
+        n_pairs=len(baseline),
+        n_lost_pairs=0,
+        n_changed_paths=0,
+        mean_cost_increase=0.0,
+    )
+
+    results = []
+    for sparsification in sparsifications:
+        n_edges, seconds, paths = _best_paths(
+            *args, sparsification=sparsification, repeats=repeats
+        )
+        changed = [
+            pair
+            for pair, (path, _) in paths.items()
+            if pair in baseline and baseline[pair][0] != path
+        ]
+        increases = [paths[pair][1] / baseline[pair][1] - 1.0 for pair in changed]
+        results.append(
+            SparsificationResult(
+                sparsification=sparsification,
+                n_edges=n_edges,
+                search_seconds=seconds,
+                n_pairs=len(paths),
+                n_lost_pairs=len(baseline.keys() - paths.keys()),
+                n_changed_paths=len(changed),
+                mean_cost_increase=sum(increases) / len(increases)
+                if increases
+                else 0.0,
+            )
+        )
+    return full, results
+
+
+def main():
+    """Report speedup and best-path changes for several sparsifications."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.sparsification_benchmark",
+        description="Benchmark top-k / strength-floor edge sparsification.",
+    )
+    parser.add_argument("events_file", type=Path, help="Events JSON file")
+    parser.add_argument(
+        "--similar-artists-file",
+        type=Path,
+        default=Path("output") / "similar_artists_map.json",
+        help="Similarity map JSON (default: output/similar_artists_map.json)",
+    )
+    parser.add_argument(
+        "--favorites-file",
+        type=Path,
+        default=Path("output") / "my_artists.json",
+        help="Favorite artists JSON (default: output/my_artists.json)",
+    )
+    parser.add_argument(
+        "--max-edges",
+        type=int,
+        nargs="*",
+        default=list(DEFAULT_MAX_EDGES),
+        help="Top-k values to try (strongest links kept per artist)",
+    )
+    parser.add_argument(
+        "--min-strengths",
+        type=float,
+        nargs="*",
+        default=[],
+        help="Strength floors to try",
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        default=DEFAULT_REPEATS,
+        help="Searches per graph; the fastest one is reported",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    similarity_map = load_similar_artists_map(args.similar_artists_file)
+    favorites = load_artist_list(args.favorites_file)
+    events = load_events(args.events_file)
+    event_artists = sorted({a.name for event in events for a in event.artists})
+    sparsifications = [
+        EdgeSparsification(max_edges_per_artist=k) for k in args.max_edges
+    ] + [EdgeSparsification(min_strength=s) for s in args.min_strengths]
+
+    full, results = compare_sparsifications(
+        similarity_map,
+        event_artists,
+        favorites,
+        events,
+        sparsifications,
+        repeats=args.repeats,
+    )
+    logger.info(
+        "Full graph: %d edges, %.3fs search, %d connected pairs",
+        full.n_edges,
+        full.search_seconds,
+        full.n_pairs,
+    )
+    for result in results:
+        logger.info(
+            "%s: %d edges (%.1f%%), %.3fs search (%.2fx), %d pairs lost, "
+            "%d of %d best paths changed (mean cost +%.1f%%)",
+            result.sparsification,
+            result.n_edges,
+            100 * result.n_edges / full.n_edges if full.n_edges else 0.0,
+            result.search_seconds,
+            full.search_seconds / result.search_seconds
+            if result.search_seconds
+            else float("inf"),
+            result.n_lost_pairs,
+            result.n_changed_paths,
+            full.n_pairs,
+            100 * result.mean_cost_increase,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Widest-path (bottleneck) connections between event and favorite artists.
+
+The cost search minimizes the sum of 1/strength, so it will happily chain
+many mediocre links. This mode instead maximizes the weakest link on the
+path. Similarity is treated as symmetric here: two artists are linked if
+either lists the other, at the stronger of the two strengths.
+
+On an undirected graph every widest path can be taken from a maximum
+spanning forest, so the forest is built once and indexed for lowest
+common ancestor queries with binary lifting: the bottleneck of any pair
+is found in O(log n) steps, vectorized over all pairs. The forest's own
+paths can run to a hundred hops or more on a large graph, so by default
+each pair gets the fewest-hop path among all paths with the same
+bottleneck instead.
+"""
+
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import (
+    connected_components,
+    dijkstra,
+    minimum_spanning_tree,
+)
+
+from src.artist_connection_search import (
+    NO_PATH_SENTINEL,
+    edge_positions,
+    group_found_paths,
+    reconstruct_paths_batch,
+    resolve_search_endpoints,
+)
+from src.models import ArtistPairConnections, Event
+
+logger = logging.getLogger(__name__)
+
+# Bottleneck reported for pairs in different trees of the forest
+NO_BOTTLENECK = 0.0
+
+
+@dataclass(frozen=True)
+class BottleneckTree:
+    """
+    Maximum spanning forest of the symmetric strength graph with an LCA index.
+
+    parent[v] is v's parent in its tree (NO_PATH_SENTINEL for roots),
+    parent_strength[v] the strength of that edge (inf for roots), depth[v]
+    its distance in hops from the root and tree[v] the id of its tree.
+    ancestors[k, v] is v's 2^k-th ancestor (a root's is itself) and
+    ancestor_min[k, v] the weakest strength on the way there.
+    """
+
+    parent: np.ndarray
+    parent_strength: np.ndarray
+    depth: np.ndarray
+    tree: np.ndarray
+    ancestors: np.ndarray
+    ancestor_min: np.ndarray
+
+    def bottlenecks(
+        self, sources: np.ndarray, targets: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Widest-path bottleneck strength of many pairs at once.
+
+        Args:
+            sources: First node of each pair
+            targets: Second node of each pair
+
+        Returns:
+            Tuple of (bottlenecks, lca): the bottleneck strength of each
+            pair (inf if the nodes are equal, NO_BOTTLENECK if they are not
+            connected) and the lowest common ancestor (-1 if not connected)
+        """
+        u = np.asarray(sources, dtype=np.int64).copy()
+        v = np.asarray(targets, dtype=np.int64).copy()
+        connected = self.tree[u] == self.tree[v]
+        weakest = np.full(len(u), np.inf)
+
+        # Lift the deeper node of each pair to the other's depth
+        swap = self.depth[u] < self.depth[v]
+        u[swap], v[swap] = v[swap], u[swap]
+        gap = self.depth[u] - self.depth[v]
+        for k in range(len(self.ancestors)):
+            jump = connected & ((gap >> k) & 1 == 1)
+            weakest[jump] = np.minimum(weakest[jump], self.ancestor_min[k, u[jump]])
+            u[jump] = self.ancestors[k, u[jump]]
+
+        # Lift both while their ancestors differ, largest jumps first
+        for k in range(len(self.ancestors) - 1, -1, -1):
+            jump = connected & (self.ancestors[k, u] != self.ancestors[k, v])
+            weakest[jump] = np.minimum(
+                weakest[jump],
+                np.minimum(
+                    self.ancestor_min[k, u[jump]], self.ancestor_min[k, v[jump]]
+                ),
+            )
+            u[jump] = self.ancestors[k, u[jump]]
+            v[jump] = self.ancestors[k, v[jump]]
+
+        last = connected & (u != v)
+        weakest[last] = np.minimum(
+            weakest[last],
+            np.minimum(self.parent_strength[u[last]], self.parent_strength[v[last]]),
+        )
+        u[last] = self.parent[u[last]]
+
+        lca = np.where(connected, u, -1)
+        return np.where(connected, weakest, NO_BOTTLENECK), lca
+
+    def paths(
+        self, sources: np.ndarray, targets: np.ndarray, lca: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Tree paths source → lca → target.
+
+        Args:
+            sources: First node of each pair
+            targets: Second node of each pair
+            lca: Lowest common ancestor of each pair; pairs must be connected
+
+        Returns:
+            Tuple of (nodes, offsets) in the flat layout of
+            reconstruct_paths_batch
+        """
+        predecessors = self.parent[np.newaxis, :]
+        rows = np.zeros(len(sources), dtype=np.int64)
+        up_nodes, up_offsets = reconstruct_paths_batch(predecessors, rows, sources, lca)
+        down_nodes, down_offsets = reconstruct_paths_batch(
+            predecessors, rows, targets, lca, reverse_walks=True
+        )
+
+        # Join the halves, dropping the second copy of the lca
+        up_lengths = np.diff(up_offsets)
+        down_lengths = np.diff(down_offsets) - 1
+        offsets = np.zeros(len(sources) + 1, dtype=np.int64)
+        np.cumsum(up_lengths + down_lengths, out=offsets[1:])
+        nodes = np.empty(offsets[-1], dtype=np.int32)
+
+        up_path = np.repeat(np.arange(len(sources)), up_lengths)
+        up_rank = np.arange(len(up_nodes)) - up_offsets[up_path]
+        nodes[offsets[up_path] + up_rank] = up_nodes
+
+        is_lca = np.zeros(len(down_nodes), dtype=bool)
+        is_lca[down_offsets[:-1]] = True
+        down_path = np.repeat(np.arange(len(sources)), down_lengths)
+        down_rank = np.arange(len(down_path)) - np.repeat(
+            np.cumsum(down_lengths) - down_lengths, down_lengths
+        )
+        nodes[offsets[down_path] + up_lengths[down_path] + down_rank] = down_nodes[
+            ~is_lca
+        ]
+        return nodes, offsets
+
+
+def symmetric_strength_graph(
+    graph: sp.csr_matrix, strengths: np.ndarray
+) -> tuple[sp.csr_matrix, np.ndarray]:
+    """
+    Undirected view of the similarity graph.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        strengths: Relationship strengths aligned with graph.data
+
+    Returns:
+        Tuple of (cost graph, strengths): a symmetric CSR cost graph with
+        sorted indices, linking two artists if either lists the other at
+        the stronger of the two strengths, and its strengths aligned with
+        its data
+    """
+    strength_graph = sp.csr_matrix(
+        (strengths, graph.indices, graph.indptr), shape=graph.shape
+    )
+    symmetric = strength_graph.maximum(strength_graph.T).tocsr()
+    symmetric.sort_indices()
+    symmetric_strengths = symmetric.data.copy()
+    symmetric.data = 1.0 / symmetric.data
+    return symmetric, symmetric_strengths
+
+
+def build_bottleneck_tree(
+    symmetric_graph: sp.csr_matrix, symmetric_strengths: np.ndarray
+) -> BottleneckTree:
+    """
+    Build the maximum spanning forest of a symmetric graph and index it.
+
+    Args:
+        symmetric_graph: Cost graph from symmetric_strength_graph
+        symmetric_strengths: Strengths aligned with symmetric_graph.data
+
+    Returns:
+        BottleneckTree over every node of the graph
+    """
+    n_nodes = symmetric_graph.shape[0]
+
+    # Costs fall as strengths rise, so the minimum spanning forest on
+    # costs is a maximum spanning forest on strengths
+    forest = minimum_spanning_tree(symmetric_graph).tocoo()
+
+    # Hang every tree from a virtual root so one search orders them all
+    _, tree = connected_components(forest, directed=False)
+    _, roots = np.unique(tree, return_index=True)
+    rows = np.concatenate([forest.row, forest.col, np.full(len(roots), n_nodes)])
+    cols = np.concatenate([forest.col, forest.row, roots])
+    rooted = sp.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)), shape=(n_nodes + 1, n_nodes + 1)
+    )
+    depth, predecessors = dijkstra(
+        rooted, indices=n_nodes, unweighted=True, return_predecessors=True
+    )
+    depth = depth[:n_nodes].astype(np.int64) - 1
+    parent = predecessors[:n_nodes].astype(np.int64)
+    is_root = parent == n_nodes
+    parent[is_root] = NO_PATH_SENTINEL
+
+    parent_strength = np.full(n_nodes, np.inf)
+    children = np.flatnonzero(~is_root)
+    parent_strength[children] = symmetric_strengths[
+        edge_positions(symmetric_graph, children, parent[children])
+    ]
+
+    # Binary lifting tables; a root is its own ancestor
+    levels = max(1, int(depth.max(initial=0)).bit_length())
+    ancestors = np.empty((levels, n_nodes), dtype=np.int64)
+    ancestor_min = np.empty((levels, n_nodes))
+    ancestors[0] = np.where(is_root, np.arange(n_nodes), parent)
+    ancestor_min[0] = parent_strength
+    for k in range(1, levels):
+        ancestors[k] = ancestors[k - 1][ancestors[k - 1]]
+        ancestor_min[k] = np.minimum(
+            ancestor_min[k - 1], ancestor_min[k - 1][ancestors[k - 1]]
+        )
+
+    logger.info(
+        "Built maximum spanning forest: %d trees over %d nodes", len(roots), n_nodes
+    )
+    return BottleneckTree(
+        parent=parent,
+        parent_strength=parent_strength,
+        depth=depth,
+        tree=tree,
+        ancestors=ancestors,
+        ancestor_min=ancestor_min,
+    )
+
+
+def fewest_hop_widest_paths(
+    symmetric_graph: sp.csr_matrix,
+    symmetric_strengths: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    bottlenecks: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Fewest-hop path of each pair among its widest paths.
+
+    Pairs are grouped by bottleneck; each group gets one breadth-first
+    search per distinct source (or target, if fewer) over the links at
+    least that strong. Pairs usually share their weakest link with many
+    others, but the cost still grows with the number of distinct
+    bottlenecks, so this is much slower than the spanning forest paths.
+
+    Args:
+        symmetric_graph: Cost graph from symmetric_strength_graph
+        symmetric_strengths: Strengths aligned with symmetric_graph.data
+        sources: First node of each pair
+        targets: Second node of each pair
+        bottlenecks: Bottleneck strength of each connected, distinct pair
+
+    Returns:
+        Tuple of (nodes, offsets) in the flat layout of
+        reconstruct_paths_batch, in pair order
+    """
+    levels, pair_level = np.unique(bottlenecks, return_inverse=True)
+
+    paths: list[np.ndarray | None] = [None] * len(sources)
+    for level, threshold in enumerate(levels):
+        pair_ids = np.flatnonzero(pair_level == level)
+        strong = symmetric_strengths >= threshold
+        kept_before = np.concatenate([[0], np.cumsum(strong)])
+        subgraph = sp.csr_matrix(
+            (
+                np.ones(kept_before[-1]),
+                symmetric_graph.indices[strong],
+                kept_before[symmetric_graph.indptr],
+            ),
+            shape=symmetric_graph.shape,
+        )
+        # Links are undirected, so search from whichever end has fewer
+        # distinct nodes; walks from the far end then run in path order
+        starts, ends = sources[pair_ids], targets[pair_ids]
+        from_targets = len(np.unique(ends)) < len(np.unique(starts))
+        if from_targets:
+            starts, ends = ends, starts
+        roots, rows = np.unique(starts, return_inverse=True)
+        _, predecessors = dijkstra(
+            subgraph, indices=roots, unweighted=True, return_predecessors=True
+        )
+        nodes, offsets = reconstruct_paths_batch(
+            predecessors, rows, ends, starts, reverse_walks=not from_targets
+        )
+        for k, pair in enumerate(pair_ids.tolist()):
+            paths[pair] = nodes[offsets[k] : offsets[k + 1]]
+
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum([len(path) for path in paths], out=offsets[1:])
+    nodes = np.concatenate(paths) if paths else np.empty(0, dtype=np.int32)
+    return nodes, offsets
+
+
+def find_widest_paths(
+    graph: sp.csr_matrix,
+    artist_to_idx: dict[str, int],
+    idx_to_artist: dict[int, str],
+    source_artists: list[str],
+    target_artists: list[str],
+    *,
+    strengths: np.ndarray,
+    events: list[Event],
+    min_strength: float | None = None,
+    prefer_fewer_hops: bool = True,
+    tree: BottleneckTree | None = None,
+) -> list[ArtistPairConnections]:
+    """
+    Find the widest path for every event artist and favorite pair.
+
+    Args:
+        graph: Sparse CSR matrix with edge costs
+        artist_to_idx: Mapping from artist name to index
+        idx_to_artist: Mapping from index to artist name
+        source_artists: List of event artist names
+        target_artists: List of favorite artist names
+        strengths: Relationship strengths aligned with graph.data
+        events: List of Event objects
+        min_strength: Only keep pairs whose bottleneck is at least this
+        prefer_fewer_hops: Among equally wide paths, return one with the
+            fewest hops; if False, return the (faster to find, but often
+            much longer) spanning forest path
+        tree: Prebuilt bottleneck tree for graph, reused across calls
+
+    Returns:
+        List of ArtistPairConnections with one path per pair (strengths
+        taken from the symmetric graph), sorted by best_avg_strength
+        (descending)
+    """
+    source_nodes, target_indices = resolve_search_endpoints(
+        artist_to_idx, source_artists, target_artists, events
+    )
+    if not source_nodes or not target_indices:
+        return []
+
+    symmetric_graph, symmetric_strengths = symmetric_strength_graph(graph, strengths)
+    if tree is None:
+        tree = build_bottleneck_tree(symmetric_graph, symmetric_strengths)
+
+    pair_sources = np.repeat(sorted(source_nodes), len(target_indices))
+    pair_targets = np.tile(target_indices, len(source_nodes))
+    bottlenecks, lca = tree.bottlenecks(pair_sources, pair_targets)
+
+    # Pairs of an artist with itself have no path worth reporting
+    keep = (bottlenecks > NO_BOTTLENECK) & np.isfinite(bottlenecks)
+    if min_strength is not None:
+        keep &= bottlenecks >= min_strength
+    pair_sources = pair_sources[keep]
+    pair_targets = pair_targets[keep]
+
+    if prefer_fewer_hops:
+        nodes, offsets = fewest_hop_widest_paths(
+            symmetric_graph,
+            symmetric_strengths,
+            pair_sources,
+            pair_targets,
+            bottlenecks[keep],
+        )
+    else:
+        nodes, offsets = tree.paths(pair_sources, pair_targets, lca[keep])
+
+    return group_found_paths(
+        pair_sources,
+        nodes,
+        offsets,
+        source_nodes,
+        symmetric_graph,
+        strengths=symmetric_strengths,
+        idx_to_artist=idx_to_artist,
+        max_paths_per_pair=1,
+    )
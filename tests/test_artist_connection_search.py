@@ -0,0 +1,591 @@
+"""Tests for artist connection search."""
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from src import artist_connection_search
+from src.artist_connection_search import (
+    TREE_ROW_BYTES_PER_NODE,
+    EdgeSparsification,
+    build_sparse_graph,
+    build_strength_lookup,
+    calculate_batch_path_metrics,
+    choose_search_direction,
+    edge_positions,
+    find_nearest_favorites,
+    find_optimal_paths,
+    hop_limited_search,
+    reconstruct_paths_batch,
+    search_chunk_rows,
+)
+from src.k_shortest_paths import build_adjacency, yen_k_shortest_paths
+from src.models import Artist, ArtistSimilarityData, Event, SimilarArtist
+
+MAX_PATHS = 3
+RANDOM_GRAPH_SEEDS = range(5)
+
+
+def make_similarity_map(
+    edges: dict[str, list[tuple[str, float]]],
+) -> dict[str, ArtistSimilarityData]:
+    """Build a similarity map from {artist: [(similar, strength), ...]}."""
+    return {
+        artist: ArtistSimilarityData(
+            artist_name=artist,
+            similar_artists=tuple(
+                SimilarArtist(name=name, rank=rank, relationship_strength=strength)
+                for rank, (name, strength) in enumerate(similar, 1)
+            ),
+        )
+        for artist, similar in edges.items()
+    }
+
+
+def make_random_map(seed: int, n: int = 9, degree: int = 3):
+    """Build a small random similarity map with distinct strengths."""
+    rng = np.random.default_rng(seed)
+    names = [f"A{i}" for i in range(n)]
+    return make_similarity_map(
+        {
+            name: [
+                (str(other), round(float(rng.uniform(0.5, 10.0)), 4))
+                for other in rng.choice(
+                    [o for o in names if o != name], degree, replace=False
+                )
+            ]
+            for name in names
+        }
+    )
+
+
+def brute_force_paths(similarity_map, source: str, target: str):
+    """Enumerate every loopless path with its cost, cheapest first."""
+    results = []
+
+    def walk(node, path, cost):
+        if node == target:
+            results.append((cost, tuple(path)))
+            return
+        if node not in similarity_map:
+            return
+        for sim in similarity_map[node].similar_artists:
+            if sim.name not in path:
+                path.append(sim.name)
+                walk(sim.name, path, cost + 1.0 / sim.relationship_strength)
+                path.pop()
+
+    walk(source, [source], 0.0)
+    return sorted(results)
+
+
+def make_events(artists: list[str]) -> list[Event]:
+    """Wrap artists into a single event."""
+    return [
+        Event(
+            name="Test Night",
+            ticket_url="https://example.com",
+            venue="Venue",
+            artists=[Artist(name=name) for name in artists],
+        )
+    ]
+
+
+@pytest.fixture
+def diamond_map():
+    """A → {B, C} → D with a weaker detour through E."""
+    return make_similarity_map(
+        {
+            "A": [("B", 9.0), ("C", 6.0), ("E", 2.0)],
+            "B": [("D", 8.0)],
+            "C": [("D", 7.0)],
+            "E": [("D", 1.0)],
+        }
+    )
+
+
+class TestEdgeArrays:
+    """Tests for CSR-aligned strengths and vectorized path metrics."""
+
+    def test_edge_positions(self, diamond_map):
+        """Edges resolve to their CSR slot; missing edges give -1."""
+        graph, artist_to_idx, _ = build_sparse_graph(diamond_map)
+        idx = artist_to_idx
+
+        positions = edge_positions(
+            graph,
+            np.array([idx["A"], idx["A"], idx["B"], idx["D"], idx["B"]]),
+            np.array([idx["C"], idx["E"], idx["D"], idx["A"], idx["A"]]),
+        )
+
+        assert positions[3] == -1
+        assert positions[4] == -1
+        assert graph.data[positions[0]] == pytest.approx(1 / 6.0)
+        assert graph.data[positions[1]] == pytest.approx(1 / 2.0)
+        assert graph.data[positions[2]] == pytest.approx(1 / 8.0)
+
+    def test_batch_metrics(self, diamond_map):
+        """Batch metrics match per-edge strengths; bad paths are invalid."""
+        graph, artist_to_idx, _ = build_sparse_graph(diamond_map)
+        strengths = build_strength_lookup(graph, diamond_map, artist_to_idx)
+        paths = [["A", "B", "D"], ["A"], ["A", "E", "D"], ["D", "A"]]
+        nodes = np.array([artist_to_idx[name] for path in paths for name in path])
+        offsets = np.cumsum([0] + [len(path) for path in paths])
+
+        batch = calculate_batch_path_metrics(nodes, offsets, graph, strengths)
+
+        assert batch.metrics(0) == (
+            [9.0, 8.0],
+            1 / 9.0 + 1 / 8.0,
+            8.0,
+            9.0,
+            8.5,
+        )
+        assert batch.metrics(1) is None
+        assert batch.metrics(2)[0] == [2.0, 1.0]
+        assert batch.metrics(3) is None
+
+    def test_reconstruct_paths_batch(self, diamond_map):
+        """Batch walks follow the tree; unreachable pairs are empty."""
+        graph, artist_to_idx, _ = build_sparse_graph(diamond_map)
+        idx = artist_to_idx
+        _, predecessors = dijkstra(
+            graph, indices=[idx["A"], idx["B"]], return_predecessors=True
+        )
+
+        nodes, offsets = reconstruct_paths_batch(
+            predecessors,
+            np.array([0, 0, 1, 0]),
+            np.array([idx["D"], idx["A"], idx["A"], idx["E"]]),
+            np.array([idx["A"], idx["A"], idx["B"], idx["A"]]),
+            reverse_walks=True,
+        )
+
+        paths = [nodes[a:b].tolist() for a, b in pairwise(offsets)]
+        assert paths == [
+            [idx["A"], idx["B"], idx["D"]],
+            [idx["A"]],
+            [],
+            [idx["A"], idx["E"]],
+        ]
+
+
+class TestEdgeSparsification:
+    """Tests for dropping weak links when building the graph."""
+
+    def test_top_k_keeps_strongest_links(self, diamond_map):
+        """Each artist keeps its k strongest links and every node."""
+        sparsification = EdgeSparsification(max_edges_per_artist=2)
+        graph, artist_to_idx, _ = build_sparse_graph(
+            diamond_map, sparsification=sparsification
+        )
+        strengths = build_strength_lookup(
+            graph, diamond_map, artist_to_idx, sparsification=sparsification
+        )
+        idx = artist_to_idx
+
+        assert len(artist_to_idx) == len(["A", "B", "C", "D", "E"])
+        assert sorted(graph[idx["A"]].indices) == sorted([idx["B"], idx["C"]])
+        assert graph[idx["E"], idx["D"]] == pytest.approx(1.0)
+        np.testing.assert_allclose(strengths, 1.0 / graph.data)
+
+    def test_strength_floor(self, diamond_map):
+        """Links weaker than the floor are dropped."""
+        graph, artist_to_idx, _ = build_sparse_graph(
+            diamond_map, sparsification=EdgeSparsification(min_strength=6.5)
+        )
+        idx = artist_to_idx
+
+        kept = {(idx[a], idx[b]) for a, b in [("A", "B"), ("B", "D"), ("C", "D")]}
+        assert set(zip(*graph.nonzero(), strict=True)) == kept
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_combined_matches_per_artist_filter(self, seed):
+        """Floor and top-k agree with filtering each artist's list directly."""
+        similarity_map = make_random_map(seed, n=20, degree=8)
+        top_k, floor = 3, 2.0
+        sparsification = EdgeSparsification(
+            max_edges_per_artist=top_k, min_strength=floor
+        )
+        graph, artist_to_idx, _ = build_sparse_graph(
+            similarity_map, sparsification=sparsification
+        )
+
+        expected = set()
+        for artist, data in similarity_map.items():
+            strong = [
+                s for s in data.similar_artists if s.relationship_strength >= floor
+            ]
+            strong.sort(key=lambda s: -s.relationship_strength)
+            expected.update((artist, s.name) for s in strong[:top_k])
+        idx_to_artist = {i: a for a, i in artist_to_idx.items()}
+        found = {
+            (idx_to_artist[a], idx_to_artist[b])
+            for a, b in zip(*graph.nonzero(), strict=True)
+        }
+        assert found == expected
+
+
+class TestYenKShortestPaths:
+    """Tests for k-shortest loopless paths."""
+
+    @pytest.mark.parametrize("use_tree", [False, True])
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_brute_force(self, seed, use_tree):
+        """Yen's paths match exhaustive enumeration on random graphs."""
+        similarity_map = make_random_map(seed)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        adjacency = build_adjacency(graph)
+        reverse_graph = graph.T.tocsr()
+
+        for source in ("A0", "A1"):
+            for target in ("A5", "A8"):
+                expected = brute_force_paths(similarity_map, source, target)
+                if not expected:
+                    continue
+                first = tuple(artist_to_idx[n] for n in expected[0][1])
+                to_target, next_hops = dijkstra(
+                    reverse_graph,
+                    indices=artist_to_idx[target],
+                    return_predecessors=True,
+                )
+                successors = next_hops.tolist() if use_tree else None
+
+                found = yen_k_shortest_paths(
+                    adjacency, first, MAX_PATHS, to_target.tolist(), successors
+                )
+
+                assert len(found) == min(MAX_PATHS, len(expected))
+                for (cost, path), (exp_cost, _) in zip(found, expected, strict=False):
+                    assert cost == pytest.approx(exp_cost)
+                    assert len(set(path)) == len(path)
+                    assert path[0] == artist_to_idx[source]
+                    assert path[-1] == artist_to_idx[target]
+                    names = [idx_to_artist[node] for node in path]
+                    assert names in [list(p) for _, p in expected]
+
+
+class TestFindOptimalPaths:
+    """Tests for the batch connection search."""
+
+    def test_returns_ranked_alternatives(self, diamond_map):
+        """Each pair gets up to max_paths_per_pair distinct ranked paths."""
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(diamond_map)
+        lookup = build_strength_lookup(graph, diamond_map, artist_to_idx)
+
+        result = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            ["A"],
+            ["D"],
+            lookup,
+            make_events(["A"]),
+            max_paths_per_pair=MAX_PATHS,
+        )
+
+        assert len(result) == 1
+        paths = [p.path for p in result[0].paths]
+        assert paths == [("A", "B", "D"), ("A", "C", "D"), ("A", "E", "D")]
+        scores = [p.path_score for p in result[0].paths]
+        assert scores == sorted(scores, reverse=True)
+        assert result[0].best_path_score == scores[0]
+
+    def test_single_path_mode(self, diamond_map):
+        """max_paths_per_pair=1 keeps only the shortest path."""
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(diamond_map)
+        lookup = build_strength_lookup(graph, diamond_map, artist_to_idx)
+
+        result = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            ["A"],
+            ["D"],
+            lookup,
+            make_events(["A"]),
+            max_paths_per_pair=1,
+        )
+
+        assert [p.path for p in result[0].paths] == [("A", "B", "D")]
+
+    def test_unknown_and_unreachable_artists(self, diamond_map):
+        """Artists missing from the graph or without a route are skipped."""
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(diamond_map)
+        lookup = build_strength_lookup(graph, diamond_map, artist_to_idx)
+
+        result = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            ["D", "Nobody"],
+            ["A"],
+            lookup,
+            make_events(["D", "Nobody"]),
+        )
+
+        assert result == []
+
+    @pytest.mark.parametrize("max_paths", [1, MAX_PATHS])
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_directions_agree(self, seed, max_paths):
+        """Forward and reverse searches produce identical connections."""
+        similarity_map = make_random_map(seed, n=30, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(10)]
+        targets = [f"A{i}" for i in range(8, 30, 3)]
+
+        results = [
+            find_optimal_paths(
+                graph,
+                artist_to_idx,
+                idx_to_artist,
+                sources,
+                targets,
+                lookup,
+                make_events(sources),
+                max_paths_per_pair=max_paths,
+                direction=direction,
+            )
+            for direction in ("forward", "reverse")
+        ]
+
+        assert results[0]
+        assert results[0] == results[1]
+
+    @pytest.mark.parametrize("direction", ["forward", "reverse"])
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_chunked_search_matches_single_call(self, seed, direction):
+        """A memory budget of one tree per call gives the same connections."""
+        similarity_map = make_random_map(seed, n=30, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(10)]
+        targets = [f"A{i}" for i in range(8, 30, 3)]
+
+        results = [
+            find_optimal_paths(
+                graph,
+                artist_to_idx,
+                idx_to_artist,
+                sources,
+                targets,
+                lookup,
+                make_events(sources),
+                max_paths_per_pair=MAX_PATHS,
+                direction=direction,
+                memory_budget_bytes=budget,
+            )
+            for budget in (None, 1)
+        ]
+
+        assert results[0]
+        assert results[0] == results[1]
+
+    @pytest.mark.parametrize("direction", ["forward", "reverse"])
+    def test_parallel_search_matches_serial(self, direction, monkeypatch):
+        """A process pool returns exactly the serial connections."""
+        monkeypatch.setattr(artist_connection_search, "MIN_PARALLEL_SEARCH_WORK", 0)
+        similarity_map = make_random_map(0, n=40, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(20)]
+        targets = [f"A{i}" for i in range(5, 40, 2)]
+
+        results = [
+            find_optimal_paths(
+                graph,
+                artist_to_idx,
+                idx_to_artist,
+                sources,
+                targets,
+                lookup,
+                make_events(sources),
+                max_paths_per_pair=MAX_PATHS,
+                direction=direction,
+                workers=workers,
+            )
+            for workers in (1, 2)
+        ]
+
+        assert results[0]
+        assert results[0] == results[1]
+
+    def test_small_search_stays_serial(self, monkeypatch):
+        """Searches below the parallel work threshold start no pool."""
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("small searches should not start a pool")
+
+        monkeypatch.setattr(artist_connection_search, "_search_chunks_in_pool", fail)
+        similarity_map = make_random_map(0, n=40, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(20)]
+
+        found = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            [f"A{i}" for i in range(20, 40)],
+            lookup,
+            make_events(sources),
+            workers=4,
+        )
+
+        assert found
+
+    def test_search_chunk_rows(self):
+        """Chunks fit the budget but always hold at least one tree."""
+        n_nodes, n_roots, fitting = 1000, 50, 7
+        row_bytes = n_nodes * TREE_ROW_BYTES_PER_NODE
+
+        assert search_chunk_rows(n_nodes, n_roots) == n_roots
+        assert search_chunk_rows(n_nodes, n_roots, row_bytes * fitting) == fitting
+        assert search_chunk_rows(n_nodes, n_roots, 1) == 1
+        assert search_chunk_rows(n_nodes, n_roots, 1 << 30) == n_roots
+
+    def test_choose_search_direction(self):
+        """Auto direction searches from the smaller side."""
+        assert choose_search_direction("auto", 500, 1000) == "forward"
+        assert choose_search_direction("auto", 1000, 500) == "reverse"
+        assert choose_search_direction("forward", 1000, 5) == "forward"
+        with pytest.raises(ValueError, match="Unknown search direction"):
+            choose_search_direction("sideways", 1, 1)
+
+
+class TestBoundedSearch:
+    """Tests for hop- and cost-bounded connection search."""
+
+    @pytest.mark.parametrize("max_cost", [None, 0.6])
+    @pytest.mark.parametrize("max_hops", [1, 2, 4])
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_hop_limited_search(self, seed, max_hops, max_cost):
+        """Bounded trees hold the cheapest paths within the bounds."""
+        similarity_map = make_random_map(seed)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        sources = ["A0", "A1"]
+        leaves = np.arange(graph.shape[0])
+
+        trees = hop_limited_search(
+            graph, np.array([artist_to_idx[s] for s in sources]), max_hops, max_cost
+        )
+
+        for row, source in enumerate(sources):
+            nodes, offsets = trees.paths(
+                np.full(len(leaves), row), leaves, reverse_walks=True
+            )
+            for leaf in leaves:
+                target = idx_to_artist[leaf]
+                found = [
+                    idx_to_artist[n] for n in nodes[offsets[leaf] : offsets[leaf + 1]]
+                ]
+                expected = [
+                    (cost, path)
+                    for cost, path in brute_force_paths(similarity_map, source, target)
+                    if len(path) - 1 <= max_hops
+                    and (max_cost is None or cost <= max_cost)
+                ]
+                if not expected:
+                    assert found == []
+                    assert trees.distances[row, leaf] == np.inf
+                    continue
+                assert trees.distances[row, leaf] == pytest.approx(expected[0][0])
+                assert len(found) - 1 <= max_hops
+                assert tuple(found) in [
+                    path for cost, path in expected if cost == expected[0][0]
+                ]
+
+    @pytest.mark.parametrize("direction", ["forward", "reverse"])
+    @pytest.mark.parametrize(
+        ("max_hops", "max_cost"), [(2, None), (None, 1.0), (3, 1.2)]
+    )
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_bounded_paths_match_brute_force(self, seed, max_hops, max_cost, direction):
+        """Ranked alternatives are the cheapest paths within the bounds."""
+        similarity_map = make_random_map(seed, n=12)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(4)]
+        targets = [f"A{i}" for i in range(6, 12)]
+
+        result = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            targets,
+            lookup,
+            make_events(sources),
+            max_paths_per_pair=MAX_PATHS,
+            direction=direction,
+            max_hops=max_hops,
+            max_cost=max_cost,
+        )
+
+        found = {(p.event_artist, p.favorite_artist): p.paths for p in result}
+        for source in sources:
+            for target in targets:
+                expected = [
+                    cost
+                    for cost, path in brute_force_paths(similarity_map, source, target)
+                    if (max_hops is None or len(path) - 1 <= max_hops)
+                    and (max_cost is None or cost <= max_cost)
+                ][:MAX_PATHS]
+                paths = found.get((source, target), ())
+                assert [p.total_cost for p in paths] == pytest.approx(expected)
+
+
+class TestFindNearestFavorites:
+    """Tests for the nearest-favorite query mode."""
+
+    @pytest.mark.parametrize("per_artist", [1, 2])
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_full_search(self, seed, per_artist):
+        """Nearest favorites are the cheapest pairs of the full search."""
+        similarity_map = make_random_map(seed, n=30, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        lookup = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(10)]
+        targets = [f"A{i}" for i in range(10, 30, 3)]
+        events = make_events(sources)
+
+        full = find_optimal_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            targets,
+            lookup,
+            events,
+            max_paths_per_pair=1,
+        )
+        nearest = find_nearest_favorites(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            targets,
+            strengths=lookup,
+            events=events,
+            favorites_per_artist=per_artist,
+        )
+
+        for source in sources:
+            expected = sorted(
+                (p.paths[0].total_cost, p.paths[0].path)
+                for p in full
+                if p.event_artist == source
+            )[:per_artist]
+            found = sorted(
+                (p.paths[0].total_cost, p.paths[0].path)
+                for p in nearest
+                if p.event_artist == source
+            )
+            assert [path for _, path in found] == [path for _, path in expected]
+            for (cost, _), (exp_cost, _) in zip(found, expected, strict=True):
+                assert cost == pytest.approx(exp_cost)
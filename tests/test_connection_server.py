@@ -0,0 +1,197 @@
+"""Tests for the resident connection query service."""
+
+import json
+import os
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.artist_connection_search import find_optimal_paths
+from src.connection_server import (
+    MAX_PATHS_PER_PAIR,
+    ConnectionService,
+    make_handler,
+    parse_query,
+)
+from tests.test_artist_connection_search import make_events, make_random_map
+from tests.test_landmark_index import write_map_file
+
+FAVORITES = [f"A{i}" for i in range(20, 30)]
+SOURCES = [f"A{i}" for i in range(6)]
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Service over a random map and favorites."""
+    map_file = write_map_file(tmp_path / "map.json", make_random_map(0, n=30))
+    favorites_file = tmp_path / "favorites.json"
+    favorites_file.write_text(json.dumps({"artists": FAVORITES}), encoding="utf-8")
+    return ConnectionService(
+        map_file,
+        favorites_file,
+        cache_dir=tmp_path / "cache",
+        trees_dir=tmp_path / "trees",
+    )
+
+
+@pytest.fixture
+def port(service):
+    """Serve the service on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def request(port, method, path, payload=None):
+    """Send a request and return (status, parsed JSON response)."""
+    connection = HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def expected_pairs(service, max_paths_per_pair):
+    """Connections from a direct search over the service's graph."""
+    compiled = service.state.compiled_graph
+    return [
+        group.to_dict()
+        for group in find_optimal_paths(
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            SOURCES,
+            FAVORITES,
+            compiled.strengths,
+            make_events(SOURCES),
+            max_paths_per_pair=max_paths_per_pair,
+        )
+    ]
+
+
+class TestConnectionService:
+    """Tests for queries and hot reloading."""
+
+    @pytest.mark.parametrize("max_paths_per_pair", [1, 3])
+    def test_post_events(self, service, port, max_paths_per_pair):
+        """Posted events get the same connections as a direct search."""
+        events_file = {
+            "events": [
+                {
+                    "name": "Test Night",
+                    "ticket_url": "https://example.com",
+                    "venue": "Venue",
+                    "artists": [{"name": name} for name in SOURCES],
+                }
+            ],
+            "max_paths_per_pair": max_paths_per_pair,
+        }
+
+        status, body = request(port, "POST", "/connections", events_file)
+
+        assert status == 200  # noqa: PLR2004
+        assert body["connections"] == expected_pairs(service, max_paths_per_pair)
+
+    def test_post_artist_list(self, port):
+        """A bare artist list is connected too, without event details."""
+        status, body = request(port, "POST", "/connections", {"artists": SOURCES})
+
+        assert status == 200  # noqa: PLR2004
+        assert body["connections"]
+        assert {pair["event_name"] for pair in body["connections"]} == {""}
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {},
+            {"artists": SOURCES, "max_paths_per_pair": 0},
+            {"artists": SOURCES, "max_paths_per_pair": MAX_PATHS_PER_PAIR + 1},
+            {"artists": SOURCES, "max_cost": -1.0},
+            {"artists": SOURCES, "max_cost": "nan"},
+            [1, 2],
+        ],
+    )
+    def test_bad_request(self, port, payload):
+        """Malformed queries are rejected with an error message."""
+        status, body = request(port, "POST", "/connections", payload)
+
+        assert status == 400  # noqa: PLR2004
+        assert body["error"]
+
+    @pytest.mark.parametrize("content_length", [None, "many", "-1"])
+    def test_bad_content_length(self, port, content_length):
+        """A missing, non-numeric or negative length is rejected."""
+        connection = HTTPConnection("127.0.0.1", port, timeout=10)
+        try:
+            connection.putrequest("POST", "/connections")
+            if content_length is not None:
+                connection.putheader("Content-Length", content_length)
+            connection.endheaders()
+            response = connection.getresponse()
+            status, body = response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+        assert status == 400  # noqa: PLR2004
+        assert "Content-Length" in body["error"]
+
+    def test_query_failure(self, service, port, monkeypatch):
+        """An unexpected search error is answered with a server error."""
+
+        def fail(*_args, **_kwargs):
+            raise RuntimeError("search crashed")
+
+        monkeypatch.setattr(service, "find_connections", fail)
+
+        status, body = request(port, "POST", "/connections", {"artists": SOURCES})
+
+        assert status == 500  # noqa: PLR2004
+        assert body["error"]
+
+    def test_health(self, service, port):
+        """The health check reports the loaded graph."""
+        status, body = request(port, "GET", "/health")
+
+        assert status == 200  # noqa: PLR2004
+        assert body["source_hash"] == service.state.compiled_graph.source_hash
+        assert body["favorites"] == len(FAVORITES)
+
+    def test_hot_reload(self, service):
+        """Edited input files are picked up, unchanged ones are not."""
+        assert not service.reload_if_changed()
+        before = service.state
+
+        write_map_file(service.similar_artists_file, make_random_map(1, n=30))
+        os.utime(service.similar_artists_file, ns=(1, 1))
+
+        assert service.reload_if_changed()
+        assert service.state.compiled_graph.source_hash != (
+            before.compiled_graph.source_hash
+        )
+        assert service.state.trees is not before.trees
+
+    def test_failed_reload_keeps_state(self, service):
+        """A broken map file leaves the current state in place."""
+        before = service.state
+        service.similar_artists_file.write_text("{not json", encoding="utf-8")
+
+        assert not service.reload_if_changed()
+        assert service.state is before
+
+
+def test_parse_query_options():
+    """Options are read and validated."""
+    events, max_paths, max_cost = parse_query(
+        {"artists": ["A", "B"], "max_paths_per_pair": 2, "max_cost": "1.5"}
+    )
+
+    assert [a.name for a in events[0].artists] == ["A", "B"]
+    assert (max_paths, max_cost) == (2, 1.5)
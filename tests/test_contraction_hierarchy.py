@@ -0,0 +1,142 @@
+"""Tests for contraction hierarchy preprocessing and many-to-many queries."""
+
+import math
+from itertools import pairwise
+
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from src.artist_connection_search import (
+    build_sparse_graph,
+    build_strength_lookup,
+    find_optimal_paths,
+)
+from src.contraction_hierarchy import (
+    build_contraction_hierarchy,
+    find_connections_with_hierarchy,
+    load_contraction_hierarchy,
+    many_to_many,
+    table_paths,
+)
+from src.graph_cache import load_compiled_graph
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+)
+from tests.test_landmark_index import write_map_file
+
+
+class TestManyToMany:
+    """Tests for shortest path tables over the hierarchy."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    @pytest.mark.parametrize("core_shortcut_ratio", [0.0, 2.0, math.inf])
+    def test_matches_dijkstra(self, seed, core_shortcut_ratio):
+        """Table costs equal Dijkstra distances, whatever the core size."""
+        graph, _, _ = build_sparse_graph(make_random_map(seed, n=40, degree=3))
+        hierarchy = build_contraction_hierarchy(graph, core_shortcut_ratio)
+        nodes = list(range(graph.shape[0]))
+
+        table = many_to_many(hierarchy, nodes, nodes, memory_budget_bytes=1)
+
+        np.testing.assert_allclose(table.distances, dijkstra(graph))
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_unpacked_paths_use_graph_edges(self, seed):
+        """Unpacked paths follow original edges and add up to the table cost."""
+        graph, _, _ = build_sparse_graph(make_random_map(seed, n=40, degree=3))
+        hierarchy = build_contraction_hierarchy(graph)
+        sources, targets = list(range(10)), list(range(25, 40))
+        table = many_to_many(hierarchy, sources, targets)
+
+        path_sources, nodes, offsets = table_paths(hierarchy, table)
+
+        costs = table.distances[np.isfinite(table.distances)]
+        assert len(path_sources) == len(costs)
+        for i, expected in enumerate(costs):
+            path = nodes[offsets[i] : offsets[i + 1]].tolist()
+            assert path[0] == path_sources[i]
+            assert sum(graph[a, b] for a, b in pairwise(path)) == pytest.approx(
+                expected
+            )
+
+    def test_max_cost_filters_pairs(self):
+        """Pairs costlier than max_cost are unreachable and not unpacked."""
+        graph, _, _ = build_sparse_graph(make_random_map(0, n=40, degree=3))
+        hierarchy = build_contraction_hierarchy(graph)
+        full = many_to_many(hierarchy, range(10), range(25, 40))
+        max_cost = float(np.median(full.distances[np.isfinite(full.distances)]))
+
+        table = many_to_many(hierarchy, range(10), range(25, 40), max_cost=max_cost)
+        path_sources, _, _ = table_paths(hierarchy, table)
+
+        within = full.distances <= max_cost
+        np.testing.assert_allclose(table.distances[within], full.distances[within])
+        assert np.isinf(table.distances[~within]).all()
+        assert len(path_sources) == np.count_nonzero(within)
+
+
+class TestFindConnectionsWithHierarchy:
+    """Tests for the hierarchy-backed connection search."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_find_optimal_paths(self, seed):
+        """Best paths agree with the Dijkstra search."""
+        similarity_map = make_random_map(seed, n=30, degree=4)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(5)]
+        targets = [f"A{i}" for i in range(20, 30)]
+        events = make_events(sources)
+        args = (
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            targets,
+            strengths,
+            events,
+        )
+
+        expected = find_optimal_paths(*args, max_paths_per_pair=1)
+        found = find_connections_with_hierarchy(
+            build_contraction_hierarchy(graph),
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            target_artists=targets,
+            strengths=strengths,
+            events=events,
+        )
+
+        assert [(g.event_artist, g.favorite_artist) for g in found] == [
+            (g.event_artist, g.favorite_artist) for g in expected
+        ]
+        for got, want in zip(found, expected, strict=True):
+            assert got.paths[0].total_cost == pytest.approx(want.paths[0].total_cost)
+
+
+class TestHierarchyCache:
+    """Tests for caching the hierarchy with the compiled graph."""
+
+    def test_reused_until_map_changes(self, tmp_path):
+        """The cached hierarchy is reused, and rebuilt for an edited map."""
+        map_file = write_map_file(tmp_path / "map.json", make_random_map(0))
+        cache_dir = tmp_path / "cache"
+
+        compiled = load_compiled_graph(map_file, cache_dir)
+        first = load_contraction_hierarchy(compiled)
+        again = load_contraction_hierarchy(compiled)
+        assert isinstance(again.rank, np.memmap)
+        np.testing.assert_array_equal(first.rank, again.rank)
+
+        write_map_file(map_file, make_random_map(1))
+        changed = load_compiled_graph(map_file, cache_dir)
+        rebuilt = load_contraction_hierarchy(changed)
+
+        expected = build_contraction_hierarchy(changed.graph)
+        np.testing.assert_array_equal(rebuilt.rank, expected.rank)
+        np.testing.assert_array_equal(rebuilt.up.costs, expected.up.costs)
@@ -0,0 +1,202 @@
+"""Tests for pluggable edge cost models."""
+
+import numpy as np
+import pytest
+
+from src import cost_models
+from src.artist_connection_search import (
+    build_rank_lookup,
+    build_reverse_graph,
+    build_sparse_graph,
+    build_strength_lookup,
+    find_optimal_paths,
+)
+from src.cost_models import (
+    COST_MODELS,
+    edge_costs,
+    load_cost_model_graphs,
+    reverse_positions,
+    score_connections,
+)
+from src.graph_cache import load_compiled_graph
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+    make_similarity_map,
+)
+from tests.test_landmark_index import write_map_file
+
+STRENGTHS = np.array([10.0, 5.0, 1.0])
+RANKS = np.array([1, 2, 3], dtype=np.int32)
+
+
+class TestEdgeCosts:
+    """Tests for the individual cost models."""
+
+    def test_reciprocal(self):
+        """Reciprocal costs invert the strengths."""
+        np.testing.assert_allclose(
+            edge_costs("reciprocal", STRENGTHS, RANKS), [0.1, 0.2, 1.0]
+        )
+
+    def test_log_is_positive_and_additive(self):
+        """Log costs are -log of the normalized strengths, floored above zero."""
+        costs = edge_costs("log", STRENGTHS, RANKS)
+
+        assert costs[0] == cost_models.MIN_EDGE_COST
+        np.testing.assert_allclose(costs[1:], [np.log(2.0), np.log(10.0)])
+
+    def test_rank(self):
+        """Rank costs follow the similar-artist list order."""
+        np.testing.assert_array_equal(edge_costs("rank", STRENGTHS, RANKS), RANKS)
+
+    def test_blend_mixes_normalized_parts(self):
+        """The blend weighs both parts after scaling each to mean one."""
+        reciprocal = 1.0 / STRENGTHS
+        expected = 0.5 * reciprocal / reciprocal.mean() + 0.5 * RANKS / RANKS.mean()
+
+        np.testing.assert_allclose(edge_costs("blend", STRENGTHS, RANKS), expected)
+
+    @pytest.mark.parametrize("model", sorted(COST_MODELS))
+    def test_costs_positive(self, model):
+        """Every model keeps costs strictly positive, even without edges."""
+        assert (edge_costs(model, STRENGTHS, RANKS) > 0).all()
+        assert len(edge_costs(model, STRENGTHS[:0], RANKS[:0])) == 0
+
+    def test_unknown_model(self):
+        """Unknown model names are rejected."""
+        with pytest.raises(ValueError, match="Unknown cost model"):
+            edge_costs("cheapest", STRENGTHS, RANKS)
+
+
+@pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+def test_reverse_positions(seed):
+    """Permuting forward data by the positions gives the reverse graph's data."""
+    graph, _, _ = build_sparse_graph(make_random_map(seed, n=30, degree=3))
+    reverse_graph = build_reverse_graph(graph)
+    reverse_graph.sort_indices()
+
+    np.testing.assert_array_equal(
+        graph.data[reverse_positions(graph)], reverse_graph.data
+    )
+
+
+class TestCostModelGraphs:
+    """Tests for the per-model graphs cached with a compiled graph."""
+
+    @pytest.fixture
+    def compiled(self, tmp_path):
+        """Compiled graph of a random similarity map."""
+        return load_compiled_graph(
+            write_map_file(tmp_path / "map.json", make_random_map(0)),
+            tmp_path / "cache",
+        )
+
+    def test_default_model_is_the_compiled_graph(self, compiled):
+        """The reciprocal model needs no extra arrays."""
+        graph, reverse_graph = load_cost_model_graphs(compiled)
+
+        assert graph is compiled.graph
+        assert reverse_graph is compiled.reverse_graph
+        assert not (compiled.cache_dir / cost_models.COST_MODEL_DIR_NAME).exists()
+
+    @pytest.mark.parametrize("model", ["log", "rank", "blend"])
+    def test_cached_and_consistent(self, compiled, model, monkeypatch):
+        """Model costs are computed once, then memory-mapped on later loads."""
+        graph, reverse_graph = load_cost_model_graphs(compiled, model)
+
+        np.testing.assert_array_equal(
+            graph.data, edge_costs(model, compiled.strengths, compiled.ranks)
+        )
+        assert (reverse_graph != graph.T).nnz == 0
+        np.testing.assert_array_equal(graph.indices, compiled.graph.indices)
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("costs should come from the cache")
+
+        monkeypatch.setattr(cost_models, "edge_costs", fail)
+        cached, cached_reverse = load_cost_model_graphs(compiled, model)
+        np.testing.assert_array_equal(cached.data, graph.data)
+        np.testing.assert_array_equal(cached_reverse.data, reverse_graph.data)
+
+    def test_rank_model_changes_search(self):
+        """Under rank costs the path of best-ranked links wins."""
+        # S → X is the strongest link but ranked last; S → Y → F uses
+        # each artist's top-ranked link
+        similarity_map = make_similarity_map(
+            {
+                "S": [("Y", 2.0), ("Z", 1.0), ("X", 9.0)],
+                "X": [("F", 9.0)],
+                "Y": [("F", 2.0)],
+            }
+        )
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        ranks = build_rank_lookup(graph, similarity_map, artist_to_idx)
+        args = (
+            artist_to_idx,
+            idx_to_artist,
+            ["S"],
+            ["F"],
+            strengths,
+            make_events(["S"]),
+        )
+
+        rank_graph = graph.copy()
+        rank_graph.data = edge_costs("rank", strengths, ranks)
+
+        best = find_optimal_paths(graph, *args)[0].paths[0]
+        best_ranked = find_optimal_paths(rank_graph, *args)[0].paths[0]
+        assert tuple(best.path) == ("S", "X", "F")
+        assert tuple(best_ranked.path) == ("S", "Y", "F")
+        assert best_ranked.total_cost == 2.0  # noqa: PLR2004
+
+
+class TestScoreConnections:
+    """Tests for per-model path scores."""
+
+    @pytest.fixture
+    def search(self):
+        """Search S → F with the strongest link S → F and a detour via X."""
+        similarity_map = make_similarity_map(
+            {"S": [("F", 10.0), ("X", 5.0)], "X": [("F", 5.0)]}
+        )
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        ranks = build_rank_lookup(graph, similarity_map, artist_to_idx)
+
+        def run(model):
+            model_graph = graph.copy()
+            model_graph.data = edge_costs(model, strengths, ranks)
+            return find_optimal_paths(
+                model_graph,
+                artist_to_idx,
+                idx_to_artist,
+                ["S"],
+                ["F"],
+                strengths,
+                make_events(["S"]),
+            )
+
+        return run
+
+    def test_log_scores_strongest_link(self, search):
+        """A path over the strongest link scores its normalized strength, not 1e6."""
+        (group,) = score_connections(search("log"), "log")
+
+        assert [tuple(path.path) for path in group.paths] == [
+            ("S", "F"),
+            ("S", "X", "F"),
+        ]
+        np.testing.assert_allclose(
+            [path.path_score for path in group.paths], [1.0, 0.25], rtol=1e-5
+        )
+        assert group.best_path_score == group.paths[0].path_score
+
+    def test_other_models_keep_reciprocal_scores(self, search):
+        """Models without their own score keep 1/total_cost."""
+        grouped = search("reciprocal")
+
+        assert score_connections(grouped, "reciprocal") is grouped
+        assert grouped[0].paths[0].path_score == 1.0 / grouped[0].paths[0].total_cost
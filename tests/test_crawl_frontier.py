@@ -0,0 +1,239 @@
+"""Tests for the best-first crawl frontier."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from src import crawl_frontier as crawl_frontier_module
+from src import music_map_crawler
+from src.artist_connection_search import build_sparse_graph
+from src.crawl_frontier import (
+    UNKNOWN_COST_ESTIMATE,
+    FrontierGraph,
+    crawl_frontier,
+    frontier_priorities,
+)
+from src.data_loader import parse_similar_artists_map
+from src.music_map_scraper import PageFetch, ScraperResult, SimilarArtist
+
+# Symmetric music-map: E reaches favorite F only through A and B, and
+# both have weakly linked distractors
+WORLD = {
+    "E": {"A": 10.0, **{f"D{i}": 1.0 for i in range(8)}},
+    "A": {"E": 10.0, "B": 10.0},
+    "B": {"A": 10.0, "F": 10.0},
+    "F": {"B": 10.0, **{f"G{i}": 1.0 for i in range(8)}},
+}
+
+
+def scraped(similar):
+    """Successful result listing similar artists with their strengths."""
+    return ScraperResult(
+        status="success",
+        similar_artists=[
+            SimilarArtist(name=name, rank=rank, relationship_strength=strength)
+            for rank, (name, strength) in enumerate(similar.items(), 1)
+        ],
+    )
+
+
+def serve_world(monkeypatch):
+    """Answer page fetches from WORLD and record the artists requested."""
+    requested = []
+
+    def fetch(artist_name, _session):
+        requested.append(artist_name)
+        similar = WORLD.get(artist_name, {})
+        links = "".join(f'<a class="S">{name}</a>' for name in similar)
+        strengths = ",".join(str(s) for s in similar.values())
+        html = (
+            f'<a class="S">{artist_name}</a>{links}'
+            f"<script>Aid[0]=new Array(-1,{strengths});</script>"
+        )
+        return PageFetch(html=html, status=200, elapsed=0.01)
+
+    monkeypatch.setattr(music_map_crawler, "fetch_page", fetch)
+    return requested
+
+
+def named_edges(graph, names):
+    """Edges of a cost graph as {(tail name, head name): cost}."""
+    coo = graph.tocoo()
+    return {
+        (names[row], names[col]): cost
+        for row, col, cost in zip(
+            coo.row.tolist(), coo.col.tolist(), coo.data.tolist(), strict=True
+        )
+    }
+
+
+def random_results(seed, n=40):
+    """Scrape results over a random map, some with neighbor links or errors."""
+    rng = np.random.default_rng(seed)
+    names = [f"A{i}" for i in range(n)]
+    results = {}
+    for name in names:
+        if rng.random() < 0.1:  # noqa: PLR2004
+            results[name] = ScraperResult(status="error", error="timeout")
+            continue
+        similar = rng.choice(names, 4, replace=False).tolist()
+        # A repeated listing: the first one counts
+        similar.append(similar[0])
+        neighbor_links = {
+            neighbor: {
+                target: float(rng.uniform(1, 10))
+                for target in rng.choice(names, 2, replace=False).tolist()
+            }
+            for neighbor in rng.choice(names, 2, replace=False).tolist()
+        }
+        results[name] = ScraperResult(
+            status="success",
+            similar_artists=[
+                SimilarArtist(
+                    name=sim, rank=rank, relationship_strength=float(rng.uniform(1, 10))
+                )
+                for rank, sim in enumerate(similar, 1)
+            ],
+            neighbor_links=neighbor_links,
+        )
+    return results
+
+
+class TestFrontierGraph:
+    """Tests for the incrementally updated crawl graph."""
+
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_updates_match_full_rebuild(self, seed):
+        """Round by round, the graph equals one built from all results."""
+        results = random_results(seed)
+        graph = FrontierGraph()
+        seen = {}
+        artists = list(results)
+
+        for start in range(0, len(artists), 7):
+            found = {artist: results[artist] for artist in artists[start : start + 7]}
+            seen.update(found)
+            graph.update(found)
+
+            expected, _, idx_to_artist = build_sparse_graph(
+                parse_similar_artists_map(
+                    {artist: result.to_dict() for artist, result in seen.items()}
+                )
+            )
+            assert named_edges(graph.graph, graph.names) == pytest.approx(
+                named_edges(expected, idx_to_artist)
+            )
+
+
+class TestFrontierPriorities:
+    """Tests for ranking unscraped artists."""
+
+    def test_path_cost_estimates(self):
+        """Priorities add the known costs from events and to favorites."""
+        results = {
+            "E": scraped({"X": 10.0, "Y": 1.0}),
+            "F": scraped({"X": 5.0, "Z": 5.0}),
+        }
+
+        priorities = frontier_priorities(results, ["E"], ["F"])
+
+        assert priorities == pytest.approx(
+            {
+                "X": 1 / 10 + 1 / 5,
+                "Z": UNKNOWN_COST_ESTIMATE + 1 / 5,
+                # Undirected, Y reaches F through E and X
+                "Y": 1.0 + (1.0 + 1 / 10 + 1 / 5),
+            }
+        )
+
+    def test_connected_event_artists_ignored(self):
+        """Only event artists without a path to a favorite pull the crawl."""
+        results = {
+            "E": scraped({"X": 10.0}),
+            "E2": scraped({"F": 10.0, "W": 10.0}),
+            "F": scraped({}),
+        }
+
+        priorities = frontier_priorities(results, ["E", "E2"], ["F"])
+
+        assert priorities["X"] == pytest.approx(1 / 10 + UNKNOWN_COST_ESTIMATE)
+        assert priorities["W"] == pytest.approx(UNKNOWN_COST_ESTIMATE + 2 / 10)
+
+    def test_nothing_to_expand(self):
+        """With every listed artist scraped the frontier is empty."""
+        results = {"E": scraped({"F": 1.0}), "F": scraped({"E": 1.0})}
+
+        assert frontier_priorities(results, ["E"], ["F"]) == {}
+
+
+class TestCrawlFrontier:
+    """Tests for the budgeted frontier crawl."""
+
+    def test_bridges_first(self, monkeypatch):
+        """After the seeds, the crawl scrapes the artists linking E to F."""
+        requested = serve_world(monkeypatch)
+        results = {}
+
+        count = asyncio.run(
+            crawl_frontier(
+                results,
+                ["E"],
+                ["F"],
+                max_artists=4,
+                batch_size=2,
+                requests_per_second=1000.0,
+            )
+        )
+
+        assert count == 4  # noqa: PLR2004
+        assert sorted(requested[:2]) == ["E", "F"]
+        assert sorted(requested[2:]) == ["A", "B"]
+        assert set(results) == {"E", "F", "A", "B"}
+
+    def test_rounds_grow_when_reprioritizing_is_slow(self, monkeypatch):
+        """Rounds take more artists when reprioritizing dominates a round."""
+        serve_world(monkeypatch)
+        monkeypatch.setattr(crawl_frontier_module, "MAX_REPRIORITIZE_SHARE", 1e-9)
+        rounds = []
+        crawl = crawl_frontier_module.crawl_artists
+
+        async def record_round(artists, **kwargs):
+            rounds.append(len(artists))
+            return await crawl(artists, **kwargs)
+
+        monkeypatch.setattr(crawl_frontier_module, "crawl_artists", record_round)
+
+        asyncio.run(
+            crawl_frontier(
+                {},
+                ["E"],
+                ["F"],
+                max_artists=10,
+                batch_size=1,
+                requests_per_second=1000.0,
+            )
+        )
+
+        assert rounds == [2, 8]
+
+    def test_request_budget(self, monkeypatch):
+        """The crawl stops once the request budget is spent."""
+        requested = serve_world(monkeypatch)
+        results = {"E": scraped(WORLD["E"])}
+        seen = []
+
+        count = asyncio.run(
+            crawl_frontier(
+                results,
+                ["E"],
+                ["F"],
+                max_requests=2,
+                requests_per_second=1000.0,
+                on_result=lambda artist, _result: seen.append(artist),
+            )
+        )
+
+        assert count == 2  # noqa: PLR2004
+        assert requested == seen
+        assert requested[0] == "F"
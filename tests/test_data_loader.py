@@ -0,0 +1,63 @@
+"""Tests for loading the similarity map."""
+
+import json
+
+from src.artist_connection_search import build_sparse_graph
+from src.data_loader import load_similar_artists_map
+
+
+def scraped(similar, neighbor_links=None):
+    """A successful scraper entry."""
+    entry = {
+        "status": "success",
+        "similar_artists": [
+            {"name": name, "rank": rank, "relationship_strength": strength}
+            for rank, (name, strength) in enumerate(similar.items(), 1)
+        ],
+    }
+    if neighbor_links:
+        entry["neighbor_links"] = neighbor_links
+    return entry
+
+
+class TestNeighborLinks:
+    """Tests for the links read from other artists' Aid matrices."""
+
+    def test_links_reach_the_graph(self, tmp_path):
+        """Artists without a page get links from their neighbors' pages."""
+        raw = {
+            "Q": scraped(
+                {"A": 9.5, "B": 4.0},
+                {"A": {"Q": 9.5, "B": 6.0}, "B": {"A": 6.0}},
+            ),
+            "P": scraped({"B": 2.0}, {"B": {"A": 7.0, "P": 2.0}}),
+            "Gone": {"status": "error", "error": "Failed to fetch page"},
+        }
+        map_file = tmp_path / "map.json"
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+
+        similarity_map = load_similar_artists_map(map_file)
+        graph, artist_to_idx, _ = build_sparse_graph(similarity_map)
+
+        assert set(similarity_map) == {"Q", "P", "A", "B"}
+        # The strongest value seen for a pair wins, ranked by strength
+        assert [
+            (s.name, s.rank, s.relationship_strength)
+            for s in similarity_map["B"].similar_artists
+        ] == [("A", 1, 7.0), ("P", 2, 2.0)]
+        assert graph[artist_to_idx["A"], artist_to_idx["B"]] == 1 / 6.0
+        assert graph[artist_to_idx["B"], artist_to_idx["A"]] == 1 / 7.0
+
+    def test_own_page_wins(self, tmp_path):
+        """A scraped artist keeps its own links, not its neighbors' view."""
+        raw = {
+            "Q": scraped({"A": 9.5}, {"A": {"Q": 9.5, "Z": 8.0}}),
+            "A": scraped({"Q": 3.0}),
+        }
+        map_file = tmp_path / "map.json"
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+
+        similarity_map = load_similar_artists_map(map_file)
+
+        assert [s.name for s in similarity_map["A"].similar_artists] == ["Q"]
+        assert "Z" not in similarity_map
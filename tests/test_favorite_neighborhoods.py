@@ -0,0 +1,170 @@
+"""Tests for the precomputed k-hop neighborhoods of the favorites."""
+
+import numpy as np
+import pytest
+
+from src import favorite_neighborhoods
+from src.artist_connection_search import (
+    build_sparse_graph,
+    build_strength_lookup,
+    classify_tier,
+    find_optimal_paths,
+)
+from src.favorite_neighborhoods import (
+    build_neighborhoods,
+    find_connections_from_neighborhoods,
+    load_neighborhoods,
+    neighborhood_matches,
+)
+from src.graph_cache import load_compiled_graph
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+    make_similarity_map,
+)
+from tests.test_landmark_index import write_map_file
+
+FAVORITES = [f"A{i}" for i in range(20, 30)]
+SOURCES = [f"A{i}" for i in range(8)]
+
+# S → F directly is weak; S → X → F costs less but takes two hops, and
+# S → X → Y → F is cheaper still at three hops
+EDGES = {
+    "S": [("F", 1.0), ("X", 8.0)],
+    "X": [("F", 2.0), ("Y", 9.0)],
+    "Y": [("F", 9.0)],
+    "Far": [("S", 9.0)],
+}
+
+
+def build(similarity_map):
+    """Graph, names and strengths for a similarity map."""
+    graph, artist_to_idx, _ = build_sparse_graph(similarity_map)
+    names = sorted(artist_to_idx, key=artist_to_idx.__getitem__)
+    return graph, names, build_strength_lookup(graph, similarity_map, artist_to_idx)
+
+
+class TestBuildNeighborhoods:
+    """Tests for the sparse min-plus relaxation."""
+
+    @pytest.mark.parametrize(
+        ("max_hops", "hops", "cost"),
+        [(1, 1, 1.0), (2, 2, 1 / 8 + 1 / 2), (3, 3, 1 / 8 + 1 / 9 + 1 / 9)],
+    )
+    def test_cheapest_path_within_hop_bound(self, max_hops, hops, cost):
+        """Each bound keeps the cheapest path with at most that many links."""
+        graph, names, strengths = build(make_similarity_map(EDGES))
+
+        neighborhoods = build_neighborhoods(graph, strengths, names, ["F"], max_hops)
+
+        (match,) = neighborhood_matches(neighborhoods, dict_of(names), ["S"])
+        assert (match.event_artist, match.favorite_artist) == ("S", "F")
+        assert match.hops == hops
+        assert match.total_cost == pytest.approx(cost)
+
+    def test_hop_bound_limits_reach(self):
+        """Artists further than max_hops links from every favorite are absent."""
+        graph, names, strengths = build(make_similarity_map(EDGES))
+
+        near = build_neighborhoods(graph, strengths, names, ["F"], 1)
+        wider = build_neighborhoods(graph, strengths, names, ["F"], 2)
+
+        assert neighborhood_matches(near, dict_of(names), ["Far"]) == []
+        (match,) = neighborhood_matches(wider, dict_of(names), ["Far"])
+        assert match.hops == 2  # noqa: PLR2004
+
+    def test_match_strength_and_tier(self):
+        """Matches carry the path's average strength and its tier."""
+        graph, names, strengths = build(make_similarity_map(EDGES))
+        neighborhoods = build_neighborhoods(graph, strengths, names, ["F"], 2)
+
+        (match,) = neighborhood_matches(neighborhoods, dict_of(names), ["S"])
+
+        assert match.avg_strength == pytest.approx((8.0 + 2.0) / 2)
+        assert match.tier == classify_tier(5.0)
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_hop_limited_search(self, seed):
+        """Pairs, costs and paths agree with find_optimal_paths(max_hops=...)."""
+        similarity_map = make_random_map(seed, n=40, degree=3)
+        graph, names, strengths = build(similarity_map)
+        artist_to_idx = dict_of(names)
+        args = (graph, artist_to_idx, dict(enumerate(names)), SOURCES)
+        kwargs = {
+            "target_artists": FAVORITES,
+            "strengths": strengths,
+            "events": make_events(SOURCES),
+        }
+        neighborhoods = build_neighborhoods(graph, strengths, names, FAVORITES, 3)
+
+        expected = find_optimal_paths(*args, **kwargs, max_paths_per_pair=1, max_hops=3)
+        found = find_connections_from_neighborhoods(neighborhoods, *args, **kwargs)
+        matches = neighborhood_matches(neighborhoods, artist_to_idx, SOURCES)
+
+        assert summary(found) == summary(expected)
+        assert sorted(
+            (m.event_artist, m.favorite_artist, round(m.total_cost, 9)) for m in matches
+        ) == sorted(
+            (g.event_artist, g.favorite_artist, round(g.paths[0].total_cost, 9))
+            for g in expected
+        )
+        tiers = {(g.event_artist, g.favorite_artist): g.paths[0].tier for g in found}
+        assert all(
+            m.tier == tiers[(m.event_artist, m.favorite_artist)] for m in matches
+        )
+
+
+class TestNeighborhoodCache:
+    """Tests for the neighborhoods cached with a compiled graph."""
+
+    def test_cached_per_favorites_and_hops(self, tmp_path, monkeypatch):
+        """Neighborhoods are built once per favorites and bound, then reused."""
+        map_file = write_map_file(tmp_path / "map.json", make_random_map(0, n=30))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        first = load_neighborhoods(compiled, FAVORITES, 2)
+        wider = load_neighborhoods(compiled, FAVORITES, 3)
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("neighborhoods should come from the cache")
+
+        monkeypatch.setattr(favorite_neighborhoods, "build_neighborhoods", fail)
+        again = load_neighborhoods(compiled, list(reversed(FAVORITES)), 2)
+
+        assert isinstance(again.hops, np.memmap)
+        assert wider.costs.nnz >= first.costs.nnz
+        assert (again.costs != first.costs).nnz == 0
+        np.testing.assert_array_equal(again.avg_strengths, first.avg_strengths)
+        sources = [f"A{i}" for i in range(5)]
+        args = (
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            sources,
+        )
+        kwargs = {
+            "target_artists": FAVORITES,
+            "strengths": compiled.strengths,
+            "events": make_events(sources),
+        }
+        assert summary(
+            find_connections_from_neighborhoods(again, *args, **kwargs)
+        ) == summary(find_connections_from_neighborhoods(first, *args, **kwargs))
+
+
+def dict_of(names):
+    """Map each name to its index."""
+    return {name: idx for idx, name in enumerate(names)}
+
+
+def summary(grouped):
+    """Pairs with their best path and cost."""
+    return [
+        (
+            group.event_artist,
+            group.favorite_artist,
+            tuple(group.paths[0].path),
+            round(group.paths[0].total_cost, 9),
+        )
+        for group in grouped
+    ]
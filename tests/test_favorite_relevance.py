@@ -0,0 +1,109 @@
+"""Tests for personalized PageRank relevance scores."""
+
+import numpy as np
+import pytest
+
+from src import favorite_relevance
+from src.artist_connection_search import build_sparse_graph, build_strength_lookup
+from src.favorite_relevance import (
+    load_favorite_scores,
+    personalized_pagerank,
+    rank_artists,
+)
+from src.graph_cache import load_compiled_graph
+from tests.test_artist_connection_search import RANDOM_GRAPH_SEEDS, make_random_map
+from tests.test_landmark_index import write_map_file
+
+DAMPING = 0.85
+
+
+def dense_pagerank(graph, strengths, seeds, damping):
+    """Solve the PageRank equations directly with dense linear algebra."""
+    n = graph.shape[0]
+    weights = graph.copy()
+    weights.data = np.asarray(strengths, dtype=float)
+    transition = weights.toarray()
+    restart = np.zeros(n)
+    restart[seeds] = 1.0 / len(seeds)
+
+    out_strength = transition.sum(axis=1)
+    dangling = out_strength == 0
+    transition[~dangling] /= out_strength[~dangling, np.newaxis]
+    transition[dangling] = restart
+
+    return np.linalg.solve(
+        np.eye(n) - damping * transition.T, (1.0 - damping) * restart
+    )
+
+
+def make_graph(seed, n=30):
+    """Random similarity graph with its strengths."""
+    similarity_map = make_random_map(seed, n=n, degree=3)
+    graph, artist_to_idx, _ = build_sparse_graph(similarity_map)
+    strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+    return graph, strengths
+
+
+class TestPersonalizedPagerank:
+    """Tests for the power iteration."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_linear_solve(self, seed):
+        """Power iteration converges to the exact PageRank vector."""
+        graph, strengths = make_graph(seed)
+        seeds = [0, 3, 7]
+
+        scores = personalized_pagerank(graph, strengths, seeds, damping=DAMPING)
+
+        np.testing.assert_allclose(
+            scores, dense_pagerank(graph, strengths, seeds, DAMPING), atol=1e-9
+        )
+        assert scores.sum() == pytest.approx(1.0)
+
+    def test_iteration_cap(self):
+        """Without convergence the scores after max_iterations are returned."""
+        graph, strengths = make_graph(0)
+
+        scores = personalized_pagerank(graph, strengths, [0], max_iterations=1)
+
+        assert scores.sum() == pytest.approx(1.0)
+        assert not np.allclose(scores, dense_pagerank(graph, strengths, [0], DAMPING))
+
+    def test_no_seeds(self):
+        """Without seeds every score is zero."""
+        graph, strengths = make_graph(0)
+
+        assert not personalized_pagerank(graph, strengths, []).any()
+
+
+class TestFavoriteScores:
+    """Tests for cached favorite scores."""
+
+    def test_cached_per_favorites(self, tmp_path, monkeypatch):
+        """Scores are computed once per favorites list and then reused."""
+        compiled = load_compiled_graph(
+            write_map_file(tmp_path / "map.json", make_random_map(0)),
+            tmp_path / "cache",
+        )
+        favorites = ["A1", "A5", "Not In Graph"]
+        first = load_favorite_scores(compiled, favorites)
+        other = load_favorite_scores(compiled, ["A2"])
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("scores should come from the cache")
+
+        monkeypatch.setattr(favorite_relevance, "personalized_pagerank", fail)
+        again = load_favorite_scores(compiled, list(reversed(favorites)))
+
+        np.testing.assert_array_equal(first, again)
+        assert not np.array_equal(first, other)
+
+    def test_rank_artists(self):
+        """Artists are ordered by score, unknown artists last."""
+        scores = np.array([0.1, 0.5, 0.4])
+        artist_to_idx = {"A": 0, "B": 1, "C": 2}
+
+        ranked = rank_artists(scores, artist_to_idx, ["A", "C", "Z", "B", "C"])
+
+        assert [artist for artist, _ in ranked] == ["B", "C", "A", "Z"]
+        assert ranked[-1][1] == 0.0
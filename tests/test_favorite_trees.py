@@ -0,0 +1,227 @@
+"""Tests for the favorite-rooted shortest path tree cache."""
+
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from src import favorite_trees
+from src.artist_connection_search import find_optimal_paths
+from src.favorite_trees import find_connections_from_trees, load_favorite_trees
+from src.graph_cache import load_compiled_graph
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+    make_similarity_map,
+)
+from tests.test_landmark_index import write_map_file
+
+FAVORITES = [f"A{i}" for i in range(20, 30)]
+
+
+def random_edges(seed: int, n: int = 30, degree: int = 4):
+    """Random similarity lists as editable (name, strength) tuples."""
+    return {
+        artist: [(sim.name, sim.relationship_strength) for sim in data.similar_artists]
+        for artist, data in make_random_map(seed, n=n, degree=degree).items()
+    }
+
+
+def assert_trees_exact(trees, compiled):
+    """Tree distances equal a fresh Dijkstra on the compiled graph."""
+    roots = [compiled.artist_to_idx[name] for name in trees.favorites]
+    expected = dijkstra(compiled.reverse_graph, indices=roots)
+    np.testing.assert_allclose(trees.distances, expected, rtol=1e-5)
+
+
+class TestFindConnectionsFromTrees:
+    """Tests for answering connections by tree lookups."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_find_optimal_paths(self, seed, tmp_path):
+        """Best paths agree with the Dijkstra search."""
+        map_file = write_map_file(
+            tmp_path / "map.json", make_random_map(seed, n=30, degree=4)
+        )
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        trees = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+        sources = [f"A{i}" for i in range(5)]
+        args = (
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            sources,
+        )
+        kwargs = {
+            "target_artists": FAVORITES,
+            "strengths": compiled.strengths,
+            "events": make_events(sources),
+        }
+
+        expected = find_optimal_paths(*args, **kwargs, max_paths_per_pair=1)
+        found = find_connections_from_trees(trees, *args, **kwargs)
+
+        assert [(g.event_artist, g.favorite_artist) for g in found] == [
+            (g.event_artist, g.favorite_artist) for g in expected
+        ]
+        for got, want in zip(found, expected, strict=True):
+            assert got.paths[0].path == want.paths[0].path
+
+    def test_max_cost_filters_pairs(self, tmp_path):
+        """Pairs costlier than max_cost are dropped."""
+        map_file = write_map_file(
+            tmp_path / "map.json", make_random_map(0, n=30, degree=4)
+        )
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        trees = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+        sources = [f"A{i}" for i in range(5)]
+        args = (
+            trees,
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            sources,
+        )
+        kwargs = {
+            "target_artists": FAVORITES,
+            "strengths": compiled.strengths,
+            "events": make_events(sources),
+        }
+        costs = [
+            g.paths[0].total_cost for g in find_connections_from_trees(*args, **kwargs)
+        ]
+        max_cost = float(np.median(costs))
+
+        bounded = find_connections_from_trees(*args, **kwargs, max_cost=max_cost)
+
+        assert len(bounded) == sum(cost <= max_cost for cost in costs)
+        assert all(g.paths[0].total_cost <= max_cost + 1e-9 for g in bounded)
+
+    def test_max_cost_at_a_path_cost(self, tmp_path):
+        """A path costing exactly max_cost is kept, and dropped just below it."""
+        map_file = write_map_file(
+            tmp_path / "map.json", make_random_map(0, n=30, degree=4)
+        )
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        trees = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+        sources = [f"A{i}" for i in range(5)]
+        args = (
+            trees,
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            sources,
+        )
+        kwargs = {
+            "target_artists": FAVORITES,
+            "strengths": compiled.strengths,
+            "events": make_events(sources),
+        }
+        everything = find_connections_from_trees(*args, **kwargs)
+
+        for group in everything:
+            pair = (group.event_artist, group.favorite_artist)
+            cost = group.paths[0].total_cost
+            for max_cost, kept in ((cost, True), (np.nextafter(cost, 0), False)):
+                bounded = find_connections_from_trees(
+                    *args, **kwargs, max_cost=float(max_cost)
+                )
+
+                pairs = {(g.event_artist, g.favorite_artist) for g in bounded}
+                assert (pair in pairs) == kept
+                assert all(g.paths[0].total_cost <= max_cost for g in bounded)
+
+
+class TestFavoriteTreeCache:
+    """Tests for reusing and refreshing the cached trees."""
+
+    def test_reused_for_same_map(self, tmp_path, monkeypatch):
+        """An unchanged map and favorites reuse the memory-mapped trees."""
+        map_file = write_map_file(tmp_path / "map.json", make_random_map(0, n=30))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        first = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("trees should come from the cache")
+
+        monkeypatch.setattr(favorite_trees, "compute_trees", fail)
+        again = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+
+        assert isinstance(again.predecessors, np.memmap)
+        np.testing.assert_array_equal(first.distances, again.distances)
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_added_links_are_repaired_without_rebuild(
+        self, seed, tmp_path, monkeypatch
+    ):
+        """Newly scraped artists and stronger links are patched into the trees."""
+        edges = random_edges(seed)
+        map_file = write_map_file(tmp_path / "map.json", make_similarity_map(edges))
+        load_favorite_trees(
+            load_compiled_graph(map_file, tmp_path / "cache"),
+            FAVORITES,
+            tmp_path / "trees",
+        )
+
+        edges["New0"] = [("A21", 9.5), ("New1", 3.0)]
+        edges["A3"] = [*edges["A3"], ("New0", 8.0)]
+        name, strength = edges["A7"][0]
+        edges["A7"][0] = (name, strength * 4)
+        write_map_file(map_file, make_similarity_map(edges))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("no tree should be rebuilt")
+
+        monkeypatch.setattr(favorite_trees, "compute_trees", fail)
+        trees = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+
+        assert_trees_exact(trees, compiled)
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_only_favorites_using_dropped_links_rebuilt(
+        self, seed, tmp_path, monkeypatch
+    ):
+        """Dropping a link rebuilds exactly the trees that relied on it."""
+        edges = random_edges(seed)
+        map_file = write_map_file(tmp_path / "map.json", make_similarity_map(edges))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        before = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+
+        tail, head = "A2", edges["A2"][0][0]
+        tail_idx = compiled.artist_to_idx[tail]
+        head_idx = compiled.artist_to_idx[head]
+        expected = {
+            name
+            for row, name in enumerate(before.favorites)
+            if before.predecessors[row, tail_idx] == head_idx
+        }
+        edges["A2"] = edges["A2"][1:]
+        write_map_file(map_file, make_similarity_map(edges))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+
+        rebuilt = []
+        compute_trees = favorite_trees.compute_trees
+
+        def record(reverse_graph, roots, memory_budget_bytes=None):
+            rebuilt.extend(compiled.names[root] for root in roots)
+            return compute_trees(reverse_graph, roots, memory_budget_bytes)
+
+        monkeypatch.setattr(favorite_trees, "compute_trees", record)
+        trees = load_favorite_trees(compiled, FAVORITES, tmp_path / "trees")
+
+        assert set(rebuilt) == expected
+        assert_trees_exact(trees, compiled)
+
+    def test_new_favorites_are_built(self, tmp_path):
+        """Trees follow changes to the favorites list."""
+        map_file = write_map_file(tmp_path / "map.json", make_random_map(0, n=30))
+        compiled = load_compiled_graph(map_file, tmp_path / "cache")
+        load_favorite_trees(compiled, FAVORITES[:5], tmp_path / "trees")
+
+        trees = load_favorite_trees(
+            compiled, [*FAVORITES[3:], "Unknown"], tmp_path / "trees"
+        )
+
+        assert trees.favorites == sorted(FAVORITES[3:])
+        assert_trees_exact(trees, compiled)
@@ -0,0 +1,222 @@
+"""Tests for the compiled graph cache."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src import graph_cache
+from src.artist_connection_search import (
+    EdgeSparsification,
+    build_rank_lookup,
+    build_sparse_graph,
+    build_strength_lookup,
+)
+from src.data_loader import load_similar_artists_map
+from src.graph_cache import load_compiled_graph
+
+RAW_MAP = {
+    "Alpha": {
+        "status": "success",
+        "similar_artists": [
+            {"name": "Beta", "rank": 1, "relationship_strength": 9.5},
+            {"name": "Gamma", "rank": 2, "relationship_strength": 3.25},
+            {"name": "Zero", "rank": 3, "relationship_strength": 0},
+        ],
+    },
+    "Beta": {
+        "status": "success",
+        "similar_artists": [
+            {"name": "Gamma", "rank": 1, "relationship_strength": 7.0},
+            {"name": "Ünïcode Åcts", "rank": 2, "relationship_strength": 1.5},
+        ],
+    },
+    "Broken": {"status": "error", "error": "Failed to fetch page"},
+}
+
+
+@pytest.fixture
+def map_file(tmp_path):
+    """Write the raw similarity map to disk."""
+    path = tmp_path / "similar_artists_map.json"
+    path.write_text(json.dumps(RAW_MAP), encoding="utf-8")
+    return path
+
+
+def test_matches_in_memory_build(map_file, tmp_path):
+    """Compiled graph equals the graph built from the parsed JSON."""
+    compiled = load_compiled_graph(map_file, tmp_path / "cache")
+
+    similarity_map = load_similar_artists_map(map_file)
+    graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+
+    assert compiled.artist_to_idx == artist_to_idx
+    assert compiled.idx_to_artist == idx_to_artist
+    assert (compiled.graph != graph).nnz == 0
+    assert (compiled.reverse_graph != graph.T).nnz == 0
+    np.testing.assert_array_equal(
+        compiled.strengths,
+        build_strength_lookup(graph, similarity_map, artist_to_idx),
+    )
+    np.testing.assert_array_equal(
+        compiled.ranks, build_rank_lookup(graph, similarity_map, artist_to_idx)
+    )
+    assert not compiled.graph.data.flags.writeable
+
+
+def test_reuses_cache_until_source_changes(map_file, tmp_path, monkeypatch):
+    """Unchanged maps skip compilation; edited maps are recompiled."""
+    cache_dir = tmp_path / "cache"
+    first = load_compiled_graph(map_file, cache_dir)
+
+    def fail_compile(*_args, **_kwargs):
+        raise AssertionError("cache should have been reused")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(graph_cache, "compile_graph", fail_compile)
+        again = load_compiled_graph(map_file, cache_dir)
+    assert again.cache_dir == first.cache_dir
+
+    raw = dict(RAW_MAP)
+    raw["Gamma"] = {
+        "status": "success",
+        "similar_artists": [{"name": "Alpha", "rank": 1, "relationship_strength": 4.0}],
+    }
+    map_file.write_text(json.dumps(raw), encoding="utf-8")
+
+    updated = load_compiled_graph(map_file, cache_dir)
+    assert updated.source_hash != first.source_hash
+    assert updated.graph.nnz == first.graph.nnz + 1
+    assert not first.cache_dir.exists()
+
+
+def raw_random_map(seed: int, n: int = 50, degree: int = 5) -> dict:
+    """Raw similarity map with random distinct-strength links."""
+    rng = np.random.default_rng(seed)
+    names = [f"Artist {i:02d}" for i in range(n)]
+    return {
+        name: {
+            "status": "success",
+            "similar_artists": [
+                {
+                    "name": names[other],
+                    "rank": rank,
+                    "relationship_strength": round(float(rng.uniform(0.5, 10)), 4),
+                }
+                for rank, other in enumerate(
+                    rng.choice([j for j in range(n) if j != i], degree, replace=False),
+                    1,
+                )
+            ],
+        }
+        for i, name in enumerate(names)
+    }
+
+
+def assert_matches_build(compiled, map_file):
+    """Compiled graph equals an in-memory build with the same node order."""
+    similarity_map = load_similar_artists_map(map_file)
+    graph, artist_to_idx, _ = build_sparse_graph(similarity_map, names=compiled.names)
+    assert compiled.artist_to_idx == artist_to_idx
+    assert (compiled.graph != graph).nnz == 0
+    assert (compiled.reverse_graph != graph.T).nnz == 0
+    np.testing.assert_array_equal(
+        compiled.strengths,
+        build_strength_lookup(graph, similarity_map, artist_to_idx),
+    )
+    np.testing.assert_array_equal(
+        compiled.ranks, build_rank_lookup(graph, similarity_map, artist_to_idx)
+    )
+    assert compiled.graph.has_sorted_indices
+    assert compiled.reverse_graph.has_sorted_indices
+
+
+class TestAppendOnlyGraph:
+    """Tests for stable node ids and the delta segment."""
+
+    def test_scraper_appends_keep_node_ids(self, tmp_path):
+        """New artists get new ids after all existing ones."""
+        raw = raw_random_map(0)
+        map_file = tmp_path / "map.json"
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        first = load_compiled_graph(map_file, tmp_path / "cache")
+
+        raw["Aardvark"] = {
+            "status": "success",
+            "similar_artists": [
+                {"name": "Artist 03", "rank": 1, "relationship_strength": 5.0},
+                {"name": "Newcomer", "rank": 2, "relationship_strength": 2.0},
+            ],
+        }
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        updated = load_compiled_graph(map_file, tmp_path / "cache")
+
+        assert updated.names[: len(first.names)] == first.names
+        assert updated.names[len(first.names) :] == ["Aardvark", "Newcomer"]
+        assert_matches_build(updated, map_file)
+
+    def test_small_changes_go_to_delta(self, tmp_path):
+        """Changed rows are stored as a delta next to the shared base."""
+        raw = raw_random_map(1)
+        map_file = tmp_path / "map.json"
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        first = load_compiled_graph(map_file, tmp_path / "cache")
+        base_inode = (first.cache_dir / "indices.npy").stat().st_ino
+
+        changed = ["Artist 07", "Artist 09", "Artist 12", "Zed"]
+        raw["Artist 07"]["similar_artists"][0]["relationship_strength"] = 0.25
+        # A re-ranked list changes only ranks
+        first_sim, second_sim = raw["Artist 12"]["similar_artists"][:2]
+        first_sim["rank"], second_sim["rank"] = second_sim["rank"], first_sim["rank"]
+        raw["Artist 09"] = {"status": "error", "error": "Failed to fetch page"}
+        raw["Zed"] = {
+            "status": "success",
+            "similar_artists": [
+                {"name": "Artist 01", "rank": 1, "relationship_strength": 3.0}
+            ],
+        }
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        updated = load_compiled_graph(map_file, tmp_path / "cache")
+
+        meta = json.loads((updated.cache_dir / "meta.json").read_text())
+        assert meta["n_delta_rows"] == len(changed)
+        assert (updated.cache_dir / "indices.npy").stat().st_ino == base_inode
+        assert not updated.graph.data.flags.writeable
+        assert_matches_build(updated, map_file)
+
+    def test_large_delta_is_merged(self, tmp_path, monkeypatch):
+        """A delta past the merge fraction is folded into a new base."""
+        raw = raw_random_map(2)
+        map_file = tmp_path / "map.json"
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        load_compiled_graph(map_file, tmp_path / "cache")
+
+        monkeypatch.setattr(graph_cache, "DELTA_MERGE_FRACTION", 0.0)
+        raw["Zed"] = {
+            "status": "success",
+            "similar_artists": [
+                {"name": "Artist 01", "rank": 1, "relationship_strength": 3.0}
+            ],
+        }
+        map_file.write_text(json.dumps(raw), encoding="utf-8")
+        updated = load_compiled_graph(map_file, tmp_path / "cache")
+
+        meta = json.loads((updated.cache_dir / "meta.json").read_text())
+        assert meta["n_delta_rows"] == 0
+        assert meta["n_base_nodes"] == len(updated.names)
+        assert_matches_build(updated, map_file)
+
+
+def test_sparsification_recorded_and_keyed(map_file, tmp_path):
+    """The sparsification is stored in the metadata and part of the cache key."""
+    cache_dir = tmp_path / "cache"
+    full = load_compiled_graph(map_file, cache_dir)
+    sparsification = EdgeSparsification(max_edges_per_artist=1)
+
+    sparse = load_compiled_graph(map_file, cache_dir, sparsification=sparsification)
+
+    meta = json.loads((sparse.cache_dir / "meta.json").read_text())
+    assert meta["sparsification"] == {"max_edges_per_artist": 1, "min_strength": None}
+    assert sparse.sparsification == sparsification
+    assert sparse.graph.nnz < full.graph.nnz
+    assert load_compiled_graph(map_file, cache_dir).graph.nnz == full.graph.nnz
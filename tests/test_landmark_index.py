@@ -0,0 +1,158 @@
+"""Tests for the landmark index and point-to-point connection queries."""
+
+import json
+from itertools import pairwise
+
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from src.artist_connection_search import build_sparse_graph, find_optimal_paths
+from src.connection_query import ConnectionQuery
+from src.graph_cache import load_compiled_graph
+from src.landmark_index import (
+    alt_shortest_path,
+    build_landmark_index,
+    load_landmark_index,
+)
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+)
+
+LANDMARK_COUNT = 4
+
+
+def write_map_file(path, similarity_map):
+    """Write a similarity map in the scraper's JSON format."""
+    raw = {
+        artist: {
+            "status": "success",
+            "similar_artists": [
+                {
+                    "name": sim.name,
+                    "rank": sim.rank,
+                    "relationship_strength": sim.relationship_strength,
+                }
+                for sim in data.similar_artists
+            ],
+        }
+        for artist, data in similarity_map.items()
+    }
+    path.write_text(json.dumps(raw), encoding="utf-8")
+    return path
+
+
+class TestAltShortestPath:
+    """Tests for bidirectional A* with landmark bounds."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_dijkstra(self, seed):
+        """ALT queries return shortest paths for every pair."""
+        graph, _, _ = build_sparse_graph(make_random_map(seed, n=40, degree=3))
+        reverse_graph = graph.T.tocsr()
+        index = build_landmark_index(graph, reverse_graph, LANDMARK_COUNT)
+        expected = dijkstra(graph)
+
+        for source in range(graph.shape[0]):
+            for target in range(graph.shape[0]):
+                found = alt_shortest_path(graph, reverse_graph, index, source, target)
+                if np.isinf(expected[source, target]):
+                    assert found is None
+                    continue
+                cost, path = found
+                assert cost == pytest.approx(expected[source, target])
+                assert path[0] == source
+                assert path[-1] == target
+                assert sum(graph[a, b] for a, b in pairwise(path)) == pytest.approx(
+                    cost
+                )
+
+    def test_lower_bounds_are_admissible(self):
+        """Landmark bounds never exceed the true distance."""
+        graph, _, _ = build_sparse_graph(make_random_map(0, n=40, degree=3))
+        index = build_landmark_index(graph, graph.T.tocsr(), LANDMARK_COUNT)
+        expected = dijkstra(graph)
+
+        for source in range(graph.shape[0]):
+            for target in range(graph.shape[0]):
+                assert index.lower_bound(source, target) <= expected[source, target]
+
+
+class TestLandmarkCache:
+    """Tests for caching the index with the compiled graph."""
+
+    def test_reused_until_map_changes(self, tmp_path):
+        """The cached index is reused, and rebuilt for an edited map."""
+        map_file = write_map_file(
+            tmp_path / "similar_artists_map.json", make_random_map(0)
+        )
+        cache_dir = tmp_path / "cache"
+
+        compiled = load_compiled_graph(map_file, cache_dir)
+        first = load_landmark_index(compiled, LANDMARK_COUNT)
+        again = load_landmark_index(compiled, LANDMARK_COUNT)
+        assert isinstance(again.to_landmark, np.memmap)
+        np.testing.assert_array_equal(first.to_landmark, again.to_landmark)
+
+        write_map_file(map_file, make_random_map(1))
+        changed = load_compiled_graph(map_file, cache_dir)
+        rebuilt = load_landmark_index(changed, LANDMARK_COUNT)
+
+        assert changed.cache_dir != compiled.cache_dir
+        assert not compiled.cache_dir.exists()
+        expected = build_landmark_index(
+            changed.graph, changed.reverse_graph, LANDMARK_COUNT
+        )
+        np.testing.assert_array_equal(rebuilt.to_landmark, expected.to_landmark)
+
+
+class TestConnectionQuery:
+    """Tests for single-pair connection lookups."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_matches_batch_search(self, seed, tmp_path):
+        """Single-pair queries agree with the batch search."""
+        similarity_map = make_random_map(seed, n=30, degree=4)
+        compiled = load_compiled_graph(
+            write_map_file(tmp_path / "map.json", similarity_map), tmp_path / "cache"
+        )
+        query = ConnectionQuery(compiled, load_landmark_index(compiled, 8))
+        sources = [f"A{i}" for i in range(5)]
+        targets = [f"A{i}" for i in range(20, 30)]
+        events = make_events(sources)
+
+        batch = find_optimal_paths(
+            compiled.graph,
+            compiled.artist_to_idx,
+            compiled.idx_to_artist,
+            sources,
+            targets,
+            compiled.strengths,
+            events,
+            max_paths_per_pair=1,
+        )
+        best = {(p.event_artist, p.favorite_artist): p.paths[0] for p in batch}
+
+        for source in sources:
+            for target in targets:
+                found = query.find_path(source, target, events[0])
+                if (source, target) not in best:
+                    assert found is None
+                    continue
+                expected = best[(source, target)]
+                assert found.total_cost == pytest.approx(expected.total_cost)
+                assert found.path[0] == source
+                assert found.path[-1] == target
+                assert found.event_name == expected.event_name
+
+    def test_unknown_artist(self, tmp_path):
+        """Unknown artists have no connection."""
+        compiled = load_compiled_graph(
+            write_map_file(tmp_path / "map.json", make_random_map(0)),
+            tmp_path / "cache",
+        )
+        query = ConnectionQuery(compiled, load_landmark_index(compiled, 2))
+
+        assert query.find_path("A0", "Nobody") is None
@@ -0,0 +1,273 @@
+"""Tests for the concurrent music-map crawler."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src import music_map_crawler, music_map_scraper
+from src.music_map_crawler import (
+    LATENCY_WARMUP_RESPONSES,
+    RATE_INCREASE,
+    AimdRateController,
+    TokenBucket,
+    crawl_artists,
+)
+from src.music_map_scraper import PageFetch, SimilarArtist, scrape_artist
+
+ARTISTS = [f"Artist {i}" for i in range(8)]
+
+
+def music_map_page(artist_name):
+    """A music-map page listing two similar artists."""
+    return f"""
+    <a class="S">{artist_name}</a>
+    <a class="S">{artist_name} Friend</a>
+    <a class="S">{artist_name} Rival</a>
+    <script>Aid[0]=new Array(-1,12.5,3.25);</script>
+    """
+
+
+def ok_fetch(artist_name, _session=None, elapsed=0.01):
+    """A successful fetch of the artist's page."""
+    return PageFetch(html=music_map_page(artist_name), status=200, elapsed=elapsed)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(coroutine):
+    """Run a coroutine to completion."""
+    return asyncio.run(coroutine)
+
+
+class TestTokenBucket:
+    """Tests for request pacing."""
+
+    def test_burst_then_steady_rate(self):
+        """A full bucket allows a burst, then tokens arrive at the rate."""
+        rate = 50.0
+
+        async def acquire_all():
+            bucket = TokenBucket(rate, capacity=3)
+            started = time.monotonic()
+            stamps = []
+            for _ in range(8):
+                await bucket.acquire()
+                stamps.append(time.monotonic() - started)
+            return stamps
+
+        stamps = run(acquire_all())
+
+        assert stamps[2] < 1 / rate
+        assert stamps[-1] >= (8 - 3) / rate
+
+    def test_invalid_settings(self):
+        """The rate must be positive and the bucket hold a whole token."""
+        with pytest.raises(ValueError, match="rate"):
+            TokenBucket(0.0)
+        with pytest.raises(ValueError, match="capacity"):
+            TokenBucket(1.0, capacity=0.5)
+
+    def test_pause_holds_requests(self):
+        """A pause delays the next token even when one is available."""
+
+        async def acquire_after_pause():
+            bucket = TokenBucket(1000.0)
+            bucket.pause(0.05)
+            started = time.monotonic()
+            await bucket.acquire()
+            return time.monotonic() - started
+
+        assert run(acquire_after_pause()) >= 0.05  # noqa: PLR2004
+
+
+class TestAimdRateController:
+    """Tests for adaptive pacing."""
+
+    def make(self, rate=1.0, max_rate=2.0):
+        """Controller over a bucket, both on a fake clock."""
+        clock = FakeClock()
+        bucket = TokenBucket(rate, clock=clock)
+        return AimdRateController(bucket, max_rate=max_rate, clock=clock), clock
+
+    def test_additive_increase_up_to_max(self):
+        """Each healthy response adds to the rate until the maximum."""
+        controller, _ = self.make(max_rate=1.0 + 2.5 * RATE_INCREASE)
+
+        controller.record(ok_fetch("A"), started=0.0)
+        assert controller.bucket.rate == pytest.approx(1.0 + RATE_INCREASE)
+
+        for _ in range(5):
+            controller.record(ok_fetch("A"), started=0.0)
+        assert controller.bucket.rate == pytest.approx(controller.max_rate)
+
+    def test_no_climb_without_max_rate(self):
+        """By default the rate only recovers up to where it started."""
+        bucket = TokenBucket(1.0, clock=FakeClock())
+        controller = AimdRateController(bucket)
+
+        controller.record(ok_fetch("A"), started=0.0)
+        assert bucket.rate == 1.0
+
+        controller.record(PageFetch(html=None, status=429), started=0.0)
+        for _ in range(20):
+            controller.record(ok_fetch("A"), started=1.0)
+        assert bucket.rate == pytest.approx(1.0)
+
+    def test_throttle_halves_once_per_batch(self):
+        """Throttled responses to requests sent before a backoff don't compound."""
+        controller, clock = self.make(rate=2.0)
+        throttled = PageFetch(html=None, status=429)
+
+        clock.now = 10.0
+        controller.record(throttled, started=9.0)
+        controller.record(throttled, started=9.5)
+        assert controller.bucket.rate == pytest.approx(1.0)
+
+        controller.record(throttled, started=10.5)
+        assert controller.bucket.rate == pytest.approx(0.5)
+        assert (controller.throttled, controller.backoffs) == (3, 2)
+
+    def test_rate_floor(self):
+        """Backoffs stop at the minimum rate."""
+        controller, clock = self.make(rate=0.1)
+        for step in range(5):
+            clock.now = step
+            controller.record(PageFetch(html=None, status=503), started=step)
+
+        assert controller.bucket.rate == controller.min_rate
+
+    def test_retry_after_pauses_bucket(self):
+        """Retry-After pauses the host for the requested time."""
+        controller, clock = self.make()
+        clock.now = 5.0
+
+        controller.record(PageFetch(html=None, status=429, retry_after=30.0), 5.0)
+
+        assert controller.bucket._paused_until == 35.0  # noqa: PLR2004
+
+    def test_latency_spike_backs_off(self):
+        """A response much slower than the average cuts the rate."""
+        controller, _ = self.make()
+        for _ in range(LATENCY_WARMUP_RESPONSES):
+            controller.record(ok_fetch("A", elapsed=0.1), started=0.0)
+        rate = controller.bucket.rate
+
+        controller.record(ok_fetch("A", elapsed=1.0), started=0.0)
+
+        assert controller.bucket.rate == pytest.approx(rate / 2)
+
+    def test_connection_errors_ignored(self):
+        """Failures without a response leave the rate alone."""
+        controller, _ = self.make()
+
+        controller.record(PageFetch(html=None), started=0.0)
+
+        assert controller.bucket.rate == 1.0
+
+
+class TestCrawlArtists:
+    """Tests for the concurrent crawl."""
+
+    def test_same_results_as_serial_scraper(self, monkeypatch):
+        """Crawled results match scraping each artist one at a time."""
+        monkeypatch.setattr(music_map_scraper, "fetch_page", ok_fetch)
+        monkeypatch.setattr(music_map_crawler, "fetch_page", ok_fetch)
+
+        crawled = run(crawl_artists(ARTISTS, requests_per_second=1000.0))
+
+        assert set(crawled) == set(ARTISTS)
+        for artist in ARTISTS:
+            assert crawled[artist].to_dict() == scrape_artist(artist).to_dict()
+        assert crawled[ARTISTS[0]].similar_artists == [
+            SimilarArtist("Artist 0 Friend", 1, 12.5),
+            SimilarArtist("Artist 0 Rival", 2, 3.25),
+        ]
+
+    def test_bounded_concurrency_and_shared_session(self, monkeypatch):
+        """At most `concurrency` pages are fetched at once, over one session."""
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+        sessions = set()
+
+        def slow_fetch(artist_name, session):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                sessions.add(id(session))
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return ok_fetch(artist_name)
+
+        monkeypatch.setattr(music_map_crawler, "fetch_page", slow_fetch)
+        seen = []
+
+        results = run(
+            crawl_artists(
+                ARTISTS,
+                requests_per_second=1000.0,
+                concurrency=3,
+                on_result=lambda artist, _result: seen.append(artist),
+            )
+        )
+
+        assert peak == 3  # noqa: PLR2004
+        assert len(sessions) == 1
+        assert sorted(seen) == sorted(ARTISTS)
+        assert all(results[artist].status == "success" for artist in ARTISTS)
+
+    def test_rate_limits_throughput(self, monkeypatch):
+        """Requests start no faster than the configured rate."""
+        monkeypatch.setattr(
+            music_map_crawler,
+            "fetch_page",
+            lambda _artist_name, _session: PageFetch(html=None),
+        )
+        rate = 40.0
+
+        started = time.monotonic()
+        run(crawl_artists(ARTISTS, requests_per_second=rate, concurrency=8))
+
+        assert time.monotonic() - started >= (len(ARTISTS) - 1) / rate
+
+    def test_throttled_artists_retried(self, monkeypatch):
+        """Artists throttled on the first try are fetched again after a pause."""
+        throttled = set()
+
+        def throttle_once(artist_name, _session):
+            if artist_name not in throttled:
+                throttled.add(artist_name)
+                return PageFetch(html=None, status=429, retry_after=0.01)
+            return ok_fetch(artist_name)
+
+        monkeypatch.setattr(music_map_crawler, "fetch_page", throttle_once)
+
+        results = run(crawl_artists(ARTISTS, requests_per_second=1000.0))
+
+        assert throttled == set(ARTISTS)
+        assert all(results[artist].status == "success" for artist in ARTISTS)
+
+    def test_persistent_throttling_gives_up(self, monkeypatch):
+        """An artist throttled on every retry ends up as an error."""
+        monkeypatch.setattr(
+            music_map_crawler,
+            "fetch_page",
+            lambda _artist_name, _session: PageFetch(html=None, status=503),
+        )
+        monkeypatch.setattr(music_map_crawler, "MIN_REQUESTS_PER_SECOND", 1000.0)
+
+        results = run(crawl_artists(ARTISTS[:2], requests_per_second=1000.0))
+
+        assert {result.status for result in results.values()} == {"error"}
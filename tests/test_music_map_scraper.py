@@ -0,0 +1,150 @@
+"""Tests for the music-map page fetching and parsing."""
+
+from datetime import UTC, datetime
+
+import pytest
+import requests
+
+from src import music_map_scraper
+from src.music_map_scraper import (
+    fetch_page,
+    parse_artist_page,
+    parse_relationship_matrix,
+    parse_retry_after,
+)
+
+# Queried artist Q with similar artists A, B and C, and the full matrix
+PAGE = """
+<a class="S">Q</a><a class="S">A</a><a class="S">B</a><a class="S">C</a>
+<script>
+Aid[0]=new Array(-1,9.5,4.0,2.0);
+Aid[1]=new Array(9.5,-1,6.0,0);
+Aid[2]=new Array(4.0,6.0,-1,3.5);
+Aid[3]=new Array(2.0,0,3.5,-1);
+</script>
+"""
+
+
+class FakeResponse:
+    """Just enough of requests.Response."""
+
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class FakeSession:
+    """Session answering every request the same way."""
+
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+
+    def get(self, _url, **_kwargs):
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class TestFetchPage:
+    """Tests for classifying page responses."""
+
+    def test_success(self):
+        """Pages come back with their status."""
+        fetch = fetch_page("A", FakeSession(FakeResponse(200, text="<html>")))
+
+        assert (fetch.html, fetch.status, fetch.throttled) == ("<html>", 200, False)
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_throttled_with_retry_after(self, status):
+        """429 and 503 are throttling and carry the Retry-After delay."""
+        response = FakeResponse(status, headers={"Retry-After": "120"})
+
+        fetch = fetch_page("A", FakeSession(response))
+
+        assert fetch.html is None
+        assert fetch.throttled
+        assert fetch.retry_after == 120.0  # noqa: PLR2004
+
+    @pytest.mark.parametrize("status", [404, 500, 502])
+    def test_other_errors_not_throttled(self, status):
+        """Missing pages and other server errors don't ask us to slow down."""
+        fetch = fetch_page("A", FakeSession(FakeResponse(status)))
+
+        assert (fetch.html, fetch.status, fetch.throttled) == (None, status, False)
+
+    def test_timeout(self):
+        """Timeouts are flagged and have no status."""
+        fetch = fetch_page("A", FakeSession(error=requests.Timeout()))
+
+        assert fetch.timed_out
+        assert fetch.status is None
+
+
+class TestParseRetryAfter:
+    """Tests for reading Retry-After headers."""
+
+    def test_seconds(self):
+        """Delay seconds are read as is."""
+        assert parse_retry_after(" 30 ") == 30.0  # noqa: PLR2004
+
+    def test_http_date(self):
+        """HTTP dates become the seconds left until then."""
+        now = datetime(2025, 11, 1, 12, 0, 0, tzinfo=UTC)
+
+        assert parse_retry_after("Sat, 01 Nov 2025 12:01:30 GMT", now) == 90.0  # noqa: PLR2004
+        assert parse_retry_after("Sat, 01 Nov 2025 11:00:00 GMT", now) == 0.0
+
+    @pytest.mark.parametrize("value", [None, "", "soon"])
+    def test_missing_or_malformed(self, value):
+        """Absent or unreadable headers give no delay."""
+        assert parse_retry_after(value) is None
+
+
+class TestParseArtistPage:
+    """Tests for reading the whole Aid matrix."""
+
+    def test_matrix_rows(self):
+        """Every Aid row is read by index."""
+        matrix = parse_relationship_matrix(PAGE)
+
+        assert sorted(matrix) == [0, 1, 2, 3]
+        assert matrix[2] == [4.0, 6.0, -1, 3.5]
+
+    def test_neighbor_links(self):
+        """Similar artists get their links to the other artists shown."""
+        result = parse_artist_page(PAGE)
+
+        assert [a.relationship_strength for a in result.similar_artists] == [
+            9.5,
+            4.0,
+            2.0,
+        ]
+        assert result.neighbor_links == {
+            "A": {"Q": 9.5, "B": 6.0},
+            "B": {"A": 6.0, "Q": 4.0, "C": 3.5},
+            "C": {"B": 3.5, "Q": 2.0},
+        }
+        assert result.to_dict()["neighbor_links"] == result.neighbor_links
+
+    def test_strongest_links_kept(self, monkeypatch):
+        """Only the strongest links per similar artist are kept."""
+        monkeypatch.setattr(music_map_scraper, "MAX_NEIGHBOR_LINKS", 1)
+
+        result = parse_artist_page(PAGE)
+
+        assert result.neighbor_links == {
+            "A": {"Q": 9.5},
+            "B": {"A": 6.0},
+            "C": {"B": 3.5},
+        }
+
+    def test_first_row_only(self):
+        """Pages with just the queried artist's row have no neighbor links."""
+        page = PAGE.split("Aid[1]", maxsplit=1)[0] + "</script>"
+
+        result = parse_artist_page(page)
+
+        assert result.neighbor_links is None
+        assert "neighbor_links" not in result.to_dict()
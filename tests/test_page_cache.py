@@ -0,0 +1,93 @@
+"""Tests for the compressed raw page store."""
+
+import asyncio
+import gzip
+
+import pytest
+
+from src import music_map_crawler
+from src.music_map_crawler import crawl_artists
+from src.music_map_scraper import PageFetch, parse_artist_page
+from src.page_cache import PageCache, normalize_url, reparse_cache
+from tests.test_music_map_crawler import music_map_page, ok_fetch
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Empty page store."""
+    return PageCache(tmp_path / "pages")
+
+
+class TestPageCache:
+    """Tests for storing and reading pages."""
+
+    def test_round_trip(self, cache):
+        """Stored pages come back with their metadata, compressed on disk."""
+        fetch = PageFetch(html=music_map_page("Bicep"), status=200, etag='"abc"')
+
+        stored = cache.store("Bicep", fetch)
+        page = cache.get("Bicep")
+
+        assert page == stored
+        assert (page.status, page.etag) == (200, '"abc"')
+        assert cache.read_body(page) == fetch.html
+        (object_path,) = (cache.root / "objects").rglob("*.html.gz")
+        assert gzip.decompress(object_path.read_bytes()).decode() == fetch.html
+
+    def test_content_addressed(self, cache):
+        """Identical bodies are stored once."""
+        html = music_map_page("Same")
+        cache.store("One", PageFetch(html=html, status=200))
+        cache.store("Two", PageFetch(html=html, status=200))
+
+        assert len(list((cache.root / "objects").rglob("*.html.gz"))) == 1
+        assert len(list(cache.pages())) == 2  # noqa: PLR2004
+
+    def test_keyed_by_normalized_url(self, cache):
+        """Spellings of the same artist URL share a record."""
+        cache.store("Some Artist", ok_fetch("Some Artist"))
+
+        assert cache.get("some artist") is not None
+        assert normalize_url("HTTPS://Www.Music-Map.com/Some+Artist/") == (
+            "https://www.music-map.com/some+artist"
+        )
+
+    def test_only_definite_responses(self, cache):
+        """Not-found pages are kept without a body; throttling isn't kept."""
+        assert cache.store("Busy", PageFetch(html=None, status=429)) is None
+        cache.store("Missing", PageFetch(html=None, status=404))
+
+        assert cache.get("Busy") is None
+        page = cache.get("Missing")
+        assert page.body_sha256 is None
+        assert cache.read_body(page) is None
+
+
+class TestReparseCache:
+    """Tests for rebuilding results from stored pages."""
+
+    def test_matches_parsing_the_pages(self, cache):
+        """Reparsed results equal parsing the fetched pages directly."""
+        artists = [f"Artist {i}" for i in range(5)]
+        for artist in artists:
+            cache.store(artist, ok_fetch(artist))
+        cache.store("Missing", PageFetch(html=None, status=404))
+
+        results = reparse_cache(cache, ["ARTIST 0"], workers=2)
+
+        assert set(results) == {*artists, "Missing", "ARTIST 0"}
+        for artist in artists:
+            assert results[artist] == parse_artist_page(music_map_page(artist))
+        assert results["ARTIST 0"] == results["Artist 0"]
+        assert results["Missing"].status == "error"
+
+    def test_crawl_fills_cache(self, cache, monkeypatch):
+        """A crawl keeps its pages, and reparsing them reproduces its results."""
+        monkeypatch.setattr(music_map_crawler, "fetch_page", ok_fetch)
+        artists = [f"Artist {i}" for i in range(4)]
+
+        crawled = asyncio.run(
+            crawl_artists(artists, requests_per_second=1000.0, page_cache=cache)
+        )
+
+        assert reparse_cache(cache, workers=1) == crawled
@@ -0,0 +1,122 @@
+"""Tests for pruning the graph before a connection search."""
+
+import numpy as np
+import pytest
+
+from src.artist_connection_search import (
+    build_sparse_graph,
+    build_strength_lookup,
+    find_optimal_paths,
+)
+from src.search_pruning import prune_search_graph, reachable_from
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+    make_similarity_map,
+)
+
+# S1 → X → F1 is the only route; S2 only reaches the leaf L, U links into
+# the route but no event artist reaches U, and F2 is reached by nobody
+EDGES = {
+    "S1": [("X", 5.0), ("L", 2.0)],
+    "S2": [("L", 4.0)],
+    "X": [("F1", 3.0), ("L", 1.0)],
+    "U": [("X", 6.0), ("F2", 2.0)],
+}
+
+
+def build(similarity_map):
+    """Graph, names and strengths for a similarity map."""
+    graph, artist_to_idx, _ = build_sparse_graph(similarity_map)
+    names = sorted(artist_to_idx, key=artist_to_idx.__getitem__)
+    return graph, names, build_strength_lookup(graph, similarity_map, artist_to_idx)
+
+
+def connection_summary(grouped):
+    """Pairs with their paths' artists and costs."""
+    return [
+        (
+            group.event_artist,
+            group.favorite_artist,
+            [(path.path, round(path.total_cost, 9)) for path in group.paths],
+        )
+        for group in grouped
+    ]
+
+
+class TestReachableFrom:
+    """Tests for multi-root reachability."""
+
+    def test_marks_nodes_reached_from_any_root(self):
+        """Every node on a route out of a root is reached, others are not."""
+        graph, names, _ = build(make_similarity_map(EDGES))
+        idx = {name: i for i, name in enumerate(names)}
+
+        reached = reachable_from(graph, np.array([idx["S2"], idx["X"]]))
+
+        assert {names[i] for i in np.flatnonzero(reached)} == {"S2", "X", "L", "F1"}
+
+    def test_no_roots(self):
+        """Without roots nothing is reachable."""
+        graph, _, _ = build(make_similarity_map(EDGES))
+        assert not reachable_from(graph, np.array([], dtype=np.int64)).any()
+
+
+class TestPruneSearchGraph:
+    """Tests for the pruned search graph and its report."""
+
+    def test_keeps_only_nodes_on_source_to_favorite_paths(self):
+        """Leaves, dead-end sources and unreached favorites are pruned."""
+        graph, names, strengths = build(make_similarity_map(EDGES))
+
+        pruned = prune_search_graph(
+            graph, strengths, names, ["S1", "S2", "Nobody"], ["F1", "F2"]
+        )
+
+        assert pruned.names == ["F1", "S1", "X"]
+        assert pruned.graph.nnz == 2  # noqa: PLR2004
+        report = pruned.report
+        assert (report.n_sources, report.n_reachable_sources) == (2, 1)
+        assert (report.n_targets, report.n_reachable_targets) == (2, 1)
+        assert report.kept_nodes == len(pruned.names)
+        assert report.pruned_node_fraction == pytest.approx(1 - 3 / len(names))
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_search_results_unchanged(self, seed):
+        """Searching the pruned graph finds the same connections."""
+        edges = {
+            artist: [
+                (sim.name, sim.relationship_strength) for sim in data.similar_artists
+            ]
+            for artist, data in make_random_map(seed, n=40, degree=2).items()
+        }
+        # Artists that were never scraped are leaves
+        for artist in [f"A{i}" for i in range(30, 40)]:
+            edges.pop(artist)
+        similarity_map = make_similarity_map(edges)
+        graph, names, strengths = build(similarity_map)
+        artist_to_idx = {name: i for i, name in enumerate(names)}
+        sources = [f"A{i}" for i in range(8)]
+        targets = [f"A{i}" for i in range(15, 35)]
+        events = make_events(sources)
+
+        pruned = prune_search_graph(graph, strengths, names, sources, targets)
+
+        full_args = (graph, artist_to_idx, dict(enumerate(names)), sources, targets)
+        pruned_args = (
+            pruned.graph,
+            pruned.artist_to_idx,
+            pruned.idx_to_artist,
+            sources,
+            targets,
+        )
+        assert pruned.report.kept_nodes < len(names)
+        assert connection_summary(
+            find_optimal_paths(
+                *pruned_args,
+                pruned.strengths,
+                events,
+                reverse_graph=pruned.reverse_graph,
+            )
+        ) == connection_summary(find_optimal_paths(*full_args, strengths, events))
@@ -0,0 +1,40 @@
+"""Tests for sharing CSR graphs through shared memory."""
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.shared_graph import SharedCSR, attach_csr
+
+
+class TestSharedCSR:
+    """Tests for SharedCSR and attach_csr."""
+
+    def test_round_trip(self):
+        """An attached graph has the owner's arrays without copying them."""
+        graph = sp.csr_matrix(
+            np.array([[0.0, 0.5, 0.0], [0.0, 0.0, 0.25], [1.0, 0.0, 0.0]])
+        )
+
+        with SharedCSR(graph) as shared:
+            attached, segments = attach_csr(shared.spec)
+
+            assert attached.shape == graph.shape
+            np.testing.assert_array_equal(attached.indptr, graph.indptr)
+            np.testing.assert_array_equal(attached.indices, graph.indices)
+            np.testing.assert_array_equal(attached.data, graph.data)
+            assert attached.data.base is not None
+
+            del attached
+            for segment in segments:
+                segment.close()
+
+    def test_empty_graph(self):
+        """Graphs without edges can be shared."""
+        graph = sp.csr_matrix((2, 2))
+
+        with SharedCSR(graph) as shared:
+            attached, segments = attach_csr(shared.spec)
+            assert attached.nnz == 0
+            del attached
+            for segment in segments:
+                segment.close()
@@ -0,0 +1,35 @@
+"""Tests for the edge sparsification benchmark."""
+
+from src.artist_connection_search import EdgeSparsification
+from src.sparsification_benchmark import compare_sparsifications
+from tests.test_artist_connection_search import make_events, make_random_map
+
+
+class TestCompareSparsifications:
+    """Tests for best-path change accounting."""
+
+    def test_counts_changes_against_full_graph(self):
+        """A no-op sparsification changes nothing; top-1 drops links."""
+        similarity_map = make_random_map(0, n=30, degree=5)
+        sources = [f"A{i}" for i in range(6)]
+        favorites = [f"A{i}" for i in range(20, 30)]
+
+        full, (unchanged, top1) = compare_sparsifications(
+            similarity_map,
+            sources,
+            favorites,
+            make_events(sources),
+            [
+                EdgeSparsification(max_edges_per_artist=5),
+                EdgeSparsification(max_edges_per_artist=1),
+            ],
+            repeats=1,
+        )
+
+        assert full.n_pairs > 0
+        assert (unchanged.n_edges, unchanged.n_pairs) == (full.n_edges, full.n_pairs)
+        assert unchanged.n_changed_paths == unchanged.n_lost_pairs == 0
+        assert top1.n_edges == len(similarity_map)
+        assert top1.n_pairs + top1.n_lost_pairs <= full.n_pairs
+        assert top1.n_lost_pairs + top1.n_changed_paths > 0
+        assert top1.mean_cost_increase >= 0
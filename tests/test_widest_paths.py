@@ -0,0 +1,185 @@
+"""Tests for widest-path (bottleneck) connections."""
+
+from itertools import pairwise
+
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from src.artist_connection_search import build_sparse_graph, build_strength_lookup
+from src.widest_paths import (
+    NO_BOTTLENECK,
+    build_bottleneck_tree,
+    find_widest_paths,
+    symmetric_strength_graph,
+)
+from tests.test_artist_connection_search import (
+    RANDOM_GRAPH_SEEDS,
+    make_events,
+    make_random_map,
+)
+
+
+def make_symmetric_graph(seed, n=30, degree=2):
+    """Random symmetric strength graph with its bottleneck tree."""
+    similarity_map = make_random_map(seed, n=n, degree=degree)
+    graph, artist_to_idx, _ = build_sparse_graph(similarity_map)
+    strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+    symmetric_graph, symmetric_strengths = symmetric_strength_graph(graph, strengths)
+    return (
+        symmetric_graph,
+        symmetric_strengths,
+        build_bottleneck_tree(symmetric_graph, symmetric_strengths),
+    )
+
+
+def brute_force_bottlenecks(symmetric_graph, symmetric_strengths):
+    """Widest bottleneck and its fewest hops per pair, one threshold at a time."""
+    n = symmetric_graph.shape[0]
+    best = np.full((n, n), NO_BOTTLENECK)
+    hops = np.full((n, n), np.inf)
+    for threshold in np.unique(symmetric_strengths):
+        strong = symmetric_graph.copy()
+        strong.data = np.where(symmetric_strengths >= threshold, 1.0, 0.0)
+        strong.eliminate_zeros()
+        reach = dijkstra(strong, unweighted=True)
+        reachable = np.isfinite(reach)
+        best[reachable] = threshold
+        hops[reachable] = reach[reachable]
+    return best, hops
+
+
+def path_strengths(symmetric_graph, symmetric_strengths, path):
+    """Strength of each link on a node path."""
+    lookup = dict(
+        zip(
+            zip(*symmetric_graph.nonzero(), strict=True),
+            symmetric_strengths,
+            strict=True,
+        )
+    )
+    return [lookup[edge] for edge in pairwise(path)]
+
+
+class TestBottleneckTree:
+    """Tests for spanning forest bottleneck queries."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_bottlenecks_match_brute_force(self, seed):
+        """LCA queries return the widest bottleneck of every pair."""
+        symmetric_graph, symmetric_strengths, tree = make_symmetric_graph(seed)
+        expected, _ = brute_force_bottlenecks(symmetric_graph, symmetric_strengths)
+        n = symmetric_graph.shape[0]
+        sources, targets = np.divmod(np.arange(n * n), n)
+
+        bottlenecks, _ = tree.bottlenecks(sources, targets)
+
+        distinct = sources != targets
+        np.testing.assert_array_equal(
+            bottlenecks[distinct], expected[sources, targets][distinct]
+        )
+        assert np.isinf(bottlenecks[~distinct]).all()
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    def test_tree_paths_reach_bottleneck(self, seed):
+        """Tree paths link each pair with its bottleneck as weakest link."""
+        symmetric_graph, symmetric_strengths, tree = make_symmetric_graph(seed)
+        n = symmetric_graph.shape[0]
+        sources, targets = np.divmod(np.arange(n * n), n)
+        bottlenecks, lca = tree.bottlenecks(sources, targets)
+        connected = (bottlenecks > NO_BOTTLENECK) & (sources != targets)
+
+        nodes, offsets = tree.paths(
+            sources[connected], targets[connected], lca[connected]
+        )
+
+        for i, (source, target, bottleneck) in enumerate(
+            zip(
+                sources[connected],
+                targets[connected],
+                bottlenecks[connected],
+                strict=True,
+            )
+        ):
+            path = nodes[offsets[i] : offsets[i + 1]].tolist()
+            assert path[0] == source
+            assert path[-1] == target
+            strengths = path_strengths(symmetric_graph, symmetric_strengths, path)
+            assert min(strengths) == bottleneck
+
+
+class TestFindWidestPaths:
+    """Tests for the widest-path connection search."""
+
+    @pytest.mark.parametrize("seed", RANDOM_GRAPH_SEEDS)
+    @pytest.mark.parametrize("prefer_fewer_hops", [False, True])
+    def test_paths_are_widest(self, seed, prefer_fewer_hops):
+        """Every pair's path has the widest bottleneck (and fewest hops if asked)."""
+        similarity_map = make_random_map(seed, n=30, degree=2)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        symmetric_graph, symmetric_strengths = symmetric_strength_graph(
+            graph, strengths
+        )
+        expected, hops = brute_force_bottlenecks(symmetric_graph, symmetric_strengths)
+        sources = [f"A{i}" for i in range(5)]
+        targets = [f"A{i}" for i in range(20, 30)]
+
+        found = find_widest_paths(
+            graph,
+            artist_to_idx,
+            idx_to_artist,
+            sources,
+            targets,
+            strengths=strengths,
+            events=make_events(sources),
+            prefer_fewer_hops=prefer_fewer_hops,
+        )
+
+        reachable = {
+            (s, t)
+            for s in sources
+            for t in targets
+            if expected[artist_to_idx[s], artist_to_idx[t]] > NO_BOTTLENECK
+        }
+        assert {(g.event_artist, g.favorite_artist) for g in found} == reachable
+        for group in found:
+            s = artist_to_idx[group.event_artist]
+            t = artist_to_idx[group.favorite_artist]
+            path = group.paths[0]
+            assert path.min_strength == pytest.approx(expected[s, t])
+            if prefer_fewer_hops:
+                assert path.hops == hops[s, t]
+
+    def test_fewest_hops_by_default(self):
+        """Without options, each pair gets the fewest-hop widest path."""
+        similarity_map = make_random_map(0, n=30, degree=2)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(5)]
+        targets = [f"A{i}" for i in range(20, 30)]
+        args = (graph, artist_to_idx, idx_to_artist, sources, targets)
+        kwargs = {"strengths": strengths, "events": make_events(sources)}
+
+        default = find_widest_paths(*args, **kwargs)
+        fewest = find_widest_paths(*args, **kwargs, prefer_fewer_hops=True)
+
+        assert [g.paths[0].path for g in default] == [g.paths[0].path for g in fewest]
+
+    def test_min_strength_drops_weak_pairs(self):
+        """Pairs whose bottleneck is below min_strength are left out."""
+        similarity_map = make_random_map(0, n=30, degree=2)
+        graph, artist_to_idx, idx_to_artist = build_sparse_graph(similarity_map)
+        strengths = build_strength_lookup(graph, similarity_map, artist_to_idx)
+        sources = [f"A{i}" for i in range(5)]
+        targets = [f"A{i}" for i in range(20, 30)]
+        args = (graph, artist_to_idx, idx_to_artist, sources, targets)
+        kwargs = {"strengths": strengths, "events": make_events(sources)}
+        everything = find_widest_paths(*args, **kwargs)
+        min_strength = float(np.median([g.paths[0].min_strength for g in everything]))
+
+        strong = find_widest_paths(*args, **kwargs, min_strength=min_strength)
+
+        assert strong
+        assert len(strong) < len(everything)
+        assert all(g.paths[0].min_strength >= min_strength for g in strong)